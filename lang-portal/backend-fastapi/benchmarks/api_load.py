@@ -0,0 +1,334 @@
+"""
+Load test for every API endpoint against a synthetic database.
+
+Generates a database at the requested scale (or reuses one passed with
+--database), measures the SQL statements each endpoint executes with one
+sequential request, then drives each endpoint with concurrent requests
+in-process through httpx's ASGI transport. Throughput, p50/p95/p99 latency,
+errors and query counts are printed and written as JSON; pass an earlier
+result file to --compare to see the change per endpoint. Run from
+backend-fastapi:
+
+    python -m benchmarks.api_load --words 50000 --reviews 2000000 --output results.json
+    python -m benchmarks.api_load --database /tmp/bench.db --compare results.json
+
+The reset endpoints wipe the dataset, so they only run with --include-resets,
+after everything else.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+SYLLABLES = ["a", "á", "e", "é", "i", "o", "ö", "ő", "u", "ü", "ű", "sz", "k", "l", "m", "n", "r", "t", "gy", "zs"]
+
+class Endpoint(NamedTuple):
+    name: str
+    method: str
+    url: Callable[[random.Random], str]
+    body: Optional[Callable[[random.Random], Dict]] = None
+    files: Optional[Callable[[random.Random], Dict]] = None
+    # Fraction of --requests sent to this endpoint, for the expensive ones
+    share: float = 1.0
+
+def _word(rnd: random.Random) -> str:
+    return "".join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 5)))
+
+def _timestamp(value: datetime) -> str:
+    # The text format SQLAlchemy stores, so seeded rows compare like real ones
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+def generate(args):
+    """
+    Fill an empty database with words, groups, sessions and reviews.
+    Rows are written with executemany in chunks and the derived tables are
+    rebuilt afterwards, as after a bulk import.
+    """
+    from database import engine, rebuild_word_stats, rebuild_daily_activity, rebuild_word_schedules
+    from database.database import SessionLocal
+
+    rnd = random.Random(args.seed)
+    now = datetime.utcnow()
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.executemany(
+            "INSERT INTO words (hungarian, english, parts) VALUES (?, ?, '{}')",
+            ((_word(rnd), f"word {i}") for i in range(args.words)),
+        )
+        cursor.executemany("INSERT INTO groups (name) VALUES (?)", ((f"Group {i}",) for i in range(args.groups)))
+        cursor.executemany(
+            "INSERT INTO words_groups (word_id, group_id) VALUES (?, ?)",
+            ((word_id, rnd.randint(1, args.groups)) for word_id in range(1, args.words + 1)),
+        )
+        cursor.executemany(
+            "INSERT INTO study_activities (name, group_id, created_at) VALUES ('Vocabulary Quiz', ?, ?)",
+            ((group_id, _timestamp(now - timedelta(days=365))) for group_id in range(1, args.groups + 1)),
+        )
+
+        session_starts = [now - timedelta(minutes=rnd.randint(10, 365 * 24 * 60)) for _ in range(args.sessions)]
+        session_starts.sort()
+        cursor.executemany(
+            "INSERT INTO study_sessions (group_id, study_activity_id, created_at, end_time) VALUES (?, ?, ?, ?)",
+            (
+                (group_id, group_id, _timestamp(start), _timestamp(start + timedelta(minutes=10)))
+                for group_id, start in ((rnd.randint(1, args.groups), start) for start in session_starts)
+            ),
+        )
+
+        remaining = args.reviews
+        while remaining:
+            chunk = min(remaining, 100000)
+            rows = []
+            for _ in range(chunk):
+                session = rnd.randrange(args.sessions)
+                reviewed_at = session_starts[session] + timedelta(seconds=rnd.randint(0, 600))
+                rows.append((rnd.randint(1, args.words), session + 1, rnd.random() < 0.7, _timestamp(reviewed_at)))
+            cursor.executemany(
+                "INSERT INTO word_review_items (word_id, study_session_id, correct, created_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            remaining -= chunk
+        raw.commit()
+    finally:
+        raw.close()
+
+    db = SessionLocal()
+    try:
+        rebuild_word_stats(db)
+        rebuild_daily_activity(db)
+        rebuild_word_schedules(db)
+        db.commit()
+    finally:
+        db.close()
+
+def dataset(args) -> Dict:
+    """
+    Row counts of the database under test, generating it first if empty.
+    """
+    from sqlalchemy import func
+    from database import Word, Group, StudySession, WordReviewItem
+    from database.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        empty = db.query(Word.id).first() is None
+    finally:
+        db.close()
+    if empty:
+        started = time.perf_counter()
+        generate(args)
+        print(f"Generated synthetic database in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    db = SessionLocal()
+    try:
+        return {
+            "words": db.query(func.count(Word.id)).scalar(),
+            "groups": db.query(func.count(Group.id)).scalar(),
+            "sessions": db.query(func.count(StudySession.id)).scalar(),
+            "reviews": db.query(func.count(WordReviewItem.id)).scalar(),
+        }
+    finally:
+        db.close()
+
+def endpoints(counts: Dict, include_resets: bool) -> List[Endpoint]:
+    words, groups, sessions = counts["words"], counts["groups"], counts["sessions"]
+    word = lambda rnd: rnd.randint(1, words)
+    group = lambda rnd: rnd.randint(1, groups)
+    session = lambda rnd: rnd.randint(1, sessions)
+    vocabulary = "".join(
+        json.dumps({"hungarian": f"benchmark {i}", "english": f"benchmark {i}", "groups": ["Benchmark"]}) + "\n"
+        for i in range(50)
+    ).encode()
+
+    listed = [
+        Endpoint("GET /api/words", "GET", lambda rnd: f"/api/words?page={rnd.randint(1, 10)}&items_per_page=100"),
+        Endpoint("GET /api/words/search", "GET", lambda rnd: f"/api/words/search?q={_word(rnd)[:3]}"),
+        Endpoint("GET /api/words/search fuzzy", "GET", lambda rnd: f"/api/words/search?q={_word(rnd)}&fuzzy=true"),
+        Endpoint("GET /api/words/export", "GET", lambda rnd: "/api/words/export", share=0.02),
+        Endpoint("POST /api/words/import", "POST", lambda rnd: "/api/words/import",
+                 files=lambda rnd: {"file": ("benchmark.jsonl", vocabulary)}, share=0.1),
+        Endpoint("GET /api/words/{id}", "GET", lambda rnd: f"/api/words/{word(rnd)}"),
+        Endpoint("GET /api/groups", "GET", lambda rnd: "/api/groups?items_per_page=100"),
+        Endpoint("GET /api/groups/{id}", "GET", lambda rnd: f"/api/groups/{group(rnd)}"),
+        Endpoint("GET /api/groups/{id}/words", "GET", lambda rnd: f"/api/groups/{group(rnd)}/words?items_per_page=100"),
+        Endpoint("GET /api/groups/{id}/study_sessions", "GET", lambda rnd: f"/api/groups/{group(rnd)}/study_sessions?items_per_page=100"),
+        Endpoint("GET /api/study_activities/{id}", "GET", lambda rnd: f"/api/study_activities/{group(rnd)}"),
+        Endpoint("GET /api/study_activities/{id}/study_sessions", "GET",
+                 lambda rnd: f"/api/study_activities/{group(rnd)}/study_sessions?items_per_page=100"),
+        Endpoint("POST /api/study_activities", "POST", lambda rnd: "/api/study_activities",
+                 body=lambda rnd: {"group_id": group(rnd), "study_activity_id": 1}, share=0.1),
+        Endpoint("GET /api/study_sessions/{id}/next", "GET", lambda rnd: f"/api/study_sessions/{session(rnd)}/next?limit=20"),
+        Endpoint("POST /api/study_sessions/{id}/words/{word_id}/review", "POST",
+                 lambda rnd: f"/api/study_sessions/{session(rnd)}/words/{word(rnd)}/review",
+                 body=lambda rnd: {"correct": rnd.random() < 0.7}),
+        Endpoint("POST /api/study_sessions/{id}/reviews", "POST", lambda rnd: f"/api/study_sessions/{session(rnd)}/reviews",
+                 body=lambda rnd: {"reviews": [{"word_id": word(rnd), "correct": rnd.random() < 0.7} for _ in range(20)]}),
+        Endpoint("GET /api/dashboard/last_study_session", "GET", lambda rnd: "/api/dashboard/last_study_session"),
+        Endpoint("GET /api/dashboard/study_progress", "GET", lambda rnd: "/api/dashboard/study_progress"),
+        Endpoint("GET /api/dashboard/quick-stats", "GET", lambda rnd: "/api/dashboard/quick-stats"),
+        Endpoint("GET /api/dashboard/activity", "GET", lambda rnd: "/api/dashboard/activity"),
+        Endpoint("GET /api/dashboard/cache_stats", "GET", lambda rnd: "/api/dashboard/cache_stats"),
+        Endpoint("GET /api/review_buffer", "GET", lambda rnd: "/api/review_buffer"),
+        Endpoint("GET /metrics", "GET", lambda rnd: "/metrics"),
+    ]
+    if include_resets:
+        listed += [
+            Endpoint("POST /api/reset_history", "POST", lambda rnd: "/api/reset_history", share=0.02),
+            Endpoint("POST /api/full_reset", "POST", lambda rnd: "/api/full_reset", share=0.02),
+        ]
+    return listed
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+async def measure(client, counter, endpoint: Endpoint, requests: int, concurrency: int, rnd: random.Random) -> Dict:
+    def send():
+        kwargs = {}
+        if endpoint.body:
+            kwargs["json"] = endpoint.body(rnd)
+        if endpoint.files:
+            kwargs["files"] = endpoint.files(rnd)
+        return client.request(endpoint.method, endpoint.url(rnd), **kwargs)
+
+    # One request on its own, so the statement count belongs to it alone
+    counter["statements"] = 0
+    await send()
+    statements = counter["statements"]
+
+    latencies: List[float] = []
+    errors = 0
+    pending = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in pending:
+            started = time.perf_counter()
+            response = await send()
+            latencies.append(time.perf_counter() - started)
+            errors += response.status_code >= 400
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(min(concurrency, requests))])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    milliseconds = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": milliseconds(percentile(latencies, 0.50)),
+        "p95_ms": milliseconds(percentile(latencies, 0.95)),
+        "p99_ms": milliseconds(percentile(latencies, 0.99)),
+        "max_ms": milliseconds(latencies[-1]),
+        "sql_statements": statements,
+    }
+
+async def run(args, counts: Dict) -> Dict:
+    import httpx
+    from sqlalchemy import event
+    from database import engine
+    from database.database import async_engine
+    from main import app, lifespan
+
+    counter = {"statements": 0}
+
+    def count_statement(*_):
+        counter["statements"] += 1
+
+    for counted in (engine, async_engine.sync_engine if async_engine else None):
+        if counted is not None:
+            event.listen(counted, "before_cursor_execute", count_statement)
+
+    rnd = random.Random(args.seed)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    results = {}
+    async with lifespan(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for endpoint in endpoints(counts, args.include_resets):
+                if args.only and not any(part in endpoint.name for part in args.only):
+                    continue
+                requests = max(1, int(args.requests * endpoint.share))
+                results[endpoint.name] = await measure(client, counter, endpoint, requests, args.concurrency, rnd)
+                print(format_result(endpoint.name, results[endpoint.name]), file=sys.stderr)
+    return results
+
+def format_result(name: str, result: Dict, baseline: Optional[Dict] = None) -> str:
+    line = (
+        f"{name:<55} {result['requests_per_second']:>9} req/s  p50 {result['p50_ms']:>8}  "
+        f"p95 {result['p95_ms']:>8}  p99 {result['p99_ms']:>8} ms  sql {result['sql_statements']:>3}  "
+        f"errors {result['errors']}"
+    )
+    if baseline:
+        change = (result["p95_ms"] - baseline["p95_ms"]) / baseline["p95_ms"] * 100 if baseline["p95_ms"] else 0
+        line += f"  p95 {change:+.0f}% sql {result['sql_statements'] - baseline['sql_statements']:+d}"
+    return line
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database", help="SQLite file to use; generated when missing or empty")
+    parser.add_argument("--words", type=int, default=10000)
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--reviews", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--only", nargs="*", help="Run endpoints whose name contains any of these")
+    parser.add_argument("--include-resets", action="store_true", help="Also run the destructive reset endpoints, last")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    database = args.database or f"{tempfile.mkdtemp()}/benchmark.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    from database import engine, run_migrations
+    run_migrations(engine)
+
+    counts = dataset(args)
+    results = asyncio.run(run(args, counts))
+
+    report = {
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "database_async": os.environ.get("DATABASE_ASYNC", "false"),
+        "dataset": counts,
+        "requests_per_endpoint": args.requests,
+        "concurrency": args.concurrency,
+        "endpoints": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2)
+    print(f"Wrote {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as previous:
+            baseline = json.load(previous)["endpoints"]
+        print(f"\nCompared with {args.compare}:")
+        for name, result in results.items():
+            if name in baseline:
+                print(format_result(name, result, baseline[name]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Regression benchmark for SQL round trips per page.
+
+Seeds a throwaway SQLite database, requests the listings with growing
+page sizes and fails if the number of executed statements changes with
+items_per_page. Lazy relationship loads in the session listings are
+checked by tests/test_session_listings.py. Run from the backend-fastapi
+directory:
+
+    python -m benchmarks.query_counts
+"""
+import os
+import sys
+import tempfile
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/benchmark.db"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from database import engine, run_migrations, rebuild_word_stats, Word, Group, WordGroup, StudySession, StudyActivity, WordReviewItem
+from database.database import SessionLocal
+from main import app
+
+PAGE_SIZES = [10, 50, 200]
+WORD_COUNT = 500
+SESSION_COUNT = 300
+
+def seed():
+    run_migrations(engine)
+    db = SessionLocal()
+    db.add_all([Group(name=f"Group {i}") for i in range(max(PAGE_SIZES))])
+    group = Group(name="Benchmark")
+    db.add(group)
+    db.flush()
+    activity = StudyActivity(group_id=group.id)
+    db.add(activity)
+    db.flush()
+    sessions = [StudySession(group_id=group.id, study_activity_id=activity.id) for _ in range(SESSION_COUNT)]
+    db.add_all(sessions)
+    db.flush()
+
+    words = [Word(hungarian=f"szo{i}", english=f"word{i}", parts={}) for i in range(WORD_COUNT)]
+    db.add_all(words)
+    db.flush()
+    for i, word in enumerate(words):
+        db.add(WordGroup(word_id=word.id, group_id=group.id))
+        session = sessions[i % SESSION_COUNT]
+        db.add(WordReviewItem(word_id=word.id, study_session_id=session.id, correct=i % 3 != 0))
+    db.flush()
+    rebuild_word_stats(db)
+    db.commit()
+    ids = {"group": group.id, "activity": activity.id, "word": words[0].id}
+    db.close()
+    return ids
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self)
+
+    def __call__(self, *args):
+        self.count += 1
+
+def main():
+    ids = seed()
+    counter = QueryCounter()
+    client = TestClient(app)
+    endpoints = {
+        "/api/words": lambda size: f"/api/words?items_per_page={size}",
+        "/api/groups/{id}/words": lambda size: f"/api/groups/{ids['group']}/words?items_per_page={size}",
+        "/api/groups": lambda size: f"/api/groups?items_per_page={size}",
+        "/api/groups/{id}/study_sessions": lambda size: f"/api/groups/{ids['group']}/study_sessions?items_per_page={size}",
+        "/api/study_activities/{id}/study_sessions": lambda size: f"/api/study_activities/{ids['activity']}/study_sessions?items_per_page={size}",
+    }
+
+    failed = False
+    for name, url in endpoints.items():
+        counts = []
+        for size in PAGE_SIZES:
+            counter.count = 0
+            response = client.get(url(size))
+            response.raise_for_status()
+            counts.append(counter.count)
+        constant = len(set(counts)) == 1
+        failed |= not constant
+        print(f"{name:<42} queries per page {dict(zip(PAGE_SIZES, counts))} {'ok' if constant else 'FAIL'}")
+
+    counter.count = 0
+    client.get(f"/api/words/{ids['word']}").raise_for_status()
+    print(f"{'/api/words/{id}':<42} queries {counter.count}")
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
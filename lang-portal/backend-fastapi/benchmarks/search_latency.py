@@ -0,0 +1,87 @@
+"""
+Latency of ranked word search on a large vocabulary.
+
+Fills a throwaway database with synthetic Hungarian-like words (or reuses
+one passed with --database), then times search_words for random 2- and
+3-character prefixes, the broadest search-as-you-type queries, and for a
+few two-token queries. Fails if the p95 is above --target-ms. Run from
+backend-fastapi:
+
+    python -m benchmarks.search_latency --words 500000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.api_load import _word
+
+def seed(words: int, rnd: random.Random):
+    from database import engine, run_migrations
+
+    run_migrations(engine)
+    raw = engine.raw_connection()
+    try:
+        # The FTS5 triggers index every row as it is inserted
+        raw.cursor().executemany(
+            "INSERT INTO words (hungarian, english, parts) VALUES (?, ?, '{}')",
+            ((_word(rnd), f"{_word(rnd)} {_word(rnd)}") for _ in range(words)),
+        )
+        raw.commit()
+    finally:
+        raw.close()
+
+def percentile(samples, share: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * share))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--words", type=int, default=500_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--target-ms", type=float, default=10)
+    parser.add_argument("--database", help="existing database to search instead of generating one")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{args.database or os.path.join(tempfile.mkdtemp(), 'search.db')}"
+    from database import search_words
+    from database.database import SessionLocal
+
+    rnd = random.Random(args.seed)
+    if not args.database:
+        started = time.perf_counter()
+        seed(args.words, rnd)
+        print(f"seeded {args.words} words in {time.perf_counter() - started:.1f}s")
+
+    queries = {
+        "2 characters": [_word(rnd)[:2] for _ in range(args.queries)],
+        "3 characters": [_word(rnd)[:3] for _ in range(args.queries)],
+        "two tokens": [f"{_word(rnd)[:2]} {_word(rnd)[:2]}" for _ in range(args.queries)],
+    }
+    db = SessionLocal()
+    failed = False
+    try:
+        for name, texts in queries.items():
+            samples = []
+            for q in texts:
+                started = time.perf_counter()
+                search_words(db, q, args.limit)
+                samples.append((time.perf_counter() - started) * 1000)
+            samples.sort()
+            p95 = percentile(samples, 0.95)
+            failed |= p95 > args.target_ms
+            print(
+                f"{name:<14} p50 {statistics.median(samples):6.2f} ms  p95 {p95:6.2f} ms  "
+                f"p99 {percentile(samples, 0.99):6.2f} ms  max {samples[-1]:6.2f} ms  "
+                f"{'ok' if p95 <= args.target_ms else 'FAIL'}"
+            )
+    finally:
+        db.close()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
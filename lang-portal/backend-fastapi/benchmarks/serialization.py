@@ -0,0 +1,87 @@
+"""
+Cost of turning a listing page into JSON bytes, per serialisation path.
+
+Builds a page of rows shaped like each list endpoint and times:
+
+- encoder: jsonable_encoder + json.dumps, what FastAPI does for a route
+  without a response model
+- dict_model: response_model=Dict, validated and dumped by pydantic-core
+- typed_model: the typed response model from routers.schemas
+- orjson: the ORJSONResponse default class, for routes without a model
+
+Run from backend-fastapi:
+
+    python -m benchmarks.serialization --rows 100
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta
+from typing import Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from routers.responses import ORJSONResponse
+from routers.schemas import WordPage, GroupPage, StudySessionPage
+
+def pagination(rows: int) -> Dict:
+    return {"current_page": 1, "total_pages": 10, "total_items": rows * 10, "items_per_page": rows, "next_cursor": "eyJpZCI6IDEwMH0"}
+
+def pages(rows: int) -> Dict[str, tuple]:
+    started = datetime(2025, 2, 8, 17, 33, 7)
+    return {
+        "words": (WordPage, {
+            "items": [
+                {"hungarian": f"körte {i}", "english": f"pear {i}", "correct_count": i % 7, "wrong_count": i % 3}
+                for i in range(rows)
+            ],
+            "pagination": pagination(rows),
+        }),
+        "groups": (GroupPage, {
+            "items": [{"id": i, "name": f"Group {i}", "word_count": i * 3} for i in range(rows)],
+            "pagination": pagination(rows),
+        }),
+        "study_sessions": (StudySessionPage, {
+            "items": [
+                {
+                    "id": i,
+                    "activity_name": "Vocabulary Quiz",
+                    "group_name": f"Group {i % 10}",
+                    "start_time": started + timedelta(minutes=i),
+                    "end_time": started + timedelta(minutes=i + 10),
+                    "review_items_count": i % 20,
+                }
+                for i in range(rows)
+            ],
+            "pagination": pagination(rows),
+        }),
+    }
+
+def paths(model, page: Dict) -> Dict[str, Callable[[], bytes]]:
+    dict_adapter = TypeAdapter(Dict)
+    typed_adapter = TypeAdapter(model)
+    return {
+        "encoder": lambda: json.dumps(jsonable_encoder(page)).encode(),
+        "dict_model": lambda: dict_adapter.dump_json(dict_adapter.validate_python(page)),
+        "typed_model": lambda: typed_adapter.dump_json(typed_adapter.validate_python(page)),
+        "orjson": lambda: ORJSONResponse(page).body,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = {}
+    for name, (model, page) in pages(args.rows).items():
+        results[name] = {}
+        for path, serialise in paths(model, page).items():
+            seconds = min(timeit.repeat(serialise, number=args.number, repeat=3)) / args.number
+            results[name][path] = round(seconds * 1e6, 1)
+        print(f"{name:<16} " + "  ".join(f"{path} {us:>7} us" for path, us in results[name].items()))
+    print(json.dumps(results))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Mixed read/write throughput with and without the SQLite performance profile.
+
+Each configuration runs in its own process against a fresh database: reader
+tasks poll the dashboard and word listings while writer tasks post reviews,
+all in-process through httpx's ASGI transport. Run from backend-fastapi:
+
+    python -m benchmarks.sqlite_profile --seconds 10 --readers 16 --writers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+READ_URLS = ["/api/dashboard/quick-stats", "/api/dashboard/study_progress", "/api/words?items_per_page=50"]
+
+def seed(word_count: int):
+    from database import engine, run_migrations, Word, Group, WordGroup, StudySession, StudyActivity
+    from database.database import SessionLocal
+
+    run_migrations(engine)
+    db = SessionLocal()
+    group = Group(name="Benchmark")
+    db.add(group)
+    db.flush()
+    activity = StudyActivity(group_id=group.id)
+    db.add(activity)
+    db.flush()
+    session = StudySession(group_id=group.id, study_activity_id=activity.id)
+    db.add(session)
+    words = [Word(hungarian=f"szo{i}", english=f"word{i}", parts={}) for i in range(word_count)]
+    db.add_all(words)
+    db.flush()
+    db.add_all([WordGroup(word_id=word.id, group_id=group.id) for word in words])
+    db.commit()
+    session_id, word_ids = session.id, [word.id for word in words]
+    db.close()
+    return session_id, word_ids
+
+async def workload(args) -> dict:
+    import httpx
+    from main import app
+
+    session_id, word_ids = seed(args.words)
+    transport = httpx.ASGITransport(app=app)
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    deadline = time.perf_counter() + args.seconds
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        async def reader(n: int):
+            while time.perf_counter() < deadline:
+                response = await client.get(READ_URLS[n % len(READ_URLS)])
+                counts["reads" if response.status_code == 200 else "errors"] += 1
+                n += 1
+
+        async def writer(n: int):
+            while time.perf_counter() < deadline:
+                word_id = word_ids[n % len(word_ids)]
+                response = await client.post(
+                    f"/api/study_sessions/{session_id}/words/{word_id}/review",
+                    json={"correct": n % 3 != 0},
+                )
+                counts["writes" if response.status_code == 200 else "errors"] += 1
+                n += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *[reader(i) for i in range(args.readers)],
+            *[writer(i * 7) for i in range(args.writers)],
+        )
+        elapsed = time.perf_counter() - started
+
+    return {
+        "reads_per_second": round(counts["reads"] / elapsed, 1),
+        "writes_per_second": round(counts["writes"] / elapsed, 1),
+        "errors": counts["errors"],
+    }
+
+def run_child(profile: bool, args) -> dict:
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/benchmark.db"
+    env["SQLITE_PERFORMANCE_PROFILE"] = "true" if profile else "false"
+    command = [
+        sys.executable, "-m", "benchmarks.sqlite_profile", "--child",
+        "--seconds", str(args.seconds), "--readers", str(args.readers),
+        "--writers", str(args.writers), "--words", str(args.words),
+    ]
+    output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--words", type=int, default=1000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(workload(args))))
+        return
+
+    results = {
+        "default": run_child(False, args),
+        "performance_profile": run_child(True, args),
+    }
+    for name, result in results.items():
+        print(f"{name:<20} reads/s {result['reads_per_second']:>8}  writes/s {result['writes_per_second']:>8}  errors {result['errors']}")
+    print(json.dumps(results))
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,60 @@
-from .database import Base, engine, get_db
-from .models import Word, WordGroup, Group, StudySession, StudyActivity, WordReviewItem
+from .database import Base, engine, get_db, db_handler, on_commit
+from .models import Word, WordGroup, Group, StudySession, StudyActivity, WordReviewItem, WordStats, WordSchedule, DailyActivity, SchemaMigration
 from .config import get_settings
+from .queries import word_stats_query, group_word_counts_query, session_listing_query
+from .migrations import run_migrations
+from .reviews import ReviewRecord, record_reviews, utc_timestamp
+from .activity import study_day, study_streak, activity_series, rebuild_daily_activity
+from .review_buffer import review_buffer
+from .cache import dashboard_cache
+from .data_version import data_version
+from .vocabulary import VocabularyFormatError, decode_lines, parse_vocabulary, import_vocabulary, export_vocabulary
+from .search import search_words, drop_search_index
+from .scheduler import due_words, clear_word_schedules, rebuild_word_schedules
+from .stats import record_review_stats, clear_word_stats, rebuild_word_stats
 
 __all__ = [
     'Base',
     'engine',
     'get_db',
+    'db_handler',
+    'on_commit',
     'get_settings',
+    'run_migrations',
+    'word_stats_query',
+    'group_word_counts_query',
+    'session_listing_query',
+    'ReviewRecord',
+    'record_reviews',
+    'utc_timestamp',
+    'review_buffer',
+    'study_day',
+    'study_streak',
+    'activity_series',
+    'rebuild_daily_activity',
+    'dashboard_cache',
+    'data_version',
+    'search_words',
+    'drop_search_index',
+    'VocabularyFormatError',
+    'decode_lines',
+    'parse_vocabulary',
+    'import_vocabulary',
+    'export_vocabulary',
+    'record_review_stats',
+    'clear_word_stats',
+    'rebuild_word_stats',
+    'due_words',
+    'clear_word_schedules',
+    'rebuild_word_schedules',
     'Word',
     'WordGroup',
     'Group',
     'StudySession',
     'StudyActivity',
-    'WordReviewItem'
+    'WordReviewItem',
+    'WordStats',
+    'WordSchedule',
+    'DailyActivity',
+    'SchemaMigration'
 ]
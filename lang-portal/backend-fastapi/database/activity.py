@@ -0,0 +1,131 @@
+"""
+Per-day study activity rollup.
+
+daily_activity holds one row per study day with its session, review and
+correct-review counts. Days are calendar days in STUDY_DAY_TIMEZONE. Reviews
+update the rollup in record_reviews and new study sessions through a mapper
+event, so streaks and activity calendars cost O(days) rather than a scan of
+every timestamp. Changing the timezone requires rebuild_daily_activity.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+from sqlalchemy import delete, event, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from .cache import dashboard_cache, STUDY_STREAK
+from .config import get_settings
+from .models import DailyActivity, StudySession, WordReviewItem
+
+settings = get_settings()
+
+study_timezone = ZoneInfo(settings.STUDY_DAY_TIMEZONE)
+
+def study_day(timestamp: Optional[datetime] = None) -> date:
+    """
+    The study day a naive UTC timestamp falls on; None means today.
+    """
+    if timestamp is None:
+        return datetime.now(study_timezone).date()
+    return timestamp.replace(tzinfo=timezone.utc).astimezone(study_timezone).date()
+
+def _upsert_statement():
+    statement = sqlite_insert(DailyActivity)
+    return statement.on_conflict_do_update(
+        index_elements=[DailyActivity.day],
+        set_={
+            "sessions": DailyActivity.sessions + statement.excluded.sessions,
+            "reviews": DailyActivity.reviews + statement.excluded.reviews,
+            "correct": DailyActivity.correct + statement.excluded.correct,
+        },
+    )
+
+def record_daily_reviews(db: Session, reviews: Iterable):
+    """
+    Add reviews (objects with correct and reviewed_at) to their days' totals
+    with one executemany upsert in the caller's transaction.
+    """
+    per_day: Dict[date, Dict] = {}
+    for review in reviews:
+        day = study_day(review.reviewed_at)
+        totals = per_day.setdefault(day, {"day": day, "sessions": 0, "reviews": 0, "correct": 0})
+        totals["reviews"] += 1
+        totals["correct"] += 1 if review.correct else 0
+    if per_day:
+        db.execute(_upsert_statement(), list(per_day.values()))
+
+@event.listens_for(StudySession, "after_insert")
+def _record_daily_session(mapper, connection, target):
+    # created_at is usually filled in by the database default and not loaded yet
+    created_at = target.__dict__.get("created_at")
+    day = study_day(created_at) if isinstance(created_at, datetime) else study_day()
+    connection.execute(_upsert_statement(), [{"day": day, "sessions": 1, "reviews": 0, "correct": 0}])
+    dashboard_cache.invalidate(STUDY_STREAK)
+
+def rebuild_daily_activity(db: Session) -> int:
+    """
+    Recompute daily_activity from study_sessions and word_review_items.
+
+    History is streamed in chunks and folded per day, so memory stays
+    proportional to the number of days. Returns the number of days.
+    """
+    totals = defaultdict(lambda: {"sessions": 0, "reviews": 0, "correct": 0})
+    for (created_at,) in db.query(StudySession.created_at).yield_per(10000):
+        if created_at is not None:
+            totals[study_day(created_at)]["sessions"] += 1
+    for created_at, correct in db.query(WordReviewItem.created_at, WordReviewItem.correct).yield_per(10000):
+        if created_at is not None:
+            day = totals[study_day(created_at)]
+            day["reviews"] += 1
+            day["correct"] += 1 if correct else 0
+
+    db.execute(delete(DailyActivity))
+    if totals:
+        db.execute(insert(DailyActivity), [{"day": day, **counts} for day, counts in totals.items()])
+    return len(totals)
+
+def study_streak(db: Session, today: Optional[date] = None) -> int:
+    """
+    Number of consecutive days with activity ending today, or ending
+    yesterday when nothing has been studied yet today.
+    """
+    today = today or study_day()
+    active_days = db.query(DailyActivity.day).filter(
+        DailyActivity.day <= today,
+        (DailyActivity.sessions > 0) | (DailyActivity.reviews > 0)
+    ).order_by(DailyActivity.day.desc())
+
+    streak = 0
+    expected = None
+    for (day,) in active_days.yield_per(64):
+        if expected is None:
+            if day < today - timedelta(days=1):
+                return 0
+            expected = day
+        if day != expected:
+            break
+        streak += 1
+        expected = day - timedelta(days=1)
+    return streak
+
+def activity_series(db: Session, start: date, end: date) -> List[Dict]:
+    """
+    Activity for every day from start to end inclusive, with zeros for idle days.
+    """
+    rows = {
+        row.day: row
+        for row in db.query(DailyActivity).filter(DailyActivity.day >= start, DailyActivity.day <= end)
+    }
+    series = []
+    day = start
+    while day <= end:
+        row = rows.get(day)
+        series.append({
+            "date": day,
+            "sessions": row.sessions if row else 0,
+            "reviews": row.reviews if row else 0,
+            "correct": row.correct if row else 0
+        })
+        day += timedelta(days=1)
+    return series
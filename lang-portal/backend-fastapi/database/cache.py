@@ -0,0 +1,147 @@
+"""
+Cache for dashboard aggregates.
+
+Values live in a pluggable CacheBackend (in-process memory by default) for
+at most DASHBOARD_CACHE_TTL_SECONDS. Each value is stored with the data
+version it was computed at and only served while that version is current,
+so a write in any worker, or in another process, retires it at once.
+Resets and vocabulary changes also invalidate the affected entries.
+"""
+import importlib
+import time
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from .config import get_settings
+from .data_version import data_version
+
+settings = get_settings()
+
+QUICK_STATS = "quick_stats"
+STUDY_PROGRESS = "study_progress"
+LAST_STUDY_SESSION = "last_study_session"
+STUDY_STREAK = "study_streak"
+
+class CacheBackend(ABC):
+    """
+    Storage interface for DashboardCache. Implementations must be thread-safe.
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, ttl: float):
+        ...
+
+    @abstractmethod
+    def delete(self, key: Hashable):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def load_backend(name: str) -> CacheBackend:
+    """
+    Resolve DASHBOARD_CACHE_BACKEND: "memory" or a "module:ClassName" path
+    to a CacheBackend subclass. A class missing one of the methods fails
+    here, at startup, rather than on the first cache call.
+    """
+    if name == "memory":
+        return MemoryCacheBackend()
+    module_name, _, class_name = name.partition(":")
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+    if not (isinstance(backend_class, type) and issubclass(backend_class, CacheBackend)):
+        raise TypeError(f"DASHBOARD_CACHE_BACKEND {name} is not a CacheBackend subclass")
+    return backend_class()
+
+class DashboardCache:
+    def __init__(self, backend: CacheBackend, ttl: float, version: Callable[[], str]):
+        self.backend = backend
+        self.ttl = ttl
+        self.version = version
+        self._lock = Lock()
+        # Bumped by every invalidation, so a value computed from data read
+        # before one is not stored afterwards
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, computing and storing it on a miss.
+        The version is read before computing, so a write that commits
+        meanwhile leaves the value stamped with the older version. Nor is it
+        stored if the cache was invalidated while it was being computed.
+        """
+        if self.ttl <= 0:
+            return compute()
+        version = self.version()
+        entry = self.backend.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        with self._lock:
+            generation = self._generation
+        value = compute()
+        with self._lock:
+            if generation == self._generation:
+                self.backend.set(key, (version, value), self.ttl)
+        return value
+
+    def invalidate(self, *keys: Hashable):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self.backend.delete(key)
+
+    def invalidate_all(self):
+        with self._lock:
+            self._generation += 1
+            self.backend.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+dashboard_cache = DashboardCache(
+    backend=load_backend(settings.DASHBOARD_CACHE_BACKEND),
+    ttl=settings.DASHBOARD_CACHE_TTL_SECONDS,
+    version=data_version.token
+)
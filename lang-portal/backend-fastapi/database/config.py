@@ -1,22 +1,109 @@
 from pydantic_settings import BaseSettings
+from sqlalchemy.engine import make_url
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Optional, Union
 
 class Settings(BaseSettings):
     # Database settings
     DATABASE_URL: str = "sqlite:///./words.db"
     DATABASE_CONNECT_DICT: dict = {"check_same_thread": False}
+    # Serve requests through an aiosqlite AsyncSession instead of the threadpool
+    DATABASE_ASYNC: bool = False
+    # Defaults to DATABASE_URL with the sqlite+aiosqlite driver
+    ASYNC_DATABASE_URL: Optional[str] = None
+    
+    # Connection pool sizing
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    
+    # SQLite performance profile: WAL journal, relaxed fsync and larger caches,
+    # applied as pragmas on every new connection
+    SQLITE_PERFORMANCE_PROFILE: bool = False
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268435456  # bytes (256 MiB)
+    SQLITE_CACHE_SIZE: int = -65536  # negative values are KiB (64 MiB)
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    
+    # Write-behind buffer for single review submissions
+    REVIEW_BUFFER_ENABLED: bool = False
+    REVIEW_BUFFER_BATCH_SIZE: int = 500
+    REVIEW_BUFFER_MAX_DELAY_MS: int = 250
+    # Reviews beyond this many queued are written synchronously instead
+    REVIEW_BUFFER_MAX_SIZE: int = 10000
+    
+    # Dashboard aggregate cache; 0 disables caching
+    DASHBOARD_CACHE_TTL_SECONDS: int = 60
+    # "memory" or a "module:ClassName" implementing database.cache.CacheBackend
+    DASHBOARD_CACHE_BACKEND: str = "memory"
+    
+    # Rendered GET responses kept per URL for the current data version;
+    # 0 keeps only the ETag revalidation
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    
+    # Timezone whose calendar days are used for streaks and activity series
+    STUDY_DAY_TIMEZONE: str = "UTC"
+    
+    # Statements slower than this are logged by the database.slow_query
+    # logger; 0 disables the log
+    SLOW_QUERY_THRESHOLD_MS: float = 100
+    # Add per-request SQL and handler timings as a Server-Timing header
+    SERVER_TIMING_ENABLED: bool = True
+    
+    # Server settings used by serve.py
+    HOST: str = "127.0.0.1"
+    PORT: int = 8000
+    # 0 starts one worker per available CPU core
+    WORKERS: int = 0
+    # Seconds to let in-flight requests finish after SIGTERM/SIGINT
+    SHUTDOWN_TIMEOUT_SECONDS: int = 30
+    # serve.py migrates once before forking and turns this off for workers
+    RUN_MIGRATIONS_ON_STARTUP: bool = True
+    # Shared data version file for multi-worker ETags; serve.py sets it
+    DATA_VERSION_FILE: Optional[str] = None
     
     # API settings
     API_TITLE: str = "Language Learning Portal API"
     API_VERSION: str = "1.0.0"
     API_DESCRIPTION: str = "API for managing language learning, study sessions, and vocabulary"
     
+    # Pagination settings
+    # Seconds to cache listing totals for; 0 counts on every request
+    PAGINATION_COUNT_CACHE_SECONDS: int = 0
+    
     # CORS settings
     ALLOWED_ORIGINS: List[str] = ["*"]
     ALLOWED_METHODS: List[str] = ["*"]
     ALLOWED_HEADERS: List[str] = ["*"]
     
+    @property
+    def sqlite_pragmas(self) -> Dict[str, Union[str, int]]:
+        if not self.SQLITE_PERFORMANCE_PROFILE:
+            return {}
+        return {
+            "journal_mode": self.SQLITE_JOURNAL_MODE,
+            "synchronous": self.SQLITE_SYNCHRONOUS,
+            "mmap_size": self.SQLITE_MMAP_SIZE,
+            "cache_size": self.SQLITE_CACHE_SIZE,
+            "busy_timeout": self.SQLITE_BUSY_TIMEOUT_MS,
+        }
+    
+    @property
+    def async_database_url(self) -> str:
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        return self.DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    
+    def pool_args(self, url: str) -> Dict[str, int]:
+        # In-memory SQLite gets a single-connection pool that takes no sizing
+        parsed = make_url(url)
+        in_memory = parsed.get_backend_name() == "sqlite" and (
+            parsed.database in (None, "", ":memory:") or parsed.query.get("mode") == "memory"
+        )
+        if in_memory:
+            return {}
+        return {"pool_size": self.DATABASE_POOL_SIZE, "max_overflow": self.DATABASE_MAX_OVERFLOW}
+    
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,162 @@
+"""
+Data version for HTTP validators.
+
+Every committed transaction that wrote something bumps the version once
+its commit has finished. Writes are noticed through engine events, so it
+covers ORM flushes, Core statements, raw SQL and DDL alike. Commits from
+other processes (manage.py commands, other tools) are picked up through
+SQLite's PRAGMA data_version on a read-only watcher connection, checked
+whenever a token is handed out. The epoch is random per process, so a
+version number from an earlier run never matches.
+
+With DATA_VERSION_FILE set, epoch and counter live in that memory-mapped
+file instead, so every worker started by serve.py shares one version and a
+write in any of them changes the ETags all of them hand out.
+"""
+import mmap
+import os
+import secrets
+import sqlite3
+import struct
+import threading
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from .config import get_settings
+from .database import engine, async_engine
+
+settings = get_settings()
+
+# Statements that never change data; anything else marks the transaction
+READ_ONLY_STATEMENTS = ("SELECT", "PRAGMA")
+
+# Shared file layout: 8-byte epoch followed by a little-endian 64-bit counter
+_EPOCH_SIZE = 8
+_COUNTER = struct.Struct("<Q")
+_FILE_SIZE = _EPOCH_SIZE + _COUNTER.size
+
+def sqlite_file(url: str) -> Optional[str]:
+    """
+    Path of the SQLite database file behind url, None for anything else.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or parsed.database in (None, "", ":memory:"):
+        return None
+    return os.path.abspath(parsed.database)
+
+class DataVersion:
+    def __init__(self, path: Optional[str] = None, database: Optional[str] = None):
+        self._lock = threading.Lock()
+        # Read-only connection to the database file; its PRAGMA data_version
+        # changes whenever any other connection, in any process, commits
+        self._database = database
+        self._watcher: Optional[sqlite3.Connection] = None
+        self._watcher_lock = threading.Lock()
+        self._seen: Optional[int] = None
+        self._file = None
+        self._map = None
+        if path:
+            # Missing when DATA_VERSION_FILE is set outside serve.py
+            self.create_file(path, replace=False)
+            self._file = open(path, "r+b")
+            self._map = mmap.mmap(self._file.fileno(), _FILE_SIZE)
+            self.epoch = self._map[:_EPOCH_SIZE].hex()
+        else:
+            self.epoch = secrets.token_hex(_EPOCH_SIZE // 2)
+            self._value = 0
+        if database:
+            self.check_external_writes()
+
+    @staticmethod
+    def create_file(path: str, replace: bool = True):
+        """
+        Initialise a shared version file with a fresh epoch. The file only
+        appears once fully written, so a process opening it concurrently
+        never maps a short file. Without replace an existing file is kept.
+        """
+        partial = f"{path}.{os.getpid()}.tmp"
+        with open(partial, "wb") as version_file:
+            version_file.write(os.urandom(_EPOCH_SIZE) + _COUNTER.pack(0))
+        if replace:
+            os.replace(partial, path)
+            return
+        try:
+            os.link(partial, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(partial)
+
+    @property
+    def value(self) -> int:
+        if self._map is None:
+            return self._value
+        return _COUNTER.unpack_from(self._map, _EPOCH_SIZE)[0]
+
+    def bump(self):
+        with self._lock:
+            if self._map is None:
+                self._value += 1
+                return
+            import fcntl
+            # Serialise the read-modify-write across worker processes
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+            try:
+                _COUNTER.pack_into(self._map, _EPOCH_SIZE, self.value + 1)
+            finally:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def check_external_writes(self):
+        """
+        Bump the version if the database changed since the last check.
+        Also sees this process's own commits, which only costs an extra bump.
+        """
+        with self._watcher_lock:
+            try:
+                if self._watcher is None:
+                    self._watcher = sqlite3.connect(
+                        f"file:{self._database}?mode=ro", uri=True, check_same_thread=False
+                    )
+                seen = self._watcher.execute("PRAGMA data_version").fetchone()[0]
+            except sqlite3.Error:
+                # Not created yet; the first successful check sets the baseline
+                return
+            changed = self._seen is not None and seen != self._seen
+            self._seen = seen
+        if changed:
+            self.bump()
+
+    def token(self) -> str:
+        if self._database:
+            self.check_external_writes()
+        return f"{self.epoch}-{self.value}"
+
+data_version = DataVersion(settings.DATA_VERSION_FILE, sqlite_file(settings.DATABASE_URL))
+
+def _mark_write(conn, cursor, statement, parameters, context, executemany):
+    if not statement.lstrip()[:6].upper().startswith(READ_ONLY_STATEMENTS):
+        conn.info["data_written"] = True
+
+def _bump_after_commit(dialect):
+    """
+    Bump from the dialect's do_commit, after the DBAPI commit returns. The
+    engine "commit" event fires before it, which would let a concurrent
+    reader cache the pre-commit snapshot under the new version.
+    """
+    do_commit = dialect.do_commit
+
+    def commit(dbapi_connection):
+        do_commit(dbapi_connection)
+        if dbapi_connection.info.pop("data_written", False):
+            data_version.bump()
+
+    dialect.do_commit = commit
+
+def _forget_on_rollback(conn):
+    conn.info.pop("data_written", None)
+
+for _engine in (engine, async_engine.sync_engine if async_engine else None):
+    if _engine is not None:
+        event.listen(_engine, "after_cursor_execute", _mark_write)
+        event.listen(_engine, "rollback", _forget_on_rollback)
+        _bump_after_commit(_engine.dialect)
@@ -1,22 +1,150 @@
-from sqlalchemy import create_engine
+import functools
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from .config import get_settings
 
 settings = get_settings()
 
+slow_query_logger = logging.getLogger("database.slow_query")
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Apply the SQLite performance profile to a freshly opened connection.
+    """
+    cursor = dbapi_connection.cursor()
+    for name, value in settings.sqlite_pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args=settings.DATABASE_CONNECT_DICT
+    connect_args=settings.DATABASE_CONNECT_DICT,
+    **settings.pool_args(settings.DATABASE_URL)
 )
+event.listen(engine, "connect", _apply_sqlite_pragmas)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+class QueryStats:
+    """
+    SQL statements executed while serving one request.
+    """
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slow_count = 0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def add(self, statement: str, seconds: float, slow: bool):
+        self.count += 1
+        self.seconds += seconds
+        self.slow_count += slow
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+# Set by the instrumentation middleware for the duration of a request. The
+# object is shared with the threadpool and greenlet the handler runs in.
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+def _record_query_time(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - context._query_started
+    slow = 0 < settings.SLOW_QUERY_THRESHOLD_MS <= seconds * 1000
+    if slow:
+        slow_query_logger.warning(
+            "%.1f ms%s: %s", seconds * 1000, " (executemany)" if executemany else "", statement
+        )
+    stats = query_stats.get()
+    if stats is not None:
+        stats.add(statement, seconds, slow)
+
+def instrument_engine(sync_engine):
+    """
+    Time every statement the engine executes, for query_stats and the
+    slow-query log.
+    """
+    event.listen(sync_engine, "before_cursor_execute", _start_query_timer)
+    event.listen(sync_engine, "after_cursor_execute", _record_query_time)
+
+instrument_engine(engine)
+
+# Async engine used by the request handlers when DATABASE_ASYNC is enabled.
+# Migrations and maintenance commands keep using the sync engine above.
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        settings.async_database_url,
+        connect_args=settings.DATABASE_CONNECT_DICT,
+        **settings.pool_args(settings.async_database_url)
+    )
+    event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False)
+
 Base = declarative_base()
 
-# Dependency
-def get_db():
+def on_commit(db: Session, callback):
+    """
+    Run callback once the session's current transaction commits.
+    Callbacks are dropped if the transaction rolls back instead.
+    """
+    db.info.setdefault("on_commit", []).append(callback)
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_callbacks(db: Session):
+    for callback in db.info.pop("on_commit", []):
+        callback()
+
+@event.listens_for(Session, "after_rollback")
+def _drop_commit_callbacks(db: Session):
+    db.info.pop("on_commit", None)
+
+# Dependencies
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+get_db = get_async_db if settings.DATABASE_ASYNC else get_sync_db
+
+def db_handler(handler):
+    """
+    Adapt a route handler written against a sync Session to the configured
+    database mode.
+
+    In the default sync mode the handler is returned unchanged and FastAPI
+    runs it in its threadpool. With DATABASE_ASYNC the handler becomes a
+    coroutine that receives an AsyncSession from get_db and runs the body
+    through AsyncSession.run_sync, so requests stay on the event loop and
+    all I/O goes through aiosqlite.
+
+    Handlers that block for long outside the database are left as plain
+    threadpool handlers in both modes: the vocabulary import and export,
+    which read the upload or stream the body through their own session,
+    and full_reset, which rebuilds the schema through the sync engine.
+    """
+    if not settings.DATABASE_ASYNC:
+        return handler
+
+    @functools.wraps(handler)
+    async def async_handler(*args, db, **kwargs):
+        return await db.run_sync(lambda session: handler(*args, db=session, **kwargs))
+
+    return async_handler
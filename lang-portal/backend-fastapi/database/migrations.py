@@ -0,0 +1,73 @@
+"""
+Versioned schema migrations.
+
+Each migration is a (version, description, upgrade) entry in MIGRATIONS and
+runs exactly once per database, in its own transaction. Applied versions are
+recorded in the schema_migrations table. Migrations must cope with objects
+that a fresh database already got from migration 1, so declarative indexes
+are created with checkfirst and raw SQL uses IF NOT EXISTS. Objects that
+are not part of the models, like the FTS5 search tables, are only created
+here.
+
+To change the schema, update the models and append a new migration; never
+edit one that has already shipped.
+"""
+from typing import Callable, List, Tuple
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from .database import Base
+from .activity import rebuild_daily_activity
+from .search import create_search_index, rebuild_prefix_index
+from .models import WordGroup, StudySession, WordReviewItem, WordSchedule, DailyActivity, SchemaMigration
+from .scheduler import rebuild_word_schedules
+from .stats import rebuild_word_stats
+
+def _create_schema(connection: Connection):
+    Base.metadata.create_all(bind=connection)
+
+def _create_hot_column_indexes(connection: Connection):
+    for model in (WordGroup, StudySession, WordReviewItem):
+        for index in model.__table__.indexes:
+            index.create(bind=connection, checkfirst=True)
+
+def _backfill_word_stats(connection: Connection):
+    rebuild_word_stats(Session(bind=connection))
+
+def _create_daily_activity(connection: Connection):
+    DailyActivity.__table__.create(bind=connection, checkfirst=True)
+    rebuild_daily_activity(Session(bind=connection))
+
+def _create_word_schedules(connection: Connection):
+    WordSchedule.__table__.create(bind=connection, checkfirst=True)
+    rebuild_word_schedules(Session(bind=connection))
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Create missing tables", _create_schema),
+    (2, "Add words_groups, review and session indexes", _create_hot_column_indexes),
+    (3, "Backfill word_stats from review history", _backfill_word_stats),
+    (4, "Create and backfill daily_activity", _create_daily_activity),
+    (5, "Create FTS5 word search index", create_search_index),
+    (6, "Create word_schedules and replay review history", _create_word_schedules),
+    (7, "Add a one-letter prefix index to word search", rebuild_prefix_index),
+]
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Apply all pending migrations and return the versions that were applied.
+    """
+    with engine.begin() as connection:
+        SchemaMigration.__table__.create(bind=connection, checkfirst=True)
+        applied = set(connection.execute(select(SchemaMigration.version)).scalars())
+
+    newly_applied = []
+    for version, description, upgrade in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as connection:
+            upgrade(connection)
+            connection.execute(
+                insert(SchemaMigration).values(version=version, description=description)
+            )
+        newly_applied.append(version)
+    return newly_applied
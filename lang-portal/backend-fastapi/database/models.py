@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, Boolean, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -13,6 +13,7 @@ class Word(Base):
     
     groups = relationship('Group', secondary='words_groups', back_populates='words')
     review_items = relationship('WordReviewItem', back_populates='word')
+    stats = relationship('WordStats', back_populates='word', uselist=False)
 
 class WordGroup(Base):
     __tablename__ = "words_groups"
@@ -21,6 +22,11 @@ class WordGroup(Base):
     word_id = Column(Integer, ForeignKey('words.id'))
     group_id = Column(Integer, ForeignKey('groups.id'))
 
+    __table_args__ = (
+        Index('ix_words_groups_group_id_word_id', 'group_id', 'word_id'),
+        Index('ix_words_groups_word_id_group_id', 'word_id', 'group_id'),
+    )
+
 class Group(Base):
     __tablename__ = "groups"
 
@@ -56,6 +62,12 @@ class StudySession(Base):
     study_activity = relationship('StudyActivity', back_populates='study_sessions')
     word_review_items = relationship('WordReviewItem', back_populates='study_session')
 
+    __table_args__ = (
+        Index('ix_study_sessions_group_id_created_at', 'group_id', 'created_at'),
+        Index('ix_study_sessions_study_activity_id_created_at', 'study_activity_id', 'created_at'),
+        Index('ix_study_sessions_created_at', 'created_at'),
+    )
+
 class WordReviewItem(Base):
     __tablename__ = "word_review_items"
 
@@ -67,3 +79,48 @@ class WordReviewItem(Base):
     
     word = relationship('Word', back_populates='review_items')
     study_session = relationship('StudySession', back_populates='word_review_items')
+
+    __table_args__ = (
+        Index('ix_word_review_items_word_id_correct', 'word_id', 'correct'),
+        Index('ix_word_review_items_study_session_id', 'study_session_id'),
+        Index('ix_word_review_items_created_at', 'created_at'),
+    )
+
+class WordStats(Base):
+    __tablename__ = "word_stats"
+
+    word_id = Column(Integer, ForeignKey('words.id'), primary_key=True)
+    correct_count = Column(Integer, nullable=False, default=0)
+    wrong_count = Column(Integer, nullable=False, default=0)
+    last_reviewed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    word = relationship('Word', back_populates='stats')
+
+class WordSchedule(Base):
+    __tablename__ = "word_schedules"
+
+    word_id = Column(Integer, ForeignKey('words.id'), primary_key=True)
+    ease = Column(Float, nullable=False, default=2.5)
+    interval_days = Column(Float, nullable=False, default=0)
+    repetitions = Column(Integer, nullable=False, default=0)
+    due_at = Column(DateTime(timezone=True), nullable=False)
+    last_reviewed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('ix_word_schedules_due_at', 'due_at'),
+    )
+
+class DailyActivity(Base):
+    __tablename__ = "daily_activity"
+
+    day = Column(Date, primary_key=True)
+    sessions = Column(Integer, nullable=False, default=0)
+    reviews = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True)
+    description = Column(String, nullable=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,74 @@
+from sqlalchemy.orm import Session, Query
+from sqlalchemy.sql import func
+from .models import WordStats, WordGroup, Group, StudyActivity, WordReviewItem
+
+def word_stats_query(db: Session, words: Query) -> Query:
+    """
+    Attach review statistics to a (usually paginated) query of words.
+
+    The counts are read from the materialized word_stats table, so the cost
+    of a page depends on its size only and not on how much review history
+    exists. Rows expose id, hungarian, english, correct_count and wrong_count.
+    """
+    page = words.subquery()
+
+    return (
+        db.query(
+            page.c.id,
+            page.c.hungarian,
+            page.c.english,
+            func.coalesce(WordStats.correct_count, 0).label("correct_count"),
+            func.coalesce(WordStats.wrong_count, 0).label("wrong_count"),
+        )
+        .outerjoin(WordStats, WordStats.word_id == page.c.id)
+        .order_by(page.c.id)
+    )
+
+def group_word_counts_query(db: Session, groups: Query) -> Query:
+    """
+    Attach word counts to a (usually paginated) query of groups.
+
+    Counts come from one grouped COUNT over words_groups, which is answered
+    from the (group_id, word_id) index without loading any Word rows.
+    Rows expose id, name and word_count.
+    """
+    page = groups.subquery()
+
+    return (
+        db.query(
+            page.c.id,
+            page.c.name,
+            func.count(WordGroup.word_id).label("word_count"),
+        )
+        .outerjoin(WordGroup, WordGroup.group_id == page.c.id)
+        .group_by(page.c.id, page.c.name)
+        .order_by(page.c.id)
+    )
+
+def session_listing_query(db: Session, sessions: Query) -> Query:
+    """
+    Attach group name, activity name and review count to a (usually
+    paginated) query of study sessions.
+
+    Groups and activities are joined and reviews counted with one grouped
+    outer join over the page, so a listing is a single statement and never
+    lazy-loads relationships or review rows. Rows expose id, created_at,
+    end_time, group_name, activity_name and review_items_count.
+    """
+    page = sessions.subquery()
+
+    return (
+        db.query(
+            page.c.id,
+            page.c.created_at,
+            page.c.end_time,
+            Group.name.label("group_name"),
+            StudyActivity.name.label("activity_name"),
+            func.count(WordReviewItem.id).label("review_items_count"),
+        )
+        .outerjoin(Group, Group.id == page.c.group_id)
+        .outerjoin(StudyActivity, StudyActivity.id == page.c.study_activity_id)
+        .outerjoin(WordReviewItem, WordReviewItem.study_session_id == page.c.id)
+        .group_by(page.c.id, page.c.created_at, page.c.end_time, Group.name, StudyActivity.name)
+        .order_by(page.c.created_at, page.c.id)
+    )
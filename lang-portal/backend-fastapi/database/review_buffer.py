@@ -0,0 +1,190 @@
+"""
+Optional write-behind buffer for single review submissions.
+
+When REVIEW_BUFFER_ENABLED is set, create_word_review acknowledges a review
+as soon as it is queued here. A background task started from the app's
+lifespan flushes the queue to word_review_items in batches, whenever
+REVIEW_BUFFER_BATCH_SIZE reviews are waiting or REVIEW_BUFFER_MAX_DELAY_MS
+has passed, and drains it on shutdown.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from itertools import groupby
+from threading import Lock
+from typing import Deque, Dict, List, Optional, Tuple
+from sqlalchemy.exc import OperationalError
+from .config import get_settings
+from .database import SessionLocal
+from .reviews import ReviewRecord, record_reviews
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+class ReviewBuffer:
+    def __init__(self, batch_size: int, max_delay_ms: int, max_size: int):
+        self.batch_size = batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.max_size = max_size
+        self._items: Deque[Tuple[int, ReviewRecord]] = deque()
+        self._items_lock = Lock()
+        # Held while a batch is written so discard_pending can wait for it
+        self._write_lock = Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._flushes = 0
+        self._flushed_reviews = 0
+        self._failed_reviews = 0
+        self._flush_seconds_total = 0.0
+        self._last_flush_seconds = 0.0
+        self._max_flush_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._stopping
+
+    def start(self):
+        """
+        Start the flush task on the running event loop.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the flush task and write everything still queued.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        await self.flush()
+
+    def submit(self, session_id: int, review: ReviewRecord) -> bool:
+        """
+        Queue a review for writing. Safe to call from any thread.
+
+        Returns False when the buffer is not running or is full, in which
+        case the caller should write the review itself.
+        """
+        if not self.running:
+            return False
+        with self._items_lock:
+            if len(self._items) >= self.max_size:
+                return False
+            self._items.append((session_id, review))
+            depth = len(self._items)
+        if depth >= self.batch_size:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return True
+
+    def discard_pending(self) -> int:
+        """
+        Drop queued reviews, waiting for an in-flight batch to finish first.
+        Batches are only taken off the queue under the same lock, so nothing
+        popped before the reset is written after it. Used when study history
+        is reset. Returns the number dropped.
+        """
+        with self._write_lock, self._items_lock:
+            dropped = len(self._items)
+            self._items.clear()
+        return dropped
+
+    async def flush(self):
+        """
+        Write all queued reviews in batches of at most batch_size.
+        """
+        while self._items:
+            await asyncio.to_thread(self._write_next)
+
+    def metrics(self) -> Dict:
+        with self._items_lock:
+            depth = len(self._items)
+        return {
+            "enabled": self.running,
+            "queue_depth": depth,
+            "flushes": self._flushes,
+            "flushed_reviews": self._flushed_reviews,
+            "failed_reviews": self._failed_reviews,
+            "last_flush_ms": round(self._last_flush_seconds * 1000, 2),
+            "max_flush_ms": round(self._max_flush_seconds * 1000, 2),
+            "avg_flush_ms": round(self._flush_seconds_total / self._flushes * 1000, 2) if self._flushes else 0.0,
+        }
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.max_delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Review buffer flush failed")
+
+    def _write_next(self):
+        """
+        Write the next batch. Reviews of a session that fails on its own are
+        dropped and logged, under a savepoint so the rest of the batch still
+        commits. If the database itself is unavailable (locked, I/O error)
+        the whole batch goes back to the front of the queue for the next
+        flush.
+        """
+        started = time.perf_counter()
+        with self._write_lock:
+            with self._items_lock:
+                batch = [self._items.popleft() for _ in range(min(self.batch_size, len(self._items)))]
+            if not batch:
+                return
+            written = 0
+            dropped = set()
+            db = SessionLocal()
+            try:
+                batch.sort(key=lambda item: item[0])
+                for session_id, items in groupby(batch, key=lambda item: item[0]):
+                    items = list(items)
+                    # on_commit callbacks queued before the savepoint
+                    callbacks = len(db.info.get("on_commit", []))
+                    savepoint = db.begin_nested()
+                    try:
+                        record_reviews(db, session_id, [review for _, review in items])
+                        savepoint.commit()
+                    except OperationalError:
+                        raise
+                    except Exception:
+                        savepoint.rollback()
+                        del db.info.get("on_commit", [])[callbacks:]
+                        dropped.add(session_id)
+                        self._failed_reviews += len(items)
+                        logger.exception("Dropped %d buffered reviews of study session %d", len(items), session_id)
+                    else:
+                        written += len(items)
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._items_lock:
+                    self._items.extendleft(reversed([item for item in batch if item[0] not in dropped]))
+                raise
+            finally:
+                db.close()
+        elapsed = time.perf_counter() - started
+        self._flushes += 1
+        self._flushed_reviews += written
+        self._flush_seconds_total += elapsed
+        self._last_flush_seconds = elapsed
+        self._max_flush_seconds = max(self._max_flush_seconds, elapsed)
+
+review_buffer = ReviewBuffer(
+    batch_size=settings.REVIEW_BUFFER_BATCH_SIZE,
+    max_delay_ms=settings.REVIEW_BUFFER_MAX_DELAY_MS,
+    max_size=settings.REVIEW_BUFFER_MAX_SIZE
+)
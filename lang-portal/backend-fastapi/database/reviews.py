@@ -0,0 +1,54 @@
+from datetime import datetime, timezone
+from typing import List, NamedTuple, Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from .activity import record_daily_reviews
+from .models import WordReviewItem
+from .scheduler import record_review_schedules
+from .stats import record_review_stats
+
+class ReviewRecord(NamedTuple):
+    word_id: int
+    correct: bool
+    reviewed_at: datetime
+
+def utc_timestamp(value: Optional[datetime] = None) -> datetime:
+    """
+    Normalise a timestamp to naive UTC, the form SQLite stores and compares.
+    Naive values are assumed to be UTC already; None means now.
+    """
+    if value is None:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def record_reviews(db: Session, session_id: int, reviews: List[ReviewRecord]) -> int:
+    """
+    Store reviews of a study session and update everything derived from them.
+
+    All review rows go in with a single executemany INSERT and the derived
+    per-word counters, spaced-repetition schedules and per-day totals with
+    one upsert each, all in the caller's transaction.
+    Every write path for reviews goes through here. Returns the number of
+    reviews stored.
+    """
+    if not reviews:
+        return 0
+
+    db.execute(
+        insert(WordReviewItem),
+        [
+            {
+                "word_id": review.word_id,
+                "study_session_id": session_id,
+                "correct": review.correct,
+                "created_at": review.reviewed_at,
+            }
+            for review in reviews
+        ],
+    )
+    record_review_stats(db, reviews)
+    record_review_schedules(db, reviews)
+    record_daily_reviews(db, reviews)
+    return len(reviews)
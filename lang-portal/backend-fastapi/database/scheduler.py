@@ -0,0 +1,178 @@
+"""
+SM-2 spaced-repetition scheduler.
+
+word_schedules holds one row per reviewed word with its ease factor,
+interval and the time it is next due. Each review advances that state in
+O(1) inside record_reviews, and the due queue is read from the index on
+due_at, so choosing what to study next never touches review history.
+Words without a row have never been reviewed and count as new.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from sqlalchemy import delete, exists, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from .models import Word, WordGroup, WordReviewItem, WordSchedule
+
+INITIAL_EASE = 2.5
+MINIMUM_EASE = 1.3
+# Intervals grow geometrically; capping them keeps due_at a valid date
+MAXIMUM_INTERVAL_DAYS = 36500.0
+# Reviews are pass/fail, so they map onto two SM-2 quality grades
+CORRECT_QUALITY = 4
+WRONG_QUALITY = 1
+
+class ScheduleState(NamedTuple):
+    ease: float
+    interval_days: float
+    repetitions: int
+    due_at: Optional[datetime]
+    last_reviewed_at: Optional[datetime]
+
+NEW_WORD = ScheduleState(INITIAL_EASE, 0.0, 0, None, None)
+
+def next_state(state: ScheduleState, correct: bool, reviewed_at: datetime) -> ScheduleState:
+    """
+    Apply one review to a word's schedule using the SM-2 rules.
+    """
+    quality = CORRECT_QUALITY if correct else WRONG_QUALITY
+    if quality >= 3:
+        if state.repetitions == 0:
+            interval = 1.0
+        elif state.repetitions == 1:
+            interval = 6.0
+        else:
+            interval = min(state.interval_days * state.ease, MAXIMUM_INTERVAL_DAYS)
+        repetitions = state.repetitions + 1
+    else:
+        interval = 1.0
+        repetitions = 0
+    ease = max(MINIMUM_EASE, state.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return ScheduleState(ease, interval, repetitions, reviewed_at + timedelta(days=interval), reviewed_at)
+
+def _state(schedule: WordSchedule) -> ScheduleState:
+    return ScheduleState(
+        schedule.ease,
+        schedule.interval_days,
+        schedule.repetitions,
+        schedule.due_at,
+        schedule.last_reviewed_at,
+    )
+
+def _row(word_id: int, state: ScheduleState) -> Dict:
+    return {"word_id": word_id, **state._asdict()}
+
+def record_review_schedules(db: Session, reviews: Iterable):
+    """
+    Advance the schedules of reviewed words (objects with word_id, correct
+    and reviewed_at) in the caller's transaction.
+
+    Current states are loaded with one query, reviews are applied in time
+    order and the results written back with one executemany upsert.
+    """
+    reviews = sorted(reviews, key=lambda review: review.reviewed_at)
+    word_ids = {review.word_id for review in reviews}
+    if not word_ids:
+        return
+
+    states = {
+        schedule.word_id: _state(schedule)
+        for schedule in db.query(WordSchedule).filter(WordSchedule.word_id.in_(word_ids))
+    }
+    for review in reviews:
+        states[review.word_id] = next_state(states.get(review.word_id, NEW_WORD), review.correct, review.reviewed_at)
+
+    statement = sqlite_insert(WordSchedule)
+    statement = statement.on_conflict_do_update(
+        index_elements=[WordSchedule.word_id],
+        set_={column: statement.excluded[column] for column in ScheduleState._fields},
+    )
+    db.execute(statement, [_row(word_id, states[word_id]) for word_id in word_ids])
+
+def clear_word_schedules(db: Session):
+    """
+    Remove all schedules. Used when review history is deleted.
+    """
+    db.execute(delete(WordSchedule))
+
+def rebuild_word_schedules(db: Session, chunk_size: int = 10000) -> int:
+    """
+    Replay word_review_items through the scheduler to rebuild word_schedules.
+
+    Reviews are streamed in (word_id, created_at) order, so only one word's
+    state is held at a time. Returns the number of scheduled words.
+    """
+    clear_word_schedules(db)
+    reviews = db.query(
+        WordReviewItem.word_id, WordReviewItem.correct, WordReviewItem.created_at
+    ).filter(
+        WordReviewItem.word_id.is_not(None),
+        WordReviewItem.created_at.is_not(None),
+    ).order_by(WordReviewItem.word_id, WordReviewItem.created_at, WordReviewItem.id)
+
+    rows: List[Dict] = []
+    words = 0
+    current_word, state = None, NEW_WORD
+    for word_id, correct, created_at in reviews.yield_per(chunk_size):
+        if word_id != current_word:
+            if current_word is not None:
+                rows.append(_row(current_word, state))
+                words += 1
+            current_word, state = word_id, NEW_WORD
+        state = next_state(state, bool(correct), created_at)
+        if len(rows) >= chunk_size:
+            db.execute(insert(WordSchedule), rows)
+            rows = []
+    if current_word is not None:
+        rows.append(_row(current_word, state))
+        words += 1
+    if rows:
+        db.execute(insert(WordSchedule), rows)
+    return words
+
+def due_words(db: Session, group_id: Optional[int], now: datetime, limit: int, include_new: bool = True) -> List[Dict]:
+    """
+    The next words to study: due words, most overdue first, then new words
+    when there are not enough due ones.
+
+    Due words are read by walking the due_at index and stop after limit
+    matches; group membership is checked per candidate against words_groups.
+    """
+    due = db.query(Word, WordSchedule).join(
+        WordSchedule, WordSchedule.word_id == Word.id
+    ).filter(WordSchedule.due_at <= now)
+    if group_id is not None:
+        due = due.filter(exists().where(WordGroup.word_id == WordSchedule.word_id, WordGroup.group_id == group_id))
+    items = [
+        {
+            "id": word.id,
+            "hungarian": word.hungarian,
+            "english": word.english,
+            "new": False,
+            "due_at": schedule.due_at,
+            "interval_days": schedule.interval_days,
+            "ease": schedule.ease,
+        }
+        for word, schedule in due.order_by(WordSchedule.due_at).limit(limit)
+    ]
+
+    if include_new and len(items) < limit:
+        fresh = db.query(Word).filter(~exists().where(WordSchedule.word_id == Word.id))
+        if group_id is not None:
+            fresh = fresh.join(WordGroup, WordGroup.word_id == Word.id).filter(WordGroup.group_id == group_id)
+            fresh = fresh.order_by(WordGroup.word_id)
+        else:
+            fresh = fresh.order_by(Word.id)
+        items += [
+            {
+                "id": word.id,
+                "hungarian": word.hungarian,
+                "english": word.english,
+                "new": True,
+                "due_at": None,
+                "interval_days": 0.0,
+                "ease": INITIAL_EASE,
+            }
+            for word in fresh.limit(limit - len(items))
+        ]
+    return items
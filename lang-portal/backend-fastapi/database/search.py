@@ -0,0 +1,157 @@
+"""
+Full-text word search backed by SQLite FTS5.
+
+words_fts indexes hungarian and english with the unicode61 tokenizer and
+remove_diacritics, so "korte" finds "körte", and keeps 1- to 3-character
+prefix indexes for fast search-as-you-type. words_trigram indexes the same
+columns as trigrams and serves the optional fuzzy fallback for typos. Both
+are external-content tables over words, kept in sync by triggers.
+"""
+import difflib
+import re
+import sqlite3
+import unicodedata
+from typing import Dict, List
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+# The trigram tokenizer needs SQLite 3.34+
+TRIGRAM_SUPPORTED = sqlite3.sqlite_version_info >= (3, 34, 0)
+
+# Whole-word and prefix matches are each ordered from at most this many
+# candidates, taken in rowid order, which bounds the cost of short queries
+# like "ko" that match a large part of the vocabulary
+SEARCH_CANDIDATES = 1000
+FUZZY_CANDIDATES = 50
+FUZZY_MIN_SIMILARITY = 0.5
+
+WORDS_FTS_TOKENIZE = "unicode61 remove_diacritics 2"
+WORDS_FTS_PREFIX = "1 2 3"
+
+def _index_ddl(table: str, tokenize: str, prefix: str = "") -> List[str]:
+    options = f"content='words', content_rowid='id', tokenize='{tokenize}'" + (f", prefix='{prefix}'" if prefix else "")
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(hungarian, english, {options})",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_after_insert AFTER INSERT ON words BEGIN
+            INSERT INTO {table}(rowid, hungarian, english) VALUES (new.id, new.hungarian, new.english);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_after_delete AFTER DELETE ON words BEGIN
+            INSERT INTO {table}({table}, rowid, hungarian, english) VALUES ('delete', old.id, old.hungarian, old.english);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_after_update AFTER UPDATE OF hungarian, english ON words BEGIN
+            INSERT INTO {table}({table}, rowid, hungarian, english) VALUES ('delete', old.id, old.hungarian, old.english);
+            INSERT INTO {table}(rowid, hungarian, english) VALUES (new.id, new.hungarian, new.english);
+        END""",
+        f"INSERT INTO {table}({table}) VALUES ('rebuild')",
+    ]
+
+def create_search_index(connection: Connection):
+    """
+    Create (or rebuild) the search tables and their sync triggers.
+    """
+    statements = _index_ddl("words_fts", WORDS_FTS_TOKENIZE, prefix=WORDS_FTS_PREFIX)
+    if TRIGRAM_SUPPORTED:
+        statements += _index_ddl("words_trigram", "trigram case_sensitive 0")
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+def rebuild_prefix_index(connection: Connection):
+    """
+    Recreate words_fts with the current prefix indexes. Its triggers refer
+    to the table by name and are kept.
+    """
+    connection.exec_driver_sql("DROP TABLE IF EXISTS words_fts")
+    for statement in _index_ddl("words_fts", WORDS_FTS_TOKENIZE, prefix=WORDS_FTS_PREFIX):
+        connection.exec_driver_sql(statement)
+
+def drop_search_index(connection: Connection):
+    """
+    Drop the search tables, which Base.metadata does not know about.
+    Their triggers go with the words table.
+    """
+    for table in ("words_fts", "words_trigram"):
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {table}")
+
+def _normalize(value: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+def _match_query(q: str, prefix: bool) -> str:
+    # Quote every token so user input can never be FTS5 syntax
+    return " ".join(f'"{token}"' + ("*" if prefix else "") for token in re.findall(r"\w+", q))
+
+def _trigram_query(q: str) -> str:
+    trigrams = {q[i:i + 3] for i in range(len(q) - 2)}
+    return " OR ".join('"' + trigram.replace('"', '""') + '"' for trigram in sorted(trigrams))
+
+def search_words(db: Session, q: str, limit: int = 20, fuzzy: bool = False) -> List[Dict]:
+    """
+    Ranked search over hungarian and english, matching every query token as
+    a prefix and ignoring case and diacritics. Entries containing the query
+    tokens as whole words come first, ranked by bm25, then the other prefix
+    matches, shortest entries first; bm25 would read every match of a prefix
+    to weigh it. Each group is ordered within its first SEARCH_CANDIDATES
+    matches.
+
+    With fuzzy, a short result list is topped up with trigram candidates
+    re-ranked by string similarity, which tolerates typos.
+    """
+    exact = _match_query(q, prefix=False)
+    if not exact:
+        return []
+    rows = db.execute(text(
+        "SELECT w.id, w.hungarian, w.english FROM ("
+        "  SELECT rowid, rank FROM words_fts WHERE words_fts MATCH :match LIMIT :candidates"
+        ") hits JOIN words w ON w.id = hits.rowid "
+        "ORDER BY hits.rank LIMIT :limit"
+    ), {"match": exact, "candidates": SEARCH_CANDIDATES, "limit": limit}).all()
+    if len(rows) < limit:
+        rows += db.execute(text(
+            "SELECT w.id, w.hungarian, w.english FROM ("
+            "  SELECT rowid FROM words_fts WHERE words_fts MATCH :match LIMIT :candidates"
+            ") hits JOIN words w ON w.id = hits.rowid "
+            "WHERE w.id NOT IN (SELECT rowid FROM words_fts WHERE words_fts MATCH :exact) "
+            "ORDER BY length(w.hungarian) + length(w.english), w.id LIMIT :limit"
+        ), {"match": _match_query(q, prefix=True), "exact": exact, "candidates": SEARCH_CANDIDATES, "limit": limit - len(rows)}).all()
+    results = [
+        {"id": row.id, "hungarian": row.hungarian, "english": row.english, "match": "prefix"}
+        for row in rows
+    ]
+
+    if fuzzy and len(results) < limit and TRIGRAM_SUPPORTED:
+        results += _fuzzy_matches(db, q, limit - len(results), {row["id"] for row in results})
+    return results
+
+def _fuzzy_matches(db: Session, q: str, limit: int, exclude: set) -> List[Dict]:
+    trigram_match = _trigram_query(q.strip())
+    if not trigram_match:
+        return []
+    try:
+        candidates = db.execute(text(
+            "SELECT w.id, w.hungarian, w.english FROM words_trigram "
+            "JOIN words w ON w.id = words_trigram.rowid "
+            "WHERE words_trigram MATCH :match ORDER BY bm25(words_trigram) LIMIT :limit"
+        ), {"match": trigram_match, "limit": FUZZY_CANDIDATES}).all()
+    except OperationalError:
+        # Database created without trigram support
+        return []
+
+    wanted = _normalize(q)
+    scored = []
+    for row in candidates:
+        if row.id in exclude:
+            continue
+        similarity = max(
+            difflib.SequenceMatcher(None, wanted, _normalize(row.hungarian)).ratio(),
+            difflib.SequenceMatcher(None, wanted, _normalize(row.english)).ratio(),
+        )
+        if similarity >= FUZZY_MIN_SIMILARITY:
+            scored.append((similarity, row))
+    scored.sort(key=lambda item: -item[0])
+
+    return [
+        {"id": row.id, "hungarian": row.hungarian, "english": row.english, "match": "fuzzy"}
+        for _, row in scored[:limit]
+    ]
@@ -0,0 +1,69 @@
+from typing import Dict, Iterable
+from sqlalchemy import case, delete, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from .models import WordStats, WordReviewItem
+
+def record_review_stats(db: Session, reviews: Iterable):
+    """
+    Add a batch of reviews to the materialized per-word counters.
+
+    reviews are objects with word_id, correct and reviewed_at attributes.
+    They are folded per word first and applied with one executemany upsert
+    inside the caller's transaction, so the counters are committed together
+    with the review rows they describe.
+    """
+    per_word: Dict[int, Dict] = {}
+    for review in reviews:
+        stats = per_word.setdefault(review.word_id, {
+            "word_id": review.word_id,
+            "correct_count": 0,
+            "wrong_count": 0,
+            "last_reviewed_at": review.reviewed_at,
+        })
+        stats["correct_count" if review.correct else "wrong_count"] += 1
+        stats["last_reviewed_at"] = max(stats["last_reviewed_at"], review.reviewed_at)
+    if not per_word:
+        return
+
+    statement = sqlite_insert(WordStats)
+    statement = statement.on_conflict_do_update(
+        index_elements=[WordStats.word_id],
+        set_={
+            "correct_count": WordStats.correct_count + statement.excluded.correct_count,
+            "wrong_count": WordStats.wrong_count + statement.excluded.wrong_count,
+            "last_reviewed_at": func.max(
+                func.coalesce(WordStats.last_reviewed_at, statement.excluded.last_reviewed_at),
+                statement.excluded.last_reviewed_at,
+            ),
+        },
+    )
+    db.execute(statement, list(per_word.values()))
+
+def clear_word_stats(db: Session):
+    """
+    Remove all materialized counters. Used when review history is deleted.
+    """
+    db.execute(delete(WordStats))
+
+def rebuild_word_stats(db: Session) -> int:
+    """
+    Recompute the word_stats table from word_review_items.
+
+    Returns the number of words that have at least one review.
+    """
+    clear_word_stats(db)
+    aggregate = select(
+        WordReviewItem.word_id,
+        func.sum(case((WordReviewItem.correct == True, 1), else_=0)),
+        func.sum(case((WordReviewItem.correct == False, 1), else_=0)),
+        func.max(WordReviewItem.created_at),
+    ).where(WordReviewItem.word_id.is_not(None)).group_by(WordReviewItem.word_id)
+    db.execute(
+        insert(WordStats).from_select(
+            ["word_id", "correct_count", "wrong_count", "last_reviewed_at"],
+            aggregate,
+        )
+    )
+    return db.query(func.count(WordStats.word_id)).scalar()
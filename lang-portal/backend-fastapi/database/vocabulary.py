@@ -0,0 +1,210 @@
+"""
+Streaming vocabulary import and export.
+
+Records are {"hungarian", "english", "parts", "groups"} where groups is a
+list of group names. Two formats are supported:
+
+- jsonl: one JSON object per line
+- csv: a header row with hungarian, english, parts and groups columns,
+  where parts is a JSON string and groups are separated by ";"
+
+Imports are parsed incrementally and written in chunked transactions, so
+memory stays bounded by the chunk size whatever the input size. Words are
+deduplicated on (hungarian, english). Exports page through the table by
+primary key and yield one line at a time.
+"""
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from .models import Word, Group, WordGroup
+
+FORMATS = ("jsonl", "csv")
+CSV_COLUMNS = ["hungarian", "english", "parts", "groups"]
+
+class VocabularyFormatError(ValueError):
+    def __init__(self, line: int, message: str):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+        # Records committed by import_vocabulary before the error
+        self.imported = 0
+
+def decode_lines(lines: Iterable[bytes], encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Decode raw lines one at a time, so invalid bytes are reported with their
+    line number instead of failing inside a text reader's buffer.
+    """
+    for number, line in enumerate(lines, start=1):
+        try:
+            yield line.decode(encoding)
+        except UnicodeDecodeError as e:
+            raise VocabularyFormatError(number, f"not valid {encoding} (byte {e.start + 1} of the line)")
+
+def _record(line: int, data: Dict) -> Dict:
+    hungarian, english = data.get("hungarian"), data.get("english")
+    if not isinstance(hungarian, str) or not isinstance(english, str) or not hungarian or not english:
+        raise VocabularyFormatError(line, "hungarian and english are required strings")
+    groups = data.get("groups") or []
+    if not isinstance(groups, list) or not all(isinstance(name, str) for name in groups):
+        raise VocabularyFormatError(line, "groups must be a list of names")
+    return {"hungarian": hungarian, "english": english, "parts": data.get("parts"), "groups": groups}
+
+def parse_jsonl(lines: Iterable[str]) -> Iterator[Dict]:
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise VocabularyFormatError(number, f"invalid JSON ({e.msg})")
+        if not isinstance(data, dict):
+            raise VocabularyFormatError(number, "expected a JSON object")
+        yield _record(number, data)
+
+def parse_csv(lines: Iterable[str]) -> Iterator[Dict]:
+    reader = csv.DictReader(lines)
+    for row in reader:
+        number = reader.line_num
+        try:
+            parts = json.loads(row["parts"]) if row.get("parts") else None
+        except json.JSONDecodeError as e:
+            raise VocabularyFormatError(number, f"invalid parts JSON ({e.msg})")
+        groups = [name.strip() for name in (row.get("groups") or "").split(";") if name.strip()]
+        yield _record(number, {**row, "parts": parts, "groups": groups})
+
+def parse_vocabulary(lines: Iterable[str], format: str) -> Iterator[Dict]:
+    if format == "jsonl":
+        return parse_jsonl(lines)
+    if format == "csv":
+        return parse_csv(lines)
+    raise ValueError(f"Unsupported format {format!r}, expected one of {', '.join(FORMATS)}")
+
+def _chunks(records: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _word_ids(db: Session, keys: Set[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+    rows = db.query(Word.id, Word.hungarian, Word.english).filter(
+        Word.hungarian.in_({hungarian for hungarian, _ in keys})
+    )
+    return {(row.hungarian, row.english): row.id for row in rows if (row.hungarian, row.english) in keys}
+
+def _group_ids(db: Session, names: Set[str], cache: Dict[str, int]) -> int:
+    """
+    Resolve group names into cache, creating missing groups.
+    Returns the number of groups created.
+    """
+    missing = names - cache.keys()
+    if not missing:
+        return 0
+    cache.update({row.name: row.id for row in db.query(Group.id, Group.name).filter(Group.name.in_(missing))})
+    new = sorted(missing - cache.keys())
+    if new:
+        db.execute(insert(Group), [{"name": name} for name in new])
+        cache.update({row.name: row.id for row in db.query(Group.id, Group.name).filter(Group.name.in_(new))})
+    return len(new)
+
+def import_vocabulary(db: Session, records: Iterable[Dict], chunk_size: int = 1000) -> Dict[str, int]:
+    """
+    Bulk-insert words, groups and memberships, committing every chunk_size
+    records. Existing words and memberships are left untouched.
+    Returns counts of processed records and created rows. A
+    VocabularyFormatError carries the number of records committed before it.
+    """
+    counts = {"records": 0, "words_created": 0, "groups_created": 0, "memberships_created": 0}
+    try:
+        _import_chunks(db, records, chunk_size, counts)
+    except VocabularyFormatError as e:
+        e.imported = counts["records"]
+        raise
+    return counts
+
+def _import_chunks(db: Session, records: Iterable[Dict], chunk_size: int, counts: Dict[str, int]):
+    group_cache: Dict[str, int] = {}
+
+    for chunk in _chunks(records, chunk_size):
+        keys = {(record["hungarian"], record["english"]) for record in chunk}
+        word_ids = _word_ids(db, keys)
+
+        new_words = {}
+        for record in chunk:
+            key = (record["hungarian"], record["english"])
+            if key not in word_ids and key not in new_words:
+                new_words[key] = {"hungarian": key[0], "english": key[1], "parts": record["parts"]}
+        if new_words:
+            db.execute(insert(Word), list(new_words.values()))
+            word_ids = _word_ids(db, keys)
+
+        counts["groups_created"] += _group_ids(
+            db, {name for record in chunk for name in record["groups"]}, group_cache
+        )
+
+        pairs = {
+            (word_ids[(record["hungarian"], record["english"])], group_cache[name])
+            for record in chunk
+            for name in record["groups"]
+        }
+        if pairs:
+            existing = set(db.query(WordGroup.word_id, WordGroup.group_id).filter(
+                WordGroup.word_id.in_({word_id for word_id, _ in pairs})
+            ).all())
+            new_pairs = sorted(pairs - existing)
+            if new_pairs:
+                db.execute(insert(WordGroup), [
+                    {"word_id": word_id, "group_id": group_id} for word_id, group_id in new_pairs
+                ])
+            counts["memberships_created"] += len(new_pairs)
+
+        db.commit()
+        counts["records"] += len(chunk)
+        counts["words_created"] += len(new_words)
+
+def export_vocabulary(db: Session, format: str, chunk_size: int = 1000) -> Iterator[str]:
+    """
+    Yield the vocabulary as lines of the given format, reading chunk_size
+    words (and their group names) per query.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported format {format!r}, expected one of {', '.join(FORMATS)}")
+    if format == "csv":
+        yield _csv_line(CSV_COLUMNS)
+
+    last_id = 0
+    while True:
+        words = db.query(Word.id, Word.hungarian, Word.english, Word.parts).filter(
+            Word.id > last_id
+        ).order_by(Word.id).limit(chunk_size).all()
+        if not words:
+            return
+        groups: Dict[int, List[str]] = {}
+        for word_id, name in db.query(WordGroup.word_id, Group.name).join(
+            Group, Group.id == WordGroup.group_id
+        ).filter(WordGroup.word_id.in_([word.id for word in words])).order_by(Group.name):
+            groups.setdefault(word_id, []).append(name)
+
+        for word in words:
+            names = groups.get(word.id, [])
+            if format == "jsonl":
+                yield json.dumps({
+                    "hungarian": word.hungarian,
+                    "english": word.english,
+                    "parts": word.parts,
+                    "groups": names
+                }, ensure_ascii=False) + "\n"
+            else:
+                parts = json.dumps(word.parts, ensure_ascii=False) if word.parts is not None else ""
+                yield _csv_line([word.hungarian, word.english, parts, ";".join(names)])
+        last_id = words[-1].id
+
+def _csv_line(values: List[str]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(values)
+    return buffer.getvalue()
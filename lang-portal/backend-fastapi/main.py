@@ -1,18 +1,64 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from database import Base, engine, get_settings
-from routers import dashboard, study, words, groups, system
+from database import engine, get_settings, run_migrations, review_buffer
+from database.database import SessionLocal, QueryStats, query_stats, async_engine
+from routers import dashboard, study, words, groups, system, metrics
+from routers.responses import ORJSONResponse
 
 # Get settings
 settings = get_settings()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Characters of the slowest statement kept in its Server-Timing description
+SERVER_TIMING_STATEMENT_CHARS = 120
+
+def timing_description(statement: str) -> str:
+    """
+    A statement as a Server-Timing quoted-string: on one line, truncated,
+    ASCII only and with quotes and backslashes escaped.
+    """
+    text = " ".join(statement.split())
+    if len(text) > SERVER_TIMING_STATEMENT_CHARS:
+        text = text[:SERVER_TIMING_STATEMENT_CHARS - 3] + "..."
+    text = text.encode("ascii", "replace").decode("ascii")
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def warm_up():
+    """
+    Bring the schema up to date and prime the dashboard cache, so the first
+    requests do not pay for either.
+    """
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        # serve.py migrates once before forking and turns this off for workers
+        run_migrations(engine)
+    db = SessionLocal()
+    try:
+        dashboard.warm_cache(db)
+    finally:
+        db.close()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Prepare the database and start background workers on startup, drain
+    them on shutdown.
+    """
+    warm_up()
+    if settings.REVIEW_BUFFER_ENABLED:
+        review_buffer.start()
+    yield
+    await review_buffer.stop()
+    engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 app = FastAPI(
     title=settings.API_TITLE,
     description=settings.API_DESCRIPTION,
-    version=settings.API_VERSION
+    version=settings.API_VERSION,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -24,12 +70,42 @@ app.add_middleware(
     allow_headers=settings.ALLOWED_HEADERS,
 )
 
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """
+    Measure handler time and the SQL each request executes, for the
+    Server-Timing header and the /metrics histograms.
+    """
+    stats = QueryStats()
+    token = query_stats.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        query_stats.reset(token)
+    seconds = time.perf_counter() - started
+
+    route = request.scope.get("route")
+    metrics.observe_request(
+        request.method, route.path if route else "unmatched", response.status_code, seconds, stats
+    )
+    if settings.SERVER_TIMING_ENABLED:
+        slowest = f"db-slowest;dur={stats.slowest_seconds * 1000:.2f}"
+        if stats.slowest_statement:
+            slowest += f";desc={timing_description(stats.slowest_statement)}"
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.seconds * 1000:.2f};desc="{stats.count} queries", '
+            f"{slowest}, app;dur={seconds * 1000:.2f}"
+        )
+    return response
+
 # Include routers
 app.include_router(dashboard.router)
 app.include_router(study.router)
 app.include_router(words.router)
 app.include_router(groups.router)
 app.include_router(system.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
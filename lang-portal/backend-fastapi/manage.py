@@ -0,0 +1,126 @@
+"""
+Maintenance commands for the language portal database.
+
+Usage:
+    python manage.py migrate
+    python manage.py rebuild-stats
+    python manage.py rebuild-activity
+    python manage.py rebuild-schedule
+    python manage.py import-vocabulary words.jsonl
+    python manage.py export-vocabulary words.csv --format csv
+"""
+import argparse
+import sys
+from database.database import SessionLocal
+from database import engine, rebuild_word_stats, rebuild_daily_activity, rebuild_word_schedules, run_migrations
+from database import VocabularyFormatError, decode_lines, parse_vocabulary, import_vocabulary, export_vocabulary
+
+def migrate(args):
+    """
+    Apply pending schema migrations.
+    """
+    applied = run_migrations(engine)
+    if applied:
+        print(f"Applied migrations: {', '.join(str(version) for version in applied)}")
+    else:
+        print("Database schema is up to date")
+
+def rebuild_stats(args):
+    """
+    Recompute the per-word review counters from word_review_items.
+    """
+    db = SessionLocal()
+    try:
+        words = rebuild_word_stats(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Rebuilt review counters for {words} words")
+
+def rebuild_activity(args):
+    """
+    Recompute the daily activity rollup, e.g. after changing STUDY_DAY_TIMEZONE.
+    """
+    db = SessionLocal()
+    try:
+        days = rebuild_daily_activity(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Rebuilt daily activity for {days} days")
+
+def rebuild_schedule(args):
+    """
+    Replay the review history through the spaced-repetition scheduler.
+    """
+    db = SessionLocal()
+    try:
+        words = rebuild_word_schedules(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Rebuilt review schedules for {words} words")
+
+def _vocabulary_format(args) -> str:
+    if args.format:
+        return args.format
+    return "csv" if args.path.endswith(".csv") else "jsonl"
+
+def import_words(args):
+    """
+    Stream a JSONL or CSV vocabulary file into the database.
+    """
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as lines:
+            counts = import_vocabulary(db, parse_vocabulary(decode_lines(lines), _vocabulary_format(args)), args.chunk_size)
+    except VocabularyFormatError as e:
+        sys.exit(f"Import stopped: {e}; {e.imported} records before it were imported")
+    finally:
+        db.close()
+    print(", ".join(f"{name.replace('_', ' ')}: {count}" for name, count in counts.items()))
+
+def export_words(args):
+    """
+    Stream the vocabulary to a JSONL or CSV file, or stdout for "-".
+    """
+    db = SessionLocal()
+    output = sys.stdout if args.path == "-" else open(args.path, "w", encoding="utf-8", newline="")
+    try:
+        output.writelines(export_vocabulary(db, _vocabulary_format(args), args.chunk_size))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Language portal maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help="Apply pending schema migrations")
+    migrate_parser.set_defaults(handler=migrate)
+
+    rebuild = commands.add_parser("rebuild-stats", help="Recompute per-word review counters")
+    rebuild.set_defaults(handler=rebuild_stats)
+
+    activity = commands.add_parser("rebuild-activity", help="Recompute the daily activity rollup")
+    activity.set_defaults(handler=rebuild_activity)
+
+    schedule = commands.add_parser("rebuild-schedule", help="Replay review history into word schedules")
+    schedule.set_defaults(handler=rebuild_schedule)
+
+    for name, handler, help in [
+        ("import-vocabulary", import_words, "Import words and groups from JSONL or CSV"),
+        ("export-vocabulary", export_words, "Export words and groups as JSONL or CSV"),
+    ]:
+        vocabulary = commands.add_parser(name, help=help)
+        vocabulary.add_argument("path", help="File to read or write; - exports to stdout")
+        vocabulary.add_argument("--format", choices=["jsonl", "csv"], help="Defaults to the file extension")
+        vocabulary.add_argument("--chunk-size", type=int, default=1000, help="Records per transaction")
+        vocabulary.set_defaults(handler=handler)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,33 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import Dict
-from database import get_db, StudySession, Group, WordReviewItem, Word
+from typing import Optional
+from datetime import date, timedelta
+from database import get_db, db_handler, get_settings, dashboard_cache, study_day, study_streak, activity_series, StudySession, Group, Word, WordStats
+from database.cache import QUICK_STATS, STUDY_PROGRESS, LAST_STUDY_SESSION, STUDY_STREAK
 from sqlalchemy.sql import func
 from sqlalchemy import desc
+from routers.http_cache import CachedRoute, http_cache
+from routers.schemas import LastStudySession, StudyProgress, QuickStats, ActivitySeries, CacheStats
 
 router = APIRouter(
     prefix="/api/dashboard",
     tags=["dashboard"],
     responses={404: {"description": "Not found"}},
+    route_class=CachedRoute,
 )
 
-@router.get("/last_study_session", response_model=Dict)
-def get_last_study_session(db: Session = Depends(get_db)):
-    """
-    Returns information about the most recent study session.
-    """
-    last_session = db.query(StudySession).join(Group).order_by(desc(StudySession.created_at)).first()
+settings = get_settings()
+
+MAX_ACTIVITY_DAYS = 3660
+
+def last_study_session(db: Session) -> dict:
+    last_session = db.query(
+        StudySession.id,
+        StudySession.group_id,
+        StudySession.created_at,
+        StudySession.study_activity_id,
+        Group.name.label("group_name")
+    ).join(Group).order_by(desc(StudySession.created_at)).first()
     if not last_session:
         return {}
     
@@ -25,40 +36,110 @@ def get_last_study_session(db: Session = Depends(get_db)):
         "group_id": last_session.group_id,
         "created_at": last_session.created_at,
         "study_activity_id": last_session.study_activity_id,
-        "group_name": last_session.group.name
+        "group_name": last_session.group_name
+    }
+
+def study_progress(db: Session) -> dict:
+    # word_stats holds exactly one row per word that has been reviewed
+    return {
+        "total_words_studied": db.query(func.count(WordStats.word_id)).scalar(),
+        "total_available_words": db.query(func.count(Word.id)).scalar()
     }
 
-@router.get("/study_progress", response_model=Dict)
+def quick_stats_totals(db: Session) -> dict:
+    correct_reviews, wrong_reviews = db.query(
+        func.coalesce(func.sum(WordStats.correct_count), 0),
+        func.coalesce(func.sum(WordStats.wrong_count), 0)
+    ).one()
+    return {
+        "total_reviews": correct_reviews + wrong_reviews,
+        "correct_reviews": correct_reviews,
+        "total_study_sessions": db.query(func.count(StudySession.id)).scalar(),
+        "total_active_groups": db.query(func.count(Group.id)).scalar()
+    }
+
+def warm_cache(db: Session):
+    """
+    Compute the cached dashboard aggregates ahead of the first request.
+    """
+    today = study_day()
+    dashboard_cache.get_or_compute(LAST_STUDY_SESSION, lambda: last_study_session(db))
+    dashboard_cache.get_or_compute(STUDY_PROGRESS, lambda: study_progress(db))
+    dashboard_cache.get_or_compute(QUICK_STATS, lambda: quick_stats_totals(db))
+    dashboard_cache.get_or_compute(STUDY_STREAK, lambda: (today, study_streak(db, today)))
+
+@router.get("/last_study_session", response_model=LastStudySession, response_model_exclude_unset=True)
+@http_cache()
+@db_handler
+def get_last_study_session(db: Session = Depends(get_db)):
+    """
+    Returns information about the most recent study session.
+    """
+    return dashboard_cache.get_or_compute(LAST_STUDY_SESSION, lambda: last_study_session(db))
+
+@router.get("/study_progress", response_model=StudyProgress)
+@http_cache()
+@db_handler
 def get_study_progress(db: Session = Depends(get_db)):
     """
     Returns study progress statistics including total words studied and available.
     """
-    total_words_studied = db.query(func.count(WordReviewItem.word_id.distinct())).scalar()
-    total_available_words = db.query(func.count(Word.id)).scalar()
-    
-    return {
-        "total_words_studied": total_words_studied,
-        "total_available_words": total_available_words
-    }
+    return dashboard_cache.get_or_compute(STUDY_PROGRESS, lambda: study_progress(db))
 
-@router.get("/quick-stats", response_model=Dict)
+@router.get("/quick-stats", response_model=QuickStats)
+@http_cache()
+@db_handler
 def get_quick_stats(db: Session = Depends(get_db)):
     """
     Returns quick overview statistics including success rate, total sessions, active groups, and streak.
     """
-    total_reviews = db.query(WordReviewItem).count()
-    correct_reviews = db.query(WordReviewItem).filter(WordReviewItem.correct == True).count()
-    success_rate = (correct_reviews / total_reviews * 100) if total_reviews > 0 else 0
+    stats = dashboard_cache.get_or_compute(QUICK_STATS, lambda: quick_stats_totals(db))
+    total_reviews = stats["total_reviews"]
+    success_rate = (stats["correct_reviews"] / total_reviews * 100) if total_reviews > 0 else 0
     
-    total_study_sessions = db.query(StudySession).count()
-    total_active_groups = db.query(Group).count()
-    
-    # TODO: Implement study streak calculation
-    study_streak_days = 0  # This needs more complex logic with date calculations
+    today = study_day()
+    streak_day, study_streak_days = dashboard_cache.get_or_compute(STUDY_STREAK, lambda: (today, study_streak(db, today)))
+    if streak_day != today:
+        # Cached on an earlier day; the streak may have ended or grown since
+        dashboard_cache.invalidate(STUDY_STREAK)
+        streak_day, study_streak_days = dashboard_cache.get_or_compute(STUDY_STREAK, lambda: (today, study_streak(db, today)))
     
     return {
         "success_rate": round(success_rate, 1),
-        "total_study_sessions": total_study_sessions,
-        "total_active_groups": total_active_groups,
+        "total_study_sessions": stats["total_study_sessions"],
+        "total_active_groups": stats["total_active_groups"],
         "study_streak_days": study_streak_days
     }
+
+@router.get("/activity", response_model=ActivitySeries)
+@http_cache()
+@db_handler
+def get_activity(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Returns per-day sessions, reviews and correct reviews for a date range,
+    by default the last 30 days. Days are in the configured study timezone.
+    """
+    end = end or study_day()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= MAX_ACTIVITY_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_ACTIVITY_DAYS} days")
+    
+    return {
+        "start": start,
+        "end": end,
+        "timezone": settings.STUDY_DAY_TIMEZONE,
+        "days": activity_series(db, start, end)
+    }
+
+@router.get("/cache_stats", response_model=CacheStats)
+def get_cache_stats():
+    """
+    Returns hit/miss counters of the dashboard aggregate cache.
+    """
+    return dashboard_cache.stats()
@@ -1,50 +1,62 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import Dict, List
-from database import get_db, Group, Word, StudySession, WordReviewItem
-from sqlalchemy.sql import func
+from typing import List, Optional
+from database import get_db, db_handler, Group, Word, WordGroup, StudySession, word_stats_query, group_word_counts_query, session_listing_query
+from routers.pagination import Keyset, page_query, split_page, count_total, pagination
+from routers.http_cache import CachedRoute, http_cache
+from routers.responses import ORJSONResponse
+from routers.schemas import GroupPage, GroupDetail, WordPage, StudySessionPage
 
 router = APIRouter(
     prefix="/api",
     tags=["groups"],
     responses={404: {"description": "Not found"}},
+    route_class=CachedRoute,
 )
 
-@router.get("/groups", response_model=Dict)
+group_keyset = Keyset(Group.id)
+# Seek on the join table so group pages walk the (group_id, word_id) index
+group_word_keyset = Keyset(WordGroup.word_id, keys=("id",))
+session_keyset = Keyset(StudySession.created_at, StudySession.id)
+
+@router.get("/groups", response_model=GroupPage)
+@http_cache()
+@db_handler
 def get_groups(
     page: int = 1,
     items_per_page: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     db: Session = Depends(get_db)
 ):
     """
     Get paginated list of groups with word counts.
+    Pass the returned next_cursor as cursor to seek instead of using page.
     """
-    total = db.query(Group).count()
-    groups = db.query(Group).offset((page - 1) * items_per_page).limit(items_per_page).all()
+    total = count_total(db.query(Group), "groups", include_total)
+    groups = page_query(db.query(Group), group_keyset, page, items_per_page, cursor)
+    groups, next_cursor = split_page(group_word_counts_query(db, groups).all(), group_keyset, items_per_page)
     
-    return {
+    return ORJSONResponse({
         "items": [
             {
                 "id": group.id,
                 "name": group.name,
-                "word_count": len(group.words)
+                "word_count": group.word_count
             }
             for group in groups
         ],
-        "pagination": {
-            "current_page": page,
-            "total_pages": (total + items_per_page - 1) // items_per_page,
-            "total_items": total,
-            "items_per_page": items_per_page
-        }
-    }
+        "pagination": pagination(page, items_per_page, total, next_cursor, cursor)
+    })
 
-@router.get("/groups/{group_id}", response_model=Dict)
+@router.get("/groups/{group_id}", response_model=GroupDetail)
+@http_cache()
+@db_handler
 def get_group(group_id: int, db: Session = Depends(get_db)):
     """
     Get details of a specific group including statistics.
     """
-    group = db.query(Group).filter(Group.id == group_id).first()
+    group = group_word_counts_query(db, db.query(Group).filter(Group.id == group_id)).first()
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
     
@@ -52,88 +64,80 @@ def get_group(group_id: int, db: Session = Depends(get_db)):
         "id": group.id,
         "name": group.name,
         "stats": {
-            "total_word_count": len(group.words)
+            "total_word_count": group.word_count
         }
     }
 
-@router.get("/groups/{group_id}/words", response_model=Dict)
+@router.get("/groups/{group_id}/words", response_model=WordPage)
+@http_cache()
+@db_handler
 def get_group_words(
     group_id: int,
     page: int = 1,
     items_per_page: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     db: Session = Depends(get_db)
 ):
     """
     Get paginated list of words in a specific group with their statistics.
+    Pass the returned next_cursor as cursor to seek instead of using page.
     """
-    group = db.query(Group).filter(Group.id == group_id).first()
-    if not group:
+    if not db.query(Group.id).filter(Group.id == group_id).first():
         raise HTTPException(status_code=404, detail="Group not found")
     
-    total = len(group.words)
-    words = group.words[(page - 1) * items_per_page:page * items_per_page]
-    
-    word_stats = {}
-    for word in words:
-        correct = db.query(func.count(WordReviewItem.id)).filter(
-            WordReviewItem.word_id == word.id,
-            WordReviewItem.correct == True
-        ).scalar()
-        wrong = db.query(func.count(WordReviewItem.id)).filter(
-            WordReviewItem.word_id == word.id,
-            WordReviewItem.correct == False
-        ).scalar()
-        word_stats[word.id] = {"correct": correct, "wrong": wrong}
+    words = db.query(Word).join(
+        WordGroup, WordGroup.word_id == Word.id
+    ).filter(WordGroup.group_id == group_id)
+    memberships = db.query(WordGroup).filter(WordGroup.group_id == group_id)
+    total = count_total(memberships, ("group_words", group_id), include_total)
+    page_of_words = page_query(words, group_word_keyset, page, items_per_page, cursor)
+    rows, next_cursor = split_page(word_stats_query(db, page_of_words).all(), group_word_keyset, items_per_page)
     
-    return {
+    return ORJSONResponse({
         "items": [
             {
-                "hungarian": word.hungarian,
-                "english": word.english,
-                "correct_count": word_stats[word.id]["correct"],
-                "wrong_count": word_stats[word.id]["wrong"]
+                "hungarian": row.hungarian,
+                "english": row.english,
+                "correct_count": row.correct_count,
+                "wrong_count": row.wrong_count
             }
-            for word in words
+            for row in rows
         ],
-        "pagination": {
-            "current_page": page,
-            "total_pages": (total + items_per_page - 1) // items_per_page,
-            "total_items": total,
-            "items_per_page": items_per_page
-        }
-    }
+        "pagination": pagination(page, items_per_page, total, next_cursor, cursor)
+    })
 
-@router.get("/groups/{group_id}/study_sessions", response_model=Dict)
+@router.get("/groups/{group_id}/study_sessions", response_model=StudySessionPage)
+@http_cache()
+@db_handler
 def get_group_sessions(
     group_id: int,
     page: int = 1,
     items_per_page: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     db: Session = Depends(get_db)
 ):
     """
-    Get paginated list of study sessions for a specific group.
+    Get paginated list of study sessions for a specific group, oldest first.
+    Pass the returned next_cursor as cursor to seek instead of using page.
     """
-    total = db.query(StudySession).filter(StudySession.group_id == group_id).count()
-    sessions = db.query(StudySession).filter(
-        StudySession.group_id == group_id
-    ).offset((page - 1) * items_per_page).limit(items_per_page).all()
+    sessions = db.query(StudySession).filter(StudySession.group_id == group_id)
+    total = count_total(sessions, ("group_sessions", group_id), include_total)
+    sessions = page_query(sessions, session_keyset, page, items_per_page, cursor)
+    sessions, next_cursor = split_page(session_listing_query(db, sessions).all(), session_keyset, items_per_page)
     
-    return {
+    return ORJSONResponse({
         "items": [
             {
                 "id": session.id,
-                "activity_name": "Vocabulary Quiz",  # This should come from activity types
-                "group_name": session.group.name,
+                "activity_name": session.activity_name,
+                "group_name": session.group_name,
                 "start_time": session.created_at,
-                "end_time": None,  # This needs to be added to the model
-                "review_items_count": len(session.word_review_items)
+                "end_time": session.end_time,
+                "review_items_count": session.review_items_count
             }
             for session in sessions
         ],
-        "pagination": {
-            "current_page": page,
-            "total_pages": (total + items_per_page - 1) // items_per_page,
-            "total_items": total,
-            "items_per_page": items_per_page
-        }
-    }
+        "pagination": pagination(page, items_per_page, total, next_cursor, cursor)
+    })
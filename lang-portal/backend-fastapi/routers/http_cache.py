@@ -0,0 +1,117 @@
+"""
+Conditional GETs and a response cache keyed by the data version.
+
+Routers opt in with route_class=CachedRoute, and each read endpoint is
+marked with the http_cache decorator. Marked GETs get a strong ETag built
+from the data version and the study day, which day-dependent numbers like
+streaks rely on. A matching If-None-Match is answered with 304 before the
+handler runs. Otherwise a response rendered for the same URL at the same
+version is replayed from memory.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from database import get_settings, data_version, study_day
+
+settings = get_settings()
+
+class CachePolicy(NamedTuple):
+    cache_control: str
+
+class CachedResponse(NamedTuple):
+    etag: str
+    body: bytes
+    media_type: Optional[str]
+
+def http_cache(max_age: int = 0):
+    """
+    Mark a GET endpoint as cacheable. With max_age=0 clients must
+    revalidate every time, which costs them a 304 when nothing changed.
+    """
+    cache_control = "no-cache" if max_age == 0 else f"private, max-age={max_age}, must-revalidate"
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.http_cache = CachePolicy(cache_control)
+        return endpoint
+    return decorator
+
+class ResponseCache:
+    """
+    Least recently used rendered responses, one per URL.
+    """
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str], etag: str) -> Optional[CachedResponse]:
+        entry = self.entries.get(key)
+        if entry is None or entry.etag != etag:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: Tuple[str, str], entry: CachedResponse):
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> Dict:
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+def current_etag() -> str:
+    return f'"{data_version.token()}-{study_day().isoformat()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+class CachedRoute(APIRoute):
+    """
+    APIRoute that serves endpoints marked with http_cache conditionally.
+    """
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        policy: Optional[CachePolicy] = getattr(self.endpoint, "http_cache", None)
+        if policy is None:
+            return handler
+
+        async def cached_handler(request: Request) -> Response:
+            if request.method != "GET":
+                return await handler(request)
+
+            # The version is read before the handler, so a write that commits
+            # meanwhile can only make the stored ETag older than the data
+            etag = current_etag()
+            headers = {"ETag": etag, "Cache-Control": policy.cache_control}
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=headers)
+
+            key = (request.url.path, request.url.query)
+            cached = response_cache.get(key, etag)
+            if cached is not None:
+                return Response(cached.body, media_type=cached.media_type, headers=headers)
+
+            response = await handler(request)
+            if response.status_code == 200 and hasattr(response, "body"):
+                response.headers.update(headers)
+                response_cache.set(key, CachedResponse(etag, response.body, response.media_type))
+            return response
+
+        return cached_handler
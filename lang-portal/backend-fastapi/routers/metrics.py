@@ -0,0 +1,106 @@
+"""
+Per-route request metrics in the Prometheus text exposition format.
+
+The instrumentation middleware in main.py calls observe_request once per
+request. Metrics live in process memory, so each worker reports its own.
+"""
+import bisect
+import threading
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from database.database import QueryStats
+
+router = APIRouter(tags=["system"])
+
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+QUERY_COUNT_BUCKETS = [0, 1, 2, 3, 5, 10, 20, 50, 100]
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: List[float]):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.series: Dict[Labels, List] = {}
+
+    def observe(self, labels: Labels, value: float):
+        series = self.series.setdefault(labels, [[0] * len(self.buckets), 0.0, 0])
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(labels)} {count}")
+        return lines
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.series: Dict[Labels, float] = defaultdict(int)
+
+    def inc(self, labels: Labels, value: float = 1):
+        self.series[labels] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(labels)} {_number(value)}" for labels, value in sorted(self.series.items())]
+        return lines
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+requests_total = Counter("http_requests_total", "Requests served, by route and status code")
+request_duration = Histogram("http_request_duration_seconds", "Time to produce the response", LATENCY_BUCKETS)
+sql_duration = Histogram("http_request_sql_duration_seconds", "Time spent executing SQL per request", LATENCY_BUCKETS)
+sql_queries = Histogram("http_request_sql_queries", "SQL statements executed per request", QUERY_COUNT_BUCKETS)
+slow_queries_total = Counter("sql_slow_queries_total", "Statements over SLOW_QUERY_THRESHOLD_MS, by route")
+METRICS = [requests_total, request_duration, sql_duration, sql_queries, slow_queries_total]
+
+_lock = threading.Lock()
+
+def observe_request(method: str, route: str, status: int, seconds: float, stats: QueryStats):
+    """
+    Record one finished request.
+    """
+    labels = (("method", method), ("route", route))
+    with _lock:
+        requests_total.inc(labels + (("status", str(status)),))
+        request_duration.observe(labels, seconds)
+        sql_duration.observe(labels, stats.seconds)
+        sql_queries.observe(labels, stats.count)
+        if stats.slow_count:
+            slow_queries_total.inc(labels, stats.slow_count)
+
+def render_metrics() -> str:
+    with _lock:
+        lines = [line for metric in METRICS for line in metric.render()]
+    return "\n".join(lines) + "\n"
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Request, latency and SQL metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,168 @@
+import base64
+import json
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Dict, Hashable, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import String, and_, func, or_, select, type_coerce
+from sqlalchemy.orm import Query
+from database import get_settings
+
+settings = get_settings()
+
+class Keyset:
+    """
+    A unique, ordered tuple of columns used for cursor (keyset) pagination.
+
+    Instead of skipping OFFSET rows, the next page is found by seeking past
+    the last row of the previous one, e.g. (created_at, id) > (:c, :i). With
+    an index on the columns every page costs the same no matter how deep.
+    keys names the row attributes holding the values when they differ from
+    the column names, e.g. when seeking on a join table column.
+    """
+
+    def __init__(self, *columns, keys: Optional[Tuple[str, ...]] = None):
+        self.columns = columns
+        self.keys = keys or tuple(column.key for column in columns)
+
+    def encode(self, row) -> str:
+        values = []
+        for key in self.keys:
+            value = getattr(row, key)
+            if isinstance(value, datetime):
+                # The text SQLAlchemy stores; seek prefers the row's own stored text
+                value = value.strftime("%Y-%m-%d %H:%M:%S.%f")
+            values.append(value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode(self, cursor: str) -> List:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(values, list) or len(values) != len(self.columns):
+                raise ValueError(cursor)
+            return [
+                str(value) if self._is_datetime(column) else column.type.python_type(value)
+                for column, value in zip(self.columns, values)
+            ]
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    def seek(self, query: Query, cursor: str) -> Query:
+        values = self.decode(cursor)
+        columns = [
+            type_coerce(column, String) if self._is_datetime(column) else column
+            for column in self.columns
+        ]
+        for i, column in enumerate(self.columns):
+            if self._is_datetime(column):
+                values[i] = self._stored_text(i, values)
+        clauses = []
+        for i, column in enumerate(columns):
+            equal = [columns[j] == values[j] for j in range(i)]
+            clauses.append(and_(*equal, column > values[i]))
+        return query.filter(or_(*clauses))
+
+    def _stored_text(self, i: int, values: List):
+        """
+        The cursor row's timestamp exactly as stored, looked up by its key.
+
+        The same instant may be stored as "12:00:00" (CURRENT_TIMESTAMP) or
+        "12:00:00.000000" (ORM writes), and seeking from the wrong form
+        repeats or skips rows sharing that second. Falls back to the encoded
+        value when the last column is not the table's key or the row is gone.
+        """
+        column, key = self.columns[i], self.columns[-1]
+        if i == len(self.columns) - 1 or getattr(key, "table", None) is not getattr(column, "table", None):
+            return values[i]
+        table = column.table.alias()
+        stored = select(type_coerce(table.corresponding_column(column), String)).where(
+            table.corresponding_column(key) == values[-1]
+        ).scalar_subquery()
+        return func.coalesce(stored, values[i])
+
+    @staticmethod
+    def _is_datetime(column) -> bool:
+        return column.type.python_type is datetime
+
+def page_query(
+    query: Query,
+    keyset: Keyset,
+    page: int,
+    items_per_page: int,
+    cursor: Optional[str] = None
+) -> Query:
+    """
+    Order the query by the keyset and restrict it to one page.
+
+    Uses the cursor when one is given and OFFSET paging otherwise. One extra
+    row is fetched so split_page can tell whether another page exists.
+    """
+    query = query.order_by(*keyset.columns)
+    if cursor is not None:
+        query = keyset.seek(query, cursor)
+    else:
+        query = query.offset((page - 1) * items_per_page)
+    return query.limit(items_per_page + 1)
+
+def split_page(rows: List, keyset: Keyset, items_per_page: int) -> Tuple[List, Optional[str]]:
+    """
+    Trim the look-ahead row fetched by page_query and build the next cursor.
+    """
+    if len(rows) <= items_per_page:
+        return rows, None
+    rows = rows[:items_per_page]
+    return rows, keyset.encode(rows[-1])
+
+_count_cache: Dict[Hashable, Tuple[float, int]] = {}
+_count_cache_lock = Lock()
+
+def count_total(query: Query, key: Hashable, include_total: bool = True) -> Optional[int]:
+    """
+    Count the rows of a listing, or skip the count entirely.
+
+    When PAGINATION_COUNT_CACHE_SECONDS is set, counts are cached per key for
+    that long so scrolling through pages does not re-scan the table each time.
+    """
+    if not include_total:
+        return None
+
+    ttl = settings.PAGINATION_COUNT_CACHE_SECONDS
+    if ttl <= 0:
+        return query.count()
+
+    now = time.monotonic()
+    with _count_cache_lock:
+        cached = _count_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    total = query.count()
+    with _count_cache_lock:
+        _count_cache[key] = (now + ttl, total)
+    return total
+
+def clear_count_cache():
+    """
+    Drop all cached listing counts. Called by write paths that remove rows.
+    """
+    with _count_cache_lock:
+        _count_cache.clear()
+
+def pagination(
+    page: int,
+    items_per_page: int,
+    total: Optional[int],
+    next_cursor: Optional[str],
+    cursor: Optional[str] = None
+) -> Dict:
+    """
+    Build the pagination block shared by all list endpoints.
+    """
+    return {
+        "current_page": page if cursor is None else None,
+        "total_pages": (total + items_per_page - 1) // items_per_page if total is not None else None,
+        "total_items": total,
+        "items_per_page": items_per_page,
+        "next_cursor": next_cursor
+    }
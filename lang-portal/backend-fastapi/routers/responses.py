@@ -0,0 +1,18 @@
+"""
+JSON responses rendered with orjson.
+
+Routes with a response model are serialised by pydantic-core, and FastAPI's
+own ORJSONResponse is deprecated for that reason. This class is the app's
+default for everything else, such as the root endpoint.
+
+The hot list endpoints return an ORJSONResponse directly. FastAPI skips
+response-model validation for Response instances, so their model still
+documents the page without the 0.15-0.3 ms of validating every one.
+"""
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,184 @@
+"""
+Response models for the API.
+
+Handlers keep returning plain dicts built from SQL rows; FastAPI validates
+them against these models and serialises them straight to JSON bytes with
+pydantic-core, without going through jsonable_encoder.
+"""
+from datetime import date, datetime
+from typing import List, Literal, Optional
+from pydantic import BaseModel
+
+# A field named "date" would shadow the type inside the class body
+Day = date
+
+class Pagination(BaseModel):
+    current_page: Optional[int]
+    total_pages: Optional[int]
+    total_items: Optional[int]
+    items_per_page: int
+    next_cursor: Optional[str]
+
+class Success(BaseModel):
+    success: bool
+    message: str
+
+# Words
+
+class WordListItem(BaseModel):
+    hungarian: str
+    english: str
+    correct_count: int
+    wrong_count: int
+
+class WordPage(BaseModel):
+    items: List[WordListItem]
+    pagination: Pagination
+
+class WordSearchItem(BaseModel):
+    id: int
+    hungarian: str
+    english: str
+    match: Literal["prefix", "fuzzy"]
+
+class WordSearchResults(BaseModel):
+    query: str
+    items: List[WordSearchItem]
+
+class VocabularyImport(BaseModel):
+    success: bool
+    records: int
+    words_created: int
+    groups_created: int
+    memberships_created: int
+
+class ReviewCounts(BaseModel):
+    correct_count: int
+    wrong_count: int
+
+class GroupReference(BaseModel):
+    id: int
+    name: str
+
+class WordDetail(BaseModel):
+    hungarian: str
+    english: str
+    stats: ReviewCounts
+    groups: List[GroupReference]
+
+# Groups
+
+class GroupListItem(BaseModel):
+    id: int
+    name: str
+    word_count: int
+
+class GroupPage(BaseModel):
+    items: List[GroupListItem]
+    pagination: Pagination
+
+class GroupStats(BaseModel):
+    total_word_count: int
+
+class GroupDetail(BaseModel):
+    id: int
+    name: str
+    stats: GroupStats
+
+# Study activities and sessions
+
+class StudySessionListItem(BaseModel):
+    id: int
+    activity_name: Optional[str]
+    group_name: Optional[str]
+    start_time: Optional[datetime]
+    end_time: Optional[datetime]
+    review_items_count: int
+
+class StudySessionPage(BaseModel):
+    items: List[StudySessionListItem]
+    pagination: Pagination
+
+class StudyActivityDetail(BaseModel):
+    id: int
+    name: str
+    thumbnail_url: str
+    description: str
+
+class StudyActivityCreated(BaseModel):
+    id: int
+    group_id: int
+
+class DueWord(BaseModel):
+    id: int
+    hungarian: str
+    english: str
+    new: bool
+    due_at: Optional[datetime]
+    interval_days: float
+    ease: float
+
+class NextWords(BaseModel):
+    study_session_id: int
+    group_id: Optional[int]
+    items: List[DueWord]
+
+class ReviewCreated(BaseModel):
+    status: str
+    queued: bool = False
+
+class ReviewsCreated(BaseModel):
+    success: bool
+    study_session_id: int
+    reviews_created: int
+
+# Dashboard
+
+class LastStudySession(BaseModel):
+    # Empty when nothing has been studied yet
+    id: Optional[int] = None
+    group_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    study_activity_id: Optional[int] = None
+    group_name: Optional[str] = None
+
+class StudyProgress(BaseModel):
+    total_words_studied: int
+    total_available_words: int
+
+class QuickStats(BaseModel):
+    success_rate: float
+    total_study_sessions: int
+    total_active_groups: int
+    study_streak_days: int
+
+class ActivityDay(BaseModel):
+    date: Day
+    sessions: int
+    reviews: int
+    correct: int
+
+class ActivitySeries(BaseModel):
+    start: Day
+    end: Day
+    timezone: str
+    days: List[ActivityDay]
+
+class CacheStats(BaseModel):
+    backend: str
+    ttl_seconds: int
+    hits: int
+    misses: int
+    hit_ratio: float
+
+# System
+
+class ReviewBufferMetrics(BaseModel):
+    enabled: bool
+    queue_depth: int
+    flushes: int
+    flushed_reviews: int
+    failed_reviews: int
+    last_flush_ms: float
+    max_flush_ms: float
+    avg_flush_ms: float
@@ -1,16 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import Dict, List
-from database import get_db, StudyActivity, StudySession, WordReviewItem
+from typing import List, Optional
+from database import get_db, db_handler, StudyActivity, StudySession, Word, session_listing_query, ReviewRecord, record_reviews, utc_timestamp, review_buffer, due_words
+from routers.pagination import Keyset, page_query, split_page, count_total, pagination
 from pydantic import BaseModel
 from datetime import datetime
+from routers.http_cache import CachedRoute, http_cache
+from routers.responses import ORJSONResponse
+from routers.schemas import StudyActivityDetail, StudySessionPage, StudyActivityCreated, NextWords, ReviewCreated, ReviewsCreated
 
 router = APIRouter(
     prefix="/api",
     tags=["study"],
     responses={404: {"description": "Not found"}},
+    route_class=CachedRoute,
 )
 
+session_keyset = Keyset(StudySession.created_at, StudySession.id)
+
 class StudyActivityCreate(BaseModel):
     group_id: int
     study_activity_id: int
@@ -18,7 +25,17 @@ class StudyActivityCreate(BaseModel):
 class ReviewCreate(BaseModel):
     correct: bool
 
-@router.get("/study_activities/{activity_id}", response_model=Dict)
+class BatchReviewItem(BaseModel):
+    word_id: int
+    correct: bool
+    reviewed_at: Optional[datetime] = None
+
+class BatchReviewCreate(BaseModel):
+    reviews: List[BatchReviewItem]
+
+@router.get("/study_activities/{activity_id}", response_model=StudyActivityDetail)
+@http_cache()
+@db_handler
 def get_study_activity(activity_id: int, db: Session = Depends(get_db)):
     """
     Get details of a specific study activity.
@@ -34,42 +51,43 @@ def get_study_activity(activity_id: int, db: Session = Depends(get_db)):
         "description": "Practice your vocabulary with flashcards"
     }
 
-@router.get("/study_activities/{activity_id}/study_sessions", response_model=Dict)
+@router.get("/study_activities/{activity_id}/study_sessions", response_model=StudySessionPage)
+@http_cache()
+@db_handler
 def get_activity_sessions(
     activity_id: int, 
     page: int = 1, 
     items_per_page: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     db: Session = Depends(get_db)
 ):
     """
-    Get paginated list of study sessions for a specific activity.
+    Get paginated list of study sessions for a specific activity, oldest first.
+    Pass the returned next_cursor as cursor to seek instead of using page.
     """
-    total = db.query(StudySession).filter(StudySession.study_activity_id == activity_id).count()
-    sessions = db.query(StudySession).filter(
-        StudySession.study_activity_id == activity_id
-    ).offset((page - 1) * items_per_page).limit(items_per_page).all()
+    sessions = db.query(StudySession).filter(StudySession.study_activity_id == activity_id)
+    total = count_total(sessions, ("activity_sessions", activity_id), include_total)
+    sessions = page_query(sessions, session_keyset, page, items_per_page, cursor)
+    sessions, next_cursor = split_page(session_listing_query(db, sessions).all(), session_keyset, items_per_page)
     
-    return {
+    return ORJSONResponse({
         "items": [
             {
                 "id": session.id,
-                "activity_name": "Vocabulary Quiz",  # This should come from activity types
-                "group_name": session.group.name,
+                "activity_name": session.activity_name,
+                "group_name": session.group_name,
                 "start_time": session.created_at,
-                "end_time": None,  # This needs to be added to the model
-                "review_items_count": len(session.word_review_items)
+                "end_time": session.end_time,
+                "review_items_count": session.review_items_count
             }
             for session in sessions
         ],
-        "pagination": {
-            "current_page": page,
-            "total_pages": (total + items_per_page - 1) // items_per_page,
-            "total_items": total,
-            "items_per_page": items_per_page
-        }
-    }
+        "pagination": pagination(page, items_per_page, total, next_cursor, cursor)
+    })
 
-@router.post("/study_activities", response_model=Dict)
+@router.post("/study_activities", response_model=StudyActivityCreated)
+@db_handler
 def create_study_activity(
     activity: StudyActivityCreate,
     db: Session = Depends(get_db)
@@ -90,7 +108,31 @@ def create_study_activity(
         "group_id": db_activity.group_id
     }
 
-@router.post("/study_sessions/{session_id}/words/{word_id}/review", response_model=Dict)
+@router.get("/study_sessions/{session_id}/next", response_model=NextWords)
+@db_handler
+def get_next_words(
+    session_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    include_new: bool = True,
+    db: Session = Depends(get_db)
+):
+    """
+    Get the next words to review in a study session's group.
+    Due words come first, most overdue first, followed by words that have
+    never been reviewed when include_new is set.
+    """
+    session = db.query(StudySession.group_id).filter(StudySession.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Study session not found")
+    
+    return {
+        "study_session_id": session_id,
+        "group_id": session.group_id,
+        "items": due_words(db, session.group_id, utc_timestamp(), limit, include_new)
+    }
+
+@router.post("/study_sessions/{session_id}/words/{word_id}/review", response_model=ReviewCreated)
+@db_handler
 def create_word_review(
     session_id: int,
     word_id: int,
@@ -99,18 +141,59 @@ def create_word_review(
 ):
     """
     Create a review for a word in a study session.
+    With the review buffer enabled the review is acknowledged once queued
+    and written to the database by the next batch flush.
     """
     # Verify session exists
     session = db.query(StudySession).filter(StudySession.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Study session not found")
     
-    review_item = WordReviewItem(
-        word_id=word_id,
-        study_session_id=session_id,
-        correct=review.correct
-    )
-    db.add(review_item)
+    record = ReviewRecord(word_id, review.correct, utc_timestamp())
+    if review_buffer.submit(session_id, record):
+        return {"status": "success", "queued": True}
+    
+    record_reviews(db, session_id, [record])
     db.commit()
     
     return {"status": "success"}
+
+@router.post("/study_sessions/{session_id}/reviews", response_model=ReviewsCreated)
+@db_handler
+def create_word_reviews(
+    session_id: int,
+    batch: BatchReviewCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Create many reviews for a study session in one transaction.
+    Lets offline clients sync their flashcard results in a single request.
+    """
+    # Verify session exists
+    session = db.query(StudySession.id).filter(StudySession.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Study session not found")
+    
+    # Validate all word ids with one set-based query
+    word_ids = {review.word_id for review in batch.reviews}
+    found = {row.id for row in db.query(Word.id).filter(Word.id.in_(word_ids))} if word_ids else set()
+    missing = sorted(word_ids - found)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Words not found: {', '.join(map(str, missing))}")
+    
+    now = utc_timestamp()
+    created = record_reviews(db, session_id, [
+        ReviewRecord(
+            review.word_id,
+            review.correct,
+            utc_timestamp(review.reviewed_at) if review.reviewed_at else now
+        )
+        for review in batch.reviews
+    ])
+    db.commit()
+    
+    return {
+        "success": True,
+        "study_session_id": session_id,
+        "reviews_created": created
+    }
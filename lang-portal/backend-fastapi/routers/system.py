@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from typing import Dict
-from database import get_db, engine, Base, WordReviewItem, StudySession, StudyActivity
+from database import get_db, db_handler, engine, Base, WordReviewItem, StudySession, StudyActivity, DailyActivity, clear_word_stats, clear_word_schedules, drop_search_index, run_migrations, review_buffer, dashboard_cache
+from routers.pagination import clear_count_cache
+from routers.schemas import Success, ReviewBufferMetrics
 
 router = APIRouter(
     prefix="/api",
@@ -9,41 +10,67 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-@router.post("/reset_history", response_model=Dict)
+@router.post("/reset_history", response_model=Success)
+@db_handler
 def reset_history(db: Session = Depends(get_db)):
     """
     Reset all study history while keeping words and groups intact.
-    This deletes all study sessions, activities, and word review items.
+    This deletes all study sessions, activities, word review items and the
+    per-word counters, schedules and daily activity derived from them.
+    Reviews still waiting in the write-behind buffer are dropped as well.
     """
-    # Delete all word review items
+    review_buffer.discard_pending()
+    
+    # Delete all word review items and their counters
     db.query(WordReviewItem).delete()
+    clear_word_stats(db)
+    clear_word_schedules(db)
     
-    # Delete all study sessions
+    # Delete all study sessions and the daily activity rolled up from them
     db.query(StudySession).delete()
+    db.query(DailyActivity).delete()
     
     # Delete all study activities
     db.query(StudyActivity).delete()
     
     db.commit()
+    clear_count_cache()
+    dashboard_cache.invalidate_all()
     
     return {
         "success": True,
         "message": "Study history has been reset"
     }
 
-@router.post("/full_reset", response_model=Dict)
-def full_reset(db: Session = Depends(get_db)):
+@router.post("/full_reset", response_model=Success)
+def full_reset():
     """
     Perform a complete system reset.
     This deletes ALL data including words, groups, and study history.
+    The schema is rebuilt through the sync engine, like every migration, so
+    this stays a plain handler run in the threadpool in both database modes
+    instead of blocking the event loop.
     """
+    review_buffer.discard_pending()
+    
     # Drop all tables
+    with engine.begin() as connection:
+        drop_search_index(connection)
     Base.metadata.drop_all(bind=engine)
     
-    # Recreate all tables
-    Base.metadata.create_all(bind=engine)
+    # Recreate all tables by replaying the migrations
+    run_migrations(engine)
+    clear_count_cache()
+    dashboard_cache.invalidate_all()
     
     return {
         "success": True,
         "message": "System has been fully reset"
     }
+
+@router.get("/review_buffer", response_model=ReviewBufferMetrics)
+def get_review_buffer_stats():
+    """
+    Report the write-behind review buffer's queue depth and flush latency.
+    """
+    return review_buffer.metrics()
@@ -1,87 +1,149 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Dict, List
-from database import get_db, Word, WordReviewItem
-from sqlalchemy.sql import func
+from typing import List, Literal, Optional
+from database import get_db, db_handler, dashboard_cache, search_words, Word, Group, WordGroup, word_stats_query
+from database import VocabularyFormatError, decode_lines, parse_vocabulary, import_vocabulary, export_vocabulary
+from database.database import SessionLocal
+from routers.pagination import Keyset, page_query, split_page, count_total, pagination, clear_count_cache
+from routers.http_cache import CachedRoute, http_cache
+from routers.responses import ORJSONResponse
+from routers.schemas import WordPage, WordSearchResults, VocabularyImport, WordDetail
 
 router = APIRouter(
     prefix="/api",
     tags=["words"],
     responses={404: {"description": "Not found"}},
+    route_class=CachedRoute,
 )
 
-@router.get("/words", response_model=Dict)
+word_keyset = Keyset(Word.id)
+
+MEDIA_TYPES = {"jsonl": "application/x-ndjson", "csv": "text/csv"}
+
+@router.get("/words", response_model=WordPage)
+@http_cache()
+@db_handler
 def get_words(
     page: int = 1,
     items_per_page: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     db: Session = Depends(get_db)
 ):
     """
     Get paginated list of words with their statistics.
+    Pass the returned next_cursor as cursor to seek instead of using page.
     """
-    total = db.query(Word).count()
-    words = db.query(Word).offset((page - 1) * items_per_page).limit(items_per_page).all()
-    
-    word_stats = {}
-    for word in words:
-        correct = db.query(func.count(WordReviewItem.id)).filter(
-            WordReviewItem.word_id == word.id,
-            WordReviewItem.correct == True
-        ).scalar()
-        wrong = db.query(func.count(WordReviewItem.id)).filter(
-            WordReviewItem.word_id == word.id,
-            WordReviewItem.correct == False
-        ).scalar()
-        word_stats[word.id] = {"correct": correct, "wrong": wrong}
+    total = count_total(db.query(Word), "words", include_total)
+    words = page_query(db.query(Word), word_keyset, page, items_per_page, cursor)
+    rows, next_cursor = split_page(word_stats_query(db, words).all(), word_keyset, items_per_page)
     
-    return {
+    return ORJSONResponse({
         "items": [
             {
-                "hungarian": word.hungarian,
-                "english": word.english,
-                "correct_count": word_stats[word.id]["correct"],
-                "wrong_count": word_stats[word.id]["wrong"]
+                "hungarian": row.hungarian,
+                "english": row.english,
+                "correct_count": row.correct_count,
+                "wrong_count": row.wrong_count
             }
-            for word in words
+            for row in rows
         ],
-        "pagination": {
-            "current_page": page,
-            "total_pages": (total + items_per_page - 1) // items_per_page,
-            "total_items": total,
-            "items_per_page": items_per_page
-        }
+        "pagination": pagination(page, items_per_page, total, next_cursor, cursor)
+    })
+
+@router.get("/words/search", response_model=WordSearchResults)
+@http_cache()
+@db_handler
+def search(
+    q: str = Query(..., min_length=2),
+    limit: int = Query(20, ge=1, le=100),
+    fuzzy: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Ranked search over hungarian and english words.
+    Every query token matches as a prefix, ignoring case and diacritics.
+    With fuzzy=true, close matches are added when there are too few results.
+    """
+    return {
+        "query": q,
+        "items": search_words(db, q, limit, fuzzy)
     }
 
-@router.get("/words/{word_id}", response_model=Dict)
+@router.post("/words/import", response_model=VocabularyImport)
+def import_words(file: UploadFile, format: Literal["jsonl", "csv"] = "jsonl"):
+    """
+    Bulk-import words and groups from a JSONL or CSV upload.
+    The upload is parsed incrementally and committed in chunks; words are
+    deduplicated on (hungarian, english). On a malformed line, including
+    one that is not UTF-8, the chunks before it stay imported and a 400
+    names the line and how many records were imported.
+    Reading the upload and parsing it block, so in both database modes this
+    runs in the threadpool with its own sync session rather than on the
+    event loop through db_handler.
+    """
+    db = SessionLocal()
+    try:
+        counts = import_vocabulary(db, parse_vocabulary(decode_lines(file.file), format))
+    except VocabularyFormatError as e:
+        raise HTTPException(status_code=400, detail=f"{e}; {e.imported} records before it were imported")
+    finally:
+        db.close()
+        clear_count_cache()
+        dashboard_cache.invalidate_all()
+    
+    return {"success": True, **counts}
+
+@router.get("/words/export")
+def export_words(format: Literal["jsonl", "csv"] = "jsonl"):
+    """
+    Stream all words with their group names as JSONL or CSV.
+    Rows are read in chunks, so the table is never held in memory.
+    The session has to outlive the handler, for as long as the body streams,
+    so the generator opens its own; StreamingResponse iterates it in the
+    threadpool, off the event loop, in both database modes.
+    """
+    def lines():
+        db = SessionLocal()
+        try:
+            yield from export_vocabulary(db, format)
+        finally:
+            db.close()
+    
+    return StreamingResponse(
+        lines(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="vocabulary.{format}"'}
+    )
+
+@router.get("/words/{word_id}", response_model=WordDetail)
+@http_cache()
+@db_handler
 def get_word(word_id: int, db: Session = Depends(get_db)):
     """
     Get details of a specific word including its statistics and groups.
     """
-    word = db.query(Word).filter(Word.id == word_id).first()
+    word = word_stats_query(db, db.query(Word).filter(Word.id == word_id)).first()
     if not word:
         raise HTTPException(status_code=404, detail="Word not found")
     
-    correct = db.query(func.count(WordReviewItem.id)).filter(
-        WordReviewItem.word_id == word.id,
-        WordReviewItem.correct == True
-    ).scalar()
-    wrong = db.query(func.count(WordReviewItem.id)).filter(
-        WordReviewItem.word_id == word.id,
-        WordReviewItem.correct == False
-    ).scalar()
+    groups = db.query(Group.id, Group.name).join(
+        WordGroup, WordGroup.group_id == Group.id
+    ).filter(WordGroup.word_id == word_id).all()
     
     return {
         "hungarian": word.hungarian,
         "english": word.english,
         "stats": {
-            "correct_count": correct,
-            "wrong_count": wrong
+            "correct_count": word.correct_count,
+            "wrong_count": word.wrong_count
         },
         "groups": [
             {
                 "id": group.id,
                 "name": group.name
             }
-            for group in word.groups
+            for group in groups
         ]
     }
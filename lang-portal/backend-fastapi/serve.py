@@ -0,0 +1,99 @@
+"""
+Production launcher for the language portal API.
+
+Usage:
+    python serve.py
+    python serve.py --workers 4 --port 8080
+
+Runs the schema migrations and warms the OS page cache once, before the
+workers are started, then hands over to uvicorn. The worker count defaults
+to WORKERS, or to the number of cores available to the process when that
+is 0. uvloop and httptools are used when they are installed. On SIGTERM or
+SIGINT uvicorn stops accepting connections and waits up to
+SHUTDOWN_TIMEOUT_SECONDS for in-flight requests; each worker then drains
+its review buffer.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from importlib.util import find_spec
+import uvicorn
+from database import engine, get_settings, run_migrations
+from database.data_version import DataVersion
+
+settings = get_settings()
+
+# Chunk size for reading the database files into the OS page cache
+READ_CHUNK_BYTES = 1024 * 1024
+
+def worker_count(requested: int) -> int:
+    if requested > 0:
+        return requested
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def warm_page_cache() -> int:
+    """
+    Read the SQLite database and its WAL once, so the workers' first
+    queries are served from memory instead of disk.
+    """
+    path = engine.url.database
+    if engine.url.get_backend_name() != "sqlite" or not path or path == ":memory:":
+        return 0
+    read = 0
+    for name in (path, f"{path}-wal"):
+        if not os.path.exists(name):
+            continue
+        with open(name, "rb") as database_file:
+            while chunk := database_file.read(READ_CHUNK_BYTES):
+                read += len(chunk)
+    return read
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with uvicorn")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS, help="0 picks one per core")
+    args = parser.parse_args()
+    workers = worker_count(args.workers)
+
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        applied = run_migrations(engine)
+        if applied:
+            print(f"Applied migrations: {', '.join(str(version) for version in applied)}")
+    cached = warm_page_cache()
+    if cached:
+        print(f"Read {cached // 1024} KiB of database into the page cache")
+    # Workers open their own connections; none may be inherited from here
+    engine.dispose()
+
+    # Worker processes read their settings from the environment
+    os.environ["RUN_MIGRATIONS_ON_STARTUP"] = "false"
+    version_dir = None
+    if workers > 1:
+        # One data version for all workers, so ETags change everywhere on a write
+        version_file = settings.DATA_VERSION_FILE
+        if not version_file:
+            version_dir = tempfile.mkdtemp(prefix="lang-portal-")
+            version_file = os.path.join(version_dir, "data-version")
+        DataVersion.create_file(version_file)
+        os.environ["DATA_VERSION_FILE"] = version_file
+
+    try:
+        uvicorn.run(
+            "main:app",
+            host=args.host,
+            port=args.port,
+            workers=workers,
+            loop="uvloop" if find_spec("uvloop") else "asyncio",
+            http="httptools" if find_spec("httptools") else "h11",
+            timeout_graceful_shutdown=settings.SHUTDOWN_TIMEOUT_SECONDS,
+        )
+    finally:
+        if version_dir:
+            shutil.rmtree(version_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+# Point the app at a throwaway database before any module creates the engine
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from database import engine, run_migrations, rebuild_word_stats, Word, Group, WordGroup, StudySession, StudyActivity, WordReviewItem
+from database.database import SessionLocal
+
+SESSION_COUNT = 5
+WORDS_PER_SESSION = 4
+
+@pytest.fixture(scope="session")
+def seeded():
+    """
+    One group with a named activity, sessions with reviews and an end time,
+    and words in the group. Returns the ids the API tests request.
+    """
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        group = Group(name="Test group")
+        db.add(group)
+        db.add_all([Group(name=f"Empty group {i}") for i in range(3)])
+        db.flush()
+        activity = StudyActivity(name="Flashcards", group_id=group.id)
+        db.add(activity)
+        db.flush()
+        started = datetime(2025, 2, 8, 12, 0, 0)
+        sessions = [
+            StudySession(
+                group_id=group.id,
+                study_activity_id=activity.id,
+                created_at=started + timedelta(hours=i),
+                end_time=started + timedelta(hours=i, minutes=10),
+            )
+            for i in range(SESSION_COUNT)
+        ]
+        db.add_all(sessions)
+        words = [Word(hungarian=f"szó {i}", english=f"word {i}", parts={}) for i in range(SESSION_COUNT * WORDS_PER_SESSION)]
+        db.add_all(words)
+        db.flush()
+        for i, word in enumerate(words):
+            db.add(WordGroup(word_id=word.id, group_id=group.id))
+            db.add(WordReviewItem(word_id=word.id, study_session_id=sessions[i % SESSION_COUNT].id, correct=i % 3 != 0))
+        db.flush()
+        rebuild_word_stats(db)
+        db.commit()
+        return {"group": group.id, "activity": activity.id, "word": words[0].id, "reviews_per_session": WORDS_PER_SESSION}
+    finally:
+        db.close()
+
+@pytest.fixture(scope="session")
+def client(seeded):
+    from main import app
+    return TestClient(app)
@@ -0,0 +1,24 @@
+import pytest
+
+from database.cache import CacheBackend, MemoryCacheBackend, load_backend
+
+class IncompleteBackend(CacheBackend):
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+class NotABackend:
+    pass
+
+def test_load_backend_by_path():
+    assert isinstance(load_backend("database.cache:MemoryCacheBackend"), MemoryCacheBackend)
+
+def test_backend_missing_a_method_fails_when_created():
+    with pytest.raises(TypeError, match="delete"):
+        load_backend(f"{__name__}:IncompleteBackend")
+
+def test_backend_must_implement_the_interface():
+    with pytest.raises(TypeError, match="not a CacheBackend"):
+        load_backend(f"{__name__}:NotABackend")
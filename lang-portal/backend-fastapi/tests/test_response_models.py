@@ -0,0 +1,42 @@
+"""
+The hot list endpoints return pre-rendered ORJSONResponse bodies, which
+FastAPI does not check against their response_model. These tests hold the
+bodies to the declared models instead, so the handlers cannot drift from
+the OpenAPI contract unnoticed.
+"""
+import pytest
+from pydantic import TypeAdapter
+
+from routers import words, groups, study
+
+def declared_model(path: str):
+    for router in (words.router, groups.router, study.router):
+        for route in router.routes:
+            if route.path == path and "GET" in route.methods:
+                return route.response_model
+    raise LookupError(path)
+
+def assert_matches_model(adapter: TypeAdapter, response):
+    assert response.status_code == 200
+    page = adapter.validate_json(response.content)
+    assert page.items
+    # Nothing beyond the model either: fields it does not declare would be dropped here
+    assert adapter.dump_python(page, mode="json") == response.json()
+    return page
+
+@pytest.mark.parametrize("path", [
+    "/api/words",
+    "/api/groups",
+    "/api/groups/{group_id}/words",
+    "/api/groups/{group_id}/study_sessions",
+    "/api/study_activities/{activity_id}/study_sessions",
+])
+def test_list_body_matches_response_model(client, seeded, path):
+    url = path.format(group_id=seeded["group"], activity_id=seeded["activity"])
+    adapter = TypeAdapter(declared_model(path))
+    first = assert_matches_model(adapter, client.get(url, params={"items_per_page": 2}))
+    assert first.pagination.next_cursor
+    # Keyset mode without a total, where the pagination fields are null
+    assert_matches_model(adapter, client.get(url, params={
+        "items_per_page": 2, "cursor": first.pagination.next_cursor, "include_total": "false",
+    }))
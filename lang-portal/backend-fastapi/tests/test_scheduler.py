@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.scheduler import (
+    INITIAL_EASE, MAXIMUM_INTERVAL_DAYS, MINIMUM_EASE, NEW_WORD, ScheduleState, next_state
+)
+
+REVIEWED_AT = datetime(2025, 2, 8, 12, 0, 0)
+
+def review(state: ScheduleState, *answers: bool) -> ScheduleState:
+    for correct in answers:
+        state = next_state(state, correct, REVIEWED_AT)
+    return state
+
+def test_first_correct_review_is_due_next_day():
+    state = review(NEW_WORD, True)
+    assert state.repetitions == 1
+    assert state.interval_days == 1.0
+    assert state.ease == pytest.approx(INITIAL_EASE)
+    assert state.due_at == REVIEWED_AT + timedelta(days=1)
+    assert state.last_reviewed_at == REVIEWED_AT
+
+def test_correct_reviews_follow_sm2_intervals():
+    assert review(NEW_WORD, True, True).interval_days == 6.0
+    assert review(NEW_WORD, True, True, True).interval_days == pytest.approx(6.0 * INITIAL_EASE)
+
+def test_wrong_review_resets_repetitions_and_lowers_ease():
+    state = review(NEW_WORD, True, True, True, False)
+    assert state.repetitions == 0
+    assert state.interval_days == 1.0
+    assert state.ease == pytest.approx(INITIAL_EASE - 0.54)
+
+def test_ease_never_drops_below_minimum():
+    assert review(NEW_WORD, *[False] * 10).ease == MINIMUM_EASE
+
+def test_interval_is_capped():
+    state = ScheduleState(INITIAL_EASE, MAXIMUM_INTERVAL_DAYS - 1, 5, None, None)
+    assert next_state(state, True, REVIEWED_AT).interval_days == MAXIMUM_INTERVAL_DAYS
+
+def test_long_runs_of_correct_reviews_keep_due_at_valid():
+    state = review(NEW_WORD, *[True] * 200)
+    assert state.interval_days == MAXIMUM_INTERVAL_DAYS
+    assert state.due_at == REVIEWED_AT + timedelta(days=MAXIMUM_INTERVAL_DAYS)
@@ -0,0 +1,15 @@
+from main import timing_description, SERVER_TIMING_STATEMENT_CHARS
+
+def test_slowest_statement_is_in_server_timing(client, seeded):
+    # A URL no other test requests, so it is not answered from the response cache
+    header = client.get(f"/api/words/{seeded['word']}").headers["Server-Timing"]
+    slowest = next(metric for metric in header.split(", ") if metric.startswith("db-slowest;"))
+    assert ';desc="SELECT ' in slowest
+
+def test_timing_description_is_one_escaped_line():
+    statement = 'SELECT "words".id\n  FROM words WHERE hungarian = \'körte\\\\\' ' + "x" * 500
+    description = timing_description(statement)
+    assert description.startswith('"SELECT \\"words\\".id FROM words WHERE hungarian = \'k?rte\\\\\\\\\'')
+    assert description.endswith('..."')
+    assert "\n" not in description
+    assert len(description) <= SERVER_TIMING_STATEMENT_CHARS + 2 + description.count("\\")
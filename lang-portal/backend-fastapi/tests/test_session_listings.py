@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+@pytest.fixture
+def lazy_loads():
+    """
+    Statements of relationship loads issued while the test runs.
+    """
+    loads = []
+
+    def record(orm_execute_state):
+        if orm_execute_state.is_relationship_load:
+            loads.append(str(orm_execute_state.statement))
+
+    event.listen(Session, "do_orm_execute", record)
+    yield loads
+    event.remove(Session, "do_orm_execute", record)
+
+@pytest.mark.parametrize("url", [
+    "/api/groups/{group}/study_sessions",
+    "/api/study_activities/{activity}/study_sessions",
+])
+def test_session_listing_has_no_lazy_loads(client, seeded, lazy_loads, url):
+    response = client.get(url.format_map(seeded), params={"items_per_page": 2})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert len(items) == 2
+    assert lazy_loads == []
+    for item in items:
+        assert item["group_name"] == "Test group"
+        assert item["activity_name"] == "Flashcards"
+        assert item["end_time"] is not None
+        assert item["review_items_count"] == seeded["reviews_per_session"]
+
+def test_lazy_load_detector_sees_relationship_loads(seeded, lazy_loads):
+    from database.database import SessionLocal
+    from database import StudySession
+
+    db = SessionLocal()
+    try:
+        session = db.query(StudySession).first()
+        assert session.group.name == "Test group"
+    finally:
+        db.close()
+    assert len(lazy_loads) == 1
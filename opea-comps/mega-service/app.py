@@ -1,14 +1,63 @@
 from comps import MicroService, ServiceOrchestrator
 from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
 from comps.cores.mega.constants import ServiceType, ServiceRoleType
 from comps.cores.proto.api_protocol import ChatCompletionRequest, ChatCompletionResponse, ChatCompletionResponseChoice, ChatMessage, UsageInfo
+from comps.cores.proto.api_protocol import ChatCompletionStreamResponse, ChatCompletionResponseStreamChoice, DeltaMessage
+from comps.cores.proto.docarray import LLMParams
 
+from backends import BackendPool, parse_endpoints
+from batching import MicroBatcher, QueueFull
+from llm_cache import ResponseCache, cache_key
+from retrieval import VocabularyRetriever
+from streaming import SSE_DONE, iter_deltas, replay_deltas, sse_event
+
+import asyncio
+import logging
 import os
+import time
+from contextlib import nullcontext
 
 EMBEDDING_SERVICE_HOST_IP = os.getenv("EMBEDDING_SERVICE_HOST_IP", "0.0.0.0")
 EMBEDDING_SERVICE_PORT = os.getenv("EMBEDDING_SERVICE_PORT", 6000)
+# Comma-separated host:port list of embedding replicas; defaults to the host and port above
+EMBEDDING_SERVICE_ENDPOINTS = os.getenv("EMBEDDING_SERVICE_ENDPOINTS", "")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+RETRIEVAL_ENABLED = os.getenv("RETRIEVAL_ENABLED", "false").lower() == "true"
+WORDS_DATABASE_PATH = os.getenv(
+	"WORDS_DATABASE_PATH",
+	os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "lang-portal", "backend-fastapi", "words.db")
+)
+RETRIEVAL_INDEX_PATH = os.getenv("RETRIEVAL_INDEX_PATH")  # directory for the memory-mapped index; unset keeps it in memory
+RETRIEVAL_INDEX_TYPE = os.getenv("RETRIEVAL_INDEX_TYPE", "flat")  # or "ivf"
+RETRIEVAL_IVF_LISTS = int(os.getenv("RETRIEVAL_IVF_LISTS", 0))  # 0 picks about sqrt(words)
+RETRIEVAL_IVF_PROBES = int(os.getenv("RETRIEVAL_IVF_PROBES", 8))
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", 5))
+RETRIEVAL_MIN_SCORE = float(os.getenv("RETRIEVAL_MIN_SCORE", 0.2))
+RETRIEVAL_REFRESH_SECONDS = float(os.getenv("RETRIEVAL_REFRESH_SECONDS", 60))
 LLM_SERVICE_HOST_IP = os.getenv("LLM_SERVICE_HOST_IP", "0.0.0.0")
 LLM_SERVICE_PORT = os.getenv("LLM_SERVICE_PORT", 9000)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", 24 * 60 * 60))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH")  # SQLite file; unset keeps the cache in memory
+LLM_BATCH_ENABLED = os.getenv("LLM_BATCH_ENABLED", "false").lower() == "true"
+LLM_BATCH_MAX_SIZE = int(os.getenv("LLM_BATCH_MAX_SIZE", 8))
+LLM_BATCH_MAX_WAIT_MS = float(os.getenv("LLM_BATCH_MAX_WAIT_MS", 10))
+LLM_BATCH_MAX_CONCURRENCY = int(os.getenv("LLM_BATCH_MAX_CONCURRENCY", 4))
+LLM_QUEUE_MAX_DEPTH = int(os.getenv("LLM_QUEUE_MAX_DEPTH", 256))
+# Comma-separated host:port list of LLM replicas; when set, LLM calls are
+# balanced across them instead of going to LLM_SERVICE_HOST_IP:PORT
+LLM_SERVICE_ENDPOINTS = os.getenv("LLM_SERVICE_ENDPOINTS", "")
+LLM_LOAD_BALANCING = os.getenv("LLM_LOAD_BALANCING", "least_outstanding")  # or "round_robin"
+LLM_HEALTH_CHECK_PATH = os.getenv("LLM_HEALTH_CHECK_PATH", "/v1/models")
+LLM_HEALTH_CHECK_INTERVAL = float(os.getenv("LLM_HEALTH_CHECK_INTERVAL", 10))
+LLM_EJECT_AFTER_FAILURES = int(os.getenv("LLM_EJECT_AFTER_FAILURES", 3))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+LLM_ENDPOINT = "/v1/chat/completions"
+# OpenAI request fields taken from LLMParams when calling the replicas directly
+LLM_BODY_PARAMS = ("max_tokens", "temperature", "top_p", "stream")
 
 
 class ExampleService:
@@ -17,26 +66,53 @@ class ExampleService:
 		self.port = port
 		self.endpoint = "/v1/example"
 		self.megaservice = ServiceOrchestrator()
+		self.cache = ResponseCache(LLM_CACHE_MAX_BYTES, LLM_CACHE_TTL_SECONDS, LLM_CACHE_PATH) if LLM_CACHE_ENABLED else None
+		self.batcher = MicroBatcher(
+			self.complete_batch,
+			max_batch_size=LLM_BATCH_MAX_SIZE,
+			max_wait_ms=LLM_BATCH_MAX_WAIT_MS,
+			max_concurrency=LLM_BATCH_MAX_CONCURRENCY,
+			max_queue=LLM_QUEUE_MAX_DEPTH,
+		) if LLM_BATCH_ENABLED else None
+		self.llm_pool = BackendPool(
+			parse_endpoints(LLM_SERVICE_ENDPOINTS),
+			strategy=LLM_LOAD_BALANCING,
+			health_path=LLM_HEALTH_CHECK_PATH,
+			health_interval=LLM_HEALTH_CHECK_INTERVAL,
+			eject_after=LLM_EJECT_AFTER_FAILURES,
+			max_connections=LLM_MAX_CONNECTIONS,
+		) if LLM_SERVICE_ENDPOINTS else None
+		self.retriever = None
+		if RETRIEVAL_ENABLED:
+			embedding_pool = BackendPool(
+				parse_endpoints(EMBEDDING_SERVICE_ENDPOINTS or f"{EMBEDDING_SERVICE_HOST_IP}:{EMBEDDING_SERVICE_PORT}"),
+				health_path="/v1/health_check",
+				health_interval=LLM_HEALTH_CHECK_INTERVAL,
+				eject_after=LLM_EJECT_AFTER_FAILURES,
+			)
+			self.retriever = VocabularyRetriever(
+				embedding_pool,
+				WORDS_DATABASE_PATH,
+				model=EMBEDDING_MODEL,
+				index_path=RETRIEVAL_INDEX_PATH,
+				index_type=RETRIEVAL_INDEX_TYPE,
+				ivf_lists=RETRIEVAL_IVF_LISTS,
+				ivf_probes=RETRIEVAL_IVF_PROBES,
+				batch_size=EMBEDDING_BATCH_SIZE,
+				refresh_seconds=RETRIEVAL_REFRESH_SECONDS,
+			)
 
 	def add_remote_service(self):
-		embedding = MicroService(
-			name="embedding",
-			host=EMBEDDING_SERVICE_HOST_IP,
-			port=EMBEDDING_SERVICE_PORT,
-			endpoint="/v1/embeddings",
-			use_remote_service=True,
-			service_type=ServiceType.EMBEDDING,
-		)
 		llm = MicroService(
 			name="llm",
 			host=LLM_SERVICE_HOST_IP,
 			port=LLM_SERVICE_PORT,
-			endpoint="/v1/chat/completions",
+			endpoint=LLM_ENDPOINT,
 			use_remote_service=True,
 			service_type=ServiceType.LLM,
 		)
-		# self.megaservice.add(embedding).add(llm)
-		# self.megaservice.flow_to(embedding, llm)
+		# Retrieval runs in add_context before the LLM is scheduled: the vector
+		# index lives in this process, so there is no retriever node to flow to
 		self.megaservice.add(llm)
         
 	def start(self):
@@ -51,38 +127,167 @@ class ExampleService:
 		)
 			
 		self.service.add_route(self.endpoint, self.handle_request, methods=["POST"])
+		self.service.add_route(f"{self.endpoint}/cache", self.cache_stats, methods=["GET"])
+		self.service.add_route(f"{self.endpoint}/batching", self.batching_stats, methods=["GET"])
+		self.service.add_route(f"{self.endpoint}/backends", self.backend_stats, methods=["GET"])
+		self.service.add_route(f"{self.endpoint}/retrieval", self.retrieval_stats, methods=["GET"])
+		if self.cache:
+			self.service.app.add_event_handler("shutdown", self.cache.close)
+		if self.llm_pool:
+			self.service.app.add_event_handler("shutdown", self.llm_pool.close)
+		if self.retriever:
+			# The index is built in the background, not inside the first request
+			self.service.app.add_event_handler("startup", self.retriever.start)
+			self.service.app.add_event_handler("shutdown", self.retriever.stop)
 		self.service.start()
 
+	def llm_parameters(self, request: ChatCompletionRequest) -> LLMParams:
+		# The orchestrator copies these into the LLM request body, "stream" included
+		params = {"stream": bool(request.stream)}
+		if request.max_tokens:
+			params["max_tokens"] = request.max_tokens
+		if request.temperature is not None:
+			params["temperature"] = request.temperature
+		if request.top_p is not None:
+			params["top_p"] = request.top_p
+		return LLMParams(**params)
+
+	async def stream_response(self, deltas, model: str, key: str = None, started: float = None):
+		# One id for every chunk of the completion, as OpenAI does
+		chunk = ChatCompletionStreamResponse(
+			model=model,
+			choices=[ChatCompletionResponseStreamChoice(index=0, delta=DeltaMessage(role="assistant", content=""))]
+		)
+		yield sse_event(chunk.model_dump_json())
+		finish_reason = "stop"
+		parts = []
+		async for delta in deltas:
+			if delta.finish_reason:
+				finish_reason = delta.finish_reason
+			if delta.text:
+				parts.append(delta.text)
+				chunk.choices = [ChatCompletionResponseStreamChoice(index=0, delta=DeltaMessage(content=delta.text))]
+				yield sse_event(chunk.model_dump_json())
+		chunk.choices = [ChatCompletionResponseStreamChoice(index=0, delta=DeltaMessage(), finish_reason=finish_reason)]
+		yield sse_event(chunk.model_dump_json())
+		yield SSE_DONE
+		if key is not None:
+			# Only a stream that ran to the end is worth replaying
+			self.cache.set(key, "".join(parts), time.perf_counter() - started)
+
+	async def read_content(self, llm_response) -> str:
+		if isinstance(llm_response, dict):
+			# Non-streaming calls come back as the parsed chat.completion JSON
+			choices = llm_response.get("choices") or [{}]
+			return (choices[0].get("message") or {}).get("content") or ""
+		parts = []
+		async for delta in iter_deltas(llm_response.body_iterator):
+			parts.append(delta.text)
+		return "".join(parts)
+
+	async def schedule_llm(self, ollama_request: dict, llm_parameters: LLMParams):
+		if self.llm_pool:
+			# Same body the orchestrator would send, to the least busy replica
+			params = llm_parameters.dict()
+			payload = {**ollama_request, **{name: params[name] for name in LLM_BODY_PARAMS if params.get(name) is not None}}
+			if llm_parameters.stream:
+				return StreamingResponse(await self.llm_pool.stream(LLM_ENDPOINT, payload), media_type="text/event-stream")
+			return await self.llm_pool.post(LLM_ENDPOINT, payload)
+		# Schedule the request through the orchestrator
+		result = await self.megaservice.schedule(ollama_request, llm_parameters=llm_parameters)
+		if isinstance(result, tuple) and len(result) > 0:
+			return result[0].get('llm/MicroService')
+		return None
+
+	async def complete(self, ollama_request: dict, llm_parameters: LLMParams) -> str:
+		llm_response = await self.schedule_llm(ollama_request, llm_parameters)
+		if llm_response is None:
+			raise ValueError("No response content available")
+		return await self.read_content(llm_response)
+
+	async def complete_batch(self, model: str, items: list) -> list:
+		# The LLM API takes one conversation per call, so a batch goes out as
+		# concurrent calls for the same model, back to back
+		return await asyncio.gather(*(self.complete(*item) for item in items), return_exceptions=True)
+
+	async def generate(self, model: str, ollama_request: dict, llm_parameters: LLMParams) -> str:
+		if self.batcher:
+			return await self.batcher.submit(model, (ollama_request, llm_parameters))
+		return await self.complete(ollama_request, llm_parameters)
+
+	async def stream(self, ollama_request: dict, llm_parameters: LLMParams, model: str, key: str) -> StreamingResponse:
+		cached = self.cache.lookup(key) if self.cache else None
+		if cached is not None:
+			deltas = replay_deltas(cached.content)
+			key = None
+		else:
+			started = time.perf_counter()
+			# Streams skip batching but not the queue limit
+			with self.batcher.admit() if self.batcher else nullcontext():
+				llm_response = await self.schedule_llm(ollama_request, llm_parameters)
+			if llm_response is None:
+				raise ValueError("No response content available")
+			if hasattr(llm_response, 'body_iterator'):
+				# Pass tokens through as they arrive instead of waiting for the whole answer
+				deltas = iter_deltas(llm_response.body_iterator)
+			else:
+				deltas = replay_deltas(await self.read_content(llm_response))
+			if not self.cache:
+				key = None
+		return StreamingResponse(
+			self.stream_response(deltas, model, key, started if key else None),
+			media_type="text/event-stream",
+			headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+		)
+
+	async def add_context(self, ollama_request: dict, messages):
+		if isinstance(messages, str):
+			query = messages
+		else:
+			user_messages = [message for message in messages if message.get("role") == "user"]
+			query = str(user_messages[-1].get("content", "")) if user_messages else ""
+		if not query.strip():
+			return
+		try:
+			words = await self.retriever.search(query, RETRIEVAL_TOP_K, RETRIEVAL_MIN_SCORE)
+		except Exception as e:
+			# Answer without context rather than fail the request
+			logging.getLogger(__name__).warning("Vocabulary retrieval failed: %s", e)
+			return
+		if words:
+			context = "\n".join(f"- {word['text']}" for word in words)
+			ollama_request["messages"].insert(0, {
+				"role": "system",
+				"content": f"Relevant entries from the learner's Hungarian - English vocabulary:\n{context}"
+			})
+
 	async def handle_request(self, request: ChatCompletionRequest) -> ChatCompletionResponse:
 		try:
+			model = request.model or "llama3.2:1b"  # or whatever default model you're using
 				# Format the request for Ollama
 			ollama_request = {
-				"model": request.model or "llama3.2:1b",  # or whatever default model you're using
+				"model": model,
 				"messages": [
 						{
 								"role": "user",
 								"content": request.messages  # assuming messages is a string
 						}
 				],
-				"stream": False  # disable streaming for now
+				"stream": bool(request.stream)
 			}
-			
-			# Schedule the request through the orchestrator
-			result = await self.megaservice.schedule(ollama_request)
-			
-			# Extract the actual content from the response
-			if isinstance(result, tuple) and len(result) > 0:
-				llm_response = result[0].get('llm/MicroService')
-				if hasattr(llm_response, 'body'):
-					# Read and process the response
-					response_body = b""
-					async for chunk in llm_response.body_iterator:
-						response_body += chunk
-					content = response_body.decode('utf-8')
-				else:
-					content = "No response content available"
+			if self.retriever:
+				await self.add_context(ollama_request, request.messages)
+			llm_parameters = self.llm_parameters(request)
+			# Keyed on the messages the LLM will see, retrieved context included
+			key = cache_key(model, ollama_request["messages"], request.model_dump())
+
+			if request.stream:
+				return await self.stream(ollama_request, llm_parameters, model, key)
+			if self.cache:
+				# Identical prompts in flight share one upstream call
+				content = await self.cache.get_or_compute(key, lambda: self.generate(model, ollama_request, llm_parameters))
 			else:
-				content = "Invalid response format"
+				content = await self.generate(model, ollama_request, llm_parameters)
 
 			# Create the response
 			response = ChatCompletionResponse(
@@ -105,10 +310,32 @@ class ExampleService:
 			)
 			
 			return response
-				
+
+		except QueueFull as e:
+			raise HTTPException(status_code=429, detail=f"Too many requests queued: {e}", headers={"Retry-After": "1"})
 		except Exception as e:
 			# Handle any errors
 			raise HTTPException(status_code=500, detail=str(e))
+
+	async def cache_stats(self):
+		if not self.cache:
+			return {"enabled": False}
+		return {"enabled": True, **self.cache.stats()}
+
+	async def batching_stats(self):
+		if not self.batcher:
+			return {"enabled": False}
+		return {"enabled": True, **self.batcher.stats()}
+
+	async def retrieval_stats(self):
+		if not self.retriever:
+			return {"enabled": False}
+		return {"enabled": True, **self.retriever.stats(), "embedding_backends": self.retriever.pool.stats()["backends"]}
+
+	async def backend_stats(self):
+		if not self.llm_pool:
+			return {"enabled": False, "backends": [f"http://{LLM_SERVICE_HOST_IP}:{LLM_SERVICE_PORT}"]}
+		return {"enabled": True, **self.llm_pool.stats()}
         
 example = ExampleService()
 example.add_remote_service()
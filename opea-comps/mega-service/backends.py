@@ -0,0 +1,261 @@
+import asyncio
+import itertools
+import time
+import weakref
+from typing import Dict, List, Optional
+
+import httpx
+
+# Weight of the newest sample in the moving latency average
+LATENCY_EWMA_ALPHA = 0.2
+
+
+class NoBackendAvailable(Exception):
+	pass
+
+
+def backend_fault(error: Exception) -> bool:
+	"""Whether an error says something about the backend's health: it could
+	not be reached, timed out or failed with a 5xx. A 4xx is the request's
+	fault and does not count towards ejection."""
+	if isinstance(error, httpx.HTTPStatusError):
+		return error.response.status_code >= 500
+	return isinstance(error, (httpx.NetworkError, httpx.TimeoutException))
+
+
+def parse_endpoints(value: str) -> List[str]:
+	"""Comma-separated host:port or URL list to base URLs."""
+	urls = []
+	for endpoint in value.split(","):
+		endpoint = endpoint.strip().rstrip("/")
+		if endpoint:
+			urls.append(endpoint if "://" in endpoint else f"http://{endpoint}")
+	return urls
+
+
+class Backend:
+	def __init__(self, url: str):
+		self.url = url
+		self.healthy = True
+		self.outstanding = 0
+		self.requests = 0
+		self.failures = 0
+		self.consecutive_failures = 0
+		self.total_seconds = 0.0
+		self.ewma_seconds = None
+		self.last_error = None
+
+	def record_success(self, seconds: float):
+		self.requests += 1
+		self.consecutive_failures = 0
+		self.total_seconds += seconds
+		if self.ewma_seconds is None:
+			self.ewma_seconds = seconds
+		else:
+			self.ewma_seconds += LATENCY_EWMA_ALPHA * (seconds - self.ewma_seconds)
+
+	def record_failure(self, error: Exception, eject_after: int):
+		self.requests += 1
+		self.failures += 1
+		self.consecutive_failures += 1
+		self.last_error = f"{type(error).__name__}: {error}"
+		if self.consecutive_failures >= eject_after:
+			self.healthy = False
+
+	def stats(self) -> Dict:
+		succeeded = self.requests - self.failures
+		return {
+			"url": self.url,
+			"healthy": self.healthy,
+			"outstanding": self.outstanding,
+			"requests": self.requests,
+			"failures": self.failures,
+			"avg_ms": round(self.total_seconds / succeeded * 1000, 1) if succeeded else None,
+			"ewma_ms": round(self.ewma_seconds * 1000, 1) if self.ewma_seconds is not None else None,
+			"last_error": self.last_error,
+		}
+
+
+class BackendPool:
+	"""Replicas of one remote service behind a shared keep-alive client.
+
+	Each request goes to the healthy backend with the fewest requests in
+	flight ("least_outstanding") or to the next one in turn
+	("round_robin"). A backend is ejected after eject_after consecutive
+	failures and readmitted once its health check passes. Connection errors
+	are retried on another backend.
+	"""
+
+	def __init__(
+		self,
+		urls: List[str],
+		strategy: str = "least_outstanding",
+		health_path: str = "/v1/models",
+		health_interval: float = 10,
+		eject_after: int = 3,
+		max_connections: int = 100,
+		timeout: float = 600,
+	):
+		if not urls:
+			raise ValueError("BackendPool needs at least one backend")
+		if strategy not in ("least_outstanding", "round_robin"):
+			raise ValueError(f"Unknown load balancing strategy: {strategy}")
+		self.backends = [Backend(url) for url in urls]
+		self.strategy = strategy
+		self.health_path = health_path
+		self.health_interval = health_interval
+		self.eject_after = eject_after
+		self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+		self.timeout = httpx.Timeout(timeout, connect=5)
+		self.rotation = itertools.count()
+		self.client: Optional[httpx.AsyncClient] = None
+		self.health_task: Optional[asyncio.Task] = None
+
+	def start(self):
+		# Created on first use, inside the server's event loop
+		if self.client is None:
+			self.client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+		if self.health_task is None and self.health_interval > 0:
+			self.health_task = asyncio.get_running_loop().create_task(self.check_health_forever())
+
+	async def close(self):
+		if self.health_task is not None:
+			self.health_task.cancel()
+			self.health_task = None
+		if self.client is not None:
+			await self.client.aclose()
+			self.client = None
+
+	def choose(self, exclude=()) -> Backend:
+		candidates = [backend for backend in self.backends if backend.healthy and backend not in exclude]
+		if not candidates:
+			# Everything is ejected: try the rest rather than fail outright
+			candidates = [backend for backend in self.backends if backend not in exclude]
+		if not candidates:
+			raise NoBackendAvailable("No backend left to try")
+		turn = next(self.rotation)
+		if self.strategy == "round_robin":
+			return candidates[turn % len(candidates)]
+		# Rotate first so ties are spread instead of always hitting the first backend
+		offset = turn % len(candidates)
+		rotated = candidates[offset:] + candidates[:offset]
+		return min(rotated, key=lambda backend: backend.outstanding)
+
+	async def post(self, path: str, payload: Dict) -> Dict:
+		self.start()
+		tried = []
+		while True:
+			backend = self.choose(exclude=tried)
+			tried.append(backend)
+			backend.outstanding += 1
+			started = time.perf_counter()
+			try:
+				response = await self.client.post(backend.url + path, json=payload)
+				response.raise_for_status()
+				data = response.json()
+			except httpx.HTTPError as e:
+				self.record_error(backend, e, started)
+				if len(tried) < len(self.backends) and isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
+					continue
+				raise
+			finally:
+				backend.outstanding -= 1
+			backend.record_success(time.perf_counter() - started)
+			return data
+
+	async def stream(self, path: str, payload: Dict) -> "BackendStream":
+		"""Connect to a backend and return its response body as it arrives.
+
+		Connecting happens here, so a dead backend is retried or reported
+		before anything is sent to the client; latency is recorded to the
+		last byte.
+		"""
+		self.start()
+		tried = []
+		while True:
+			backend = self.choose(exclude=tried)
+			tried.append(backend)
+			backend.outstanding += 1
+			started = time.perf_counter()
+			try:
+				request = self.client.build_request("POST", backend.url + path, json=payload)
+				response = await self.client.send(request, stream=True)
+				if response.is_error:
+					await response.aclose()
+					response.raise_for_status()
+			except httpx.HTTPError as e:
+				backend.outstanding -= 1
+				self.record_error(backend, e, started)
+				if len(tried) < len(self.backends) and isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
+					continue
+				raise
+			return BackendStream(self, backend, response, started)
+
+	def record_error(self, backend: Backend, error: Exception, started: float):
+		if backend_fault(error):
+			backend.record_failure(error, self.eject_after)
+		else:
+			# The backend answered; the request itself was rejected
+			backend.record_success(time.perf_counter() - started)
+
+	async def check_health(self, backend: Backend):
+		try:
+			response = await self.client.get(backend.url + self.health_path, timeout=5)
+			response.raise_for_status()
+		except httpx.HTTPError as e:
+			backend.last_error = f"health check: {type(e).__name__}: {e}"
+			backend.healthy = False
+		else:
+			backend.healthy = True
+			backend.consecutive_failures = 0
+
+	async def check_health_forever(self):
+		while True:
+			await asyncio.gather(*(self.check_health(backend) for backend in self.backends))
+			await asyncio.sleep(self.health_interval)
+
+	def stats(self) -> Dict:
+		return {"strategy": self.strategy, "backends": [backend.stats() for backend in self.backends]}
+
+
+def release_unread(backend: Backend, response: httpx.Response, loop: asyncio.AbstractEventLoop):
+	backend.outstanding -= 1
+	if not loop.is_closed():
+		loop.call_soon_threadsafe(lambda: loop.create_task(response.aclose()))
+
+
+class BackendStream:
+	"""Body of a streamed backend response.
+
+	The connection is closed and the backend's outstanding count released
+	exactly once: at the end of the body, on an error, on aclose(), or when
+	the stream is dropped without ever being read.
+	"""
+
+	def __init__(self, pool: BackendPool, backend: Backend, response: httpx.Response, started: float):
+		self.pool = pool
+		self.backend = backend
+		self.response = response
+		self.started = started
+		self.chunks = response.aiter_bytes()
+		self.finalizer = weakref.finalize(self, release_unread, backend, response, asyncio.get_running_loop())
+
+	def __aiter__(self):
+		return self
+
+	async def __anext__(self) -> bytes:
+		try:
+			return await self.chunks.__anext__()
+		except StopAsyncIteration:
+			self.backend.record_success(time.perf_counter() - self.started)
+			await self.aclose()
+			raise
+		except httpx.HTTPError as e:
+			self.pool.record_error(self.backend, e, self.started)
+			await self.aclose()
+			raise
+
+	async def aclose(self):
+		if self.finalizer.detach() is not None:
+			self.backend.outstanding -= 1
+			await self.response.aclose()
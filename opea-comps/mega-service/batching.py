@@ -0,0 +1,114 @@
+import asyncio
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple
+
+
+class QueueFull(Exception):
+	pass
+
+
+class Pending(NamedTuple):
+	item: Any
+	future: asyncio.Future
+
+
+class MicroBatcher:
+	"""Gathers requests per key (the model) for up to max_wait_ms or
+	max_batch_size items and hands each batch to dispatch in one call.
+
+	At most max_concurrency batches run at once; requests waiting for a
+	batch or for a free slot count towards max_queue, past which submit
+	raises QueueFull. Requests that cannot be batched (streams) are
+	admitted against the same limit with admit().
+	"""
+
+	def __init__(
+		self,
+		dispatch: Callable[[str, List[Any]], Awaitable[List[Any]]],
+		max_batch_size: int = 8,
+		max_wait_ms: float = 10,
+		max_concurrency: int = 4,
+		max_queue: int = 256,
+	):
+		self.dispatch = dispatch
+		self.max_batch_size = max_batch_size
+		self.max_wait = max_wait_ms / 1000
+		self.max_queue = max_queue
+		self.semaphore = asyncio.Semaphore(max_concurrency)
+		self.queues: Dict[str, List[Pending]] = {}
+		self.timers: Dict[str, asyncio.TimerHandle] = {}
+		self.tasks = set()
+		self.depth = 0
+		self.batches = 0
+		self.dispatched = 0
+		self.rejected = 0
+
+	def check_queue(self):
+		if self.depth >= self.max_queue:
+			self.rejected += 1
+			raise QueueFull(f"{self.depth} requests already queued")
+
+	@contextmanager
+	def admit(self):
+		"""Count an unbatched request towards max_queue until the LLM has
+		started answering it, i.e. for the duration of the with block."""
+		self.check_queue()
+		self.depth += 1
+		try:
+			yield
+		finally:
+			self.depth -= 1
+
+	async def submit(self, key: str, item: Any) -> Any:
+		self.check_queue()
+		loop = asyncio.get_running_loop()
+		future = loop.create_future()
+		queue = self.queues.setdefault(key, [])
+		queue.append(Pending(item, future))
+		self.depth += 1
+		if len(queue) >= self.max_batch_size:
+			self.flush(key)
+		elif key not in self.timers:
+			self.timers[key] = loop.call_later(self.max_wait, self.flush, key)
+		return await future
+
+	def flush(self, key: str):
+		timer = self.timers.pop(key, None)
+		if timer is not None:
+			timer.cancel()
+		batch = self.queues.pop(key, None)
+		if batch:
+			task = asyncio.get_running_loop().create_task(self.run(key, batch))
+			# Keep a reference until the batch is done
+			self.tasks.add(task)
+			task.add_done_callback(self.tasks.discard)
+
+	async def run(self, key: str, batch: List[Pending]):
+		async with self.semaphore:
+			self.depth -= len(batch)
+			self.batches += 1
+			self.dispatched += len(batch)
+			try:
+				results = await self.dispatch(key, [pending.item for pending in batch])
+				if len(results) != len(batch):
+					raise RuntimeError(f"dispatch returned {len(results)} results for {len(batch)} requests")
+			except Exception as e:
+				results = [e] * len(batch)
+		for pending, result in zip(batch, results):
+			if pending.future.done():
+				# The caller went away
+				continue
+			if isinstance(result, BaseException):
+				pending.future.set_exception(result)
+			else:
+				pending.future.set_result(result)
+
+	def stats(self) -> Dict:
+		return {
+			"queue_depth": self.depth,
+			"max_queue": self.max_queue,
+			"batches": self.batches,
+			"dispatched": self.dispatched,
+			"avg_batch_size": round(self.dispatched / self.batches, 2) if self.batches else 0.0,
+			"rejected": self.rejected,
+		}
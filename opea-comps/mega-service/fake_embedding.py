@@ -0,0 +1,64 @@
+"""Deterministic stand-in for the embedding service.
+
+Serves an OpenAI-compatible /v1/embeddings that hashes the character
+trigrams of each input into FAKE_EMBEDDING_DIM buckets, so the same text
+always gets the same vector and similar spellings get similar ones.
+
+	python fake_embedding.py --port 6000
+	RETRIEVAL_ENABLED=true EMBEDDING_SERVICE_PORT=6000 python app.py
+"""
+from fastapi import FastAPI, Request
+
+import argparse
+import hashlib
+import math
+import os
+import unicodedata
+
+DIM = int(os.getenv("FAKE_EMBEDDING_DIM", 256))
+
+app = FastAPI(title="Fake embedding")
+
+
+def embed(text: str):
+	text = unicodedata.normalize("NFKD", text.lower())
+	text = "".join(char for char in text if not unicodedata.combining(char))
+	vector = [0.0] * DIM
+	for word in text.split():
+		padded = f"  {word} "
+		for i in range(len(padded) - 2):
+			digest = hashlib.blake2b(padded[i:i + 3].encode("utf-8"), digest_size=4).digest()
+			bucket = int.from_bytes(digest, "little")
+			# The top bit picks the sign, so unrelated trigrams tend to cancel out
+			vector[bucket % DIM] += -1.0 if bucket >> 31 else 1.0
+	norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+	return [value / norm for value in vector]
+
+
+@app.get("/v1/health_check")
+async def health_check():
+	return {"status": "ok"}
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+	body = await request.json()
+	inputs = body.get("input") or []
+	if isinstance(inputs, str):
+		inputs = [inputs]
+	return {
+		"object": "list",
+		"model": body.get("model") or "fake-embedding",
+		"data": [{"object": "embedding", "index": i, "embedding": embed(text)} for i, text in enumerate(inputs)],
+		"usage": {"prompt_tokens": 0, "total_tokens": 0},
+	}
+
+
+if __name__ == "__main__":
+	import uvicorn
+
+	parser = argparse.ArgumentParser(description="Fake OpenAI-compatible embedding service")
+	parser.add_argument("--host", default="0.0.0.0")
+	parser.add_argument("--port", type=int, default=int(os.getenv("EMBEDDING_SERVICE_PORT", 6000)))
+	args = parser.parse_args()
+	uvicorn.run(app, host=args.host, port=args.port)
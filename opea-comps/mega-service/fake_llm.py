@@ -0,0 +1,89 @@
+"""Stand-in for the Ollama LLM service, for measuring latency without a model.
+
+Serves an OpenAI-compatible /v1/chat/completions that answers with a fixed
+number of tokens, waiting FAKE_LLM_FIRST_TOKEN_MS before the first one and
+FAKE_LLM_TOKEN_MS between the others, streamed as SSE when "stream" is set.
+
+	python fake_llm.py --port 9000
+	LLM_SERVICE_PORT=9000 python app.py
+"""
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+
+FIRST_TOKEN_MS = float(os.getenv("FAKE_LLM_FIRST_TOKEN_MS", 200))
+TOKEN_MS = float(os.getenv("FAKE_LLM_TOKEN_MS", 20))
+TOKENS = int(os.getenv("FAKE_LLM_TOKENS", 64))
+
+app = FastAPI(title="Fake LLM")
+
+
+def completion_tokens(body: dict):
+	count = min(TOKENS, body.get("max_tokens") or TOKENS)
+	return [f"token{i} " for i in range(count)]
+
+
+async def generate(tokens):
+	await asyncio.sleep(FIRST_TOKEN_MS / 1000)
+	for i, token in enumerate(tokens):
+		if i:
+			await asyncio.sleep(TOKEN_MS / 1000)
+		yield token
+
+
+@app.get("/v1/models")
+async def models():
+	# Also serves as the health check of the mega-service backend pool
+	return {"object": "list", "data": [{"id": "fake", "object": "model", "owned_by": "fake_llm"}]}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+	body = await request.json()
+	model = body.get("model") or "fake"
+	completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+	created = int(time.time())
+	tokens = completion_tokens(body)
+
+	if not body.get("stream"):
+		content = "".join([token async for token in generate(tokens)])
+		return {
+			"id": completion_id,
+			"object": "chat.completion",
+			"created": created,
+			"model": model,
+			"choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+			"usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+		}
+
+	async def events():
+		async for token in generate(tokens):
+			chunk = {
+				"id": completion_id,
+				"object": "chat.completion.chunk",
+				"created": created,
+				"model": model,
+				"choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+			}
+			yield f"data: {json.dumps(chunk)}\n\n"
+		chunk["choices"] = [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+		yield f"data: {json.dumps(chunk)}\n\n"
+		yield "data: [DONE]\n\n"
+
+	return StreamingResponse(events(), media_type="text/event-stream")
+
+
+if __name__ == "__main__":
+	import uvicorn
+
+	parser = argparse.ArgumentParser(description="Fake OpenAI-compatible LLM service")
+	parser.add_argument("--host", default="0.0.0.0")
+	parser.add_argument("--port", type=int, default=int(os.getenv("LLM_SERVICE_PORT", 9000)))
+	args = parser.parse_args()
+	uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,227 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional
+
+# Sampling parameters that change the answer; anything else is ignored in the key
+KEY_PARAMS = ("max_tokens", "temperature", "top_p", "top_k", "seed", "stop", "frequency_penalty", "presence_penalty", "n")
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry(NamedTuple):
+	content: str
+	size: int
+	created_at: float
+	upstream_seconds: float
+
+
+def normalise(value):
+	if isinstance(value, str):
+		return " ".join(value.split())
+	if isinstance(value, dict):
+		return {key: normalise(item) for key, item in value.items() if item is not None}
+	if isinstance(value, (list, tuple)):
+		return [normalise(item) for item in value]
+	return value
+
+
+def cache_key(model: str, messages, params: Dict) -> str:
+	"""Hash of the request as the LLM sees it, insensitive to whitespace and key order."""
+	payload = {
+		"model": model,
+		"messages": normalise(messages),
+		"params": normalise({name: params.get(name) for name in KEY_PARAMS}),
+	}
+	return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+	"""LRU cache of LLM answers with a TTL, a size bound in bytes and
+	optional SQLite persistence.
+
+	Concurrent misses for the same key are coalesced: the first caller runs
+	the upstream request and the others await its result. SQLite writes run
+	on one background thread, with hits' used_at updates batched, so the
+	event loop never waits on a commit.
+	"""
+
+	def __init__(self, max_bytes: int, ttl_seconds: float = 0, path: Optional[str] = None):
+		self.max_bytes = max_bytes
+		self.ttl_seconds = ttl_seconds
+		self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+		self.size = 0
+		self.inflight: Dict[str, asyncio.Future] = {}
+		self.hits = 0
+		self.misses = 0
+		self.coalesced = 0
+		self.saved_seconds = 0.0
+		self.db = None
+		self.writer = None
+		self.touched: Dict[str, float] = {}
+		self.touched_lock = threading.Lock()
+		if path:
+			self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-cache")
+			self.db = sqlite3.connect(path, check_same_thread=False)
+			self.db.execute("PRAGMA journal_mode=WAL")
+			self.db.execute(
+				"CREATE TABLE IF NOT EXISTS llm_responses ("
+				"key TEXT PRIMARY KEY, content TEXT NOT NULL, created_at REAL NOT NULL, "
+				"upstream_seconds REAL NOT NULL, used_at REAL NOT NULL)"
+			)
+			self.load()
+
+	def expired(self, entry: CacheEntry, now: float) -> bool:
+		return self.ttl_seconds > 0 and now - entry.created_at > self.ttl_seconds
+
+	def load(self):
+		now = time.time()
+		if self.ttl_seconds > 0:
+			self.db.execute("DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_seconds,))
+			self.db.commit()
+		rows = self.db.execute(
+			"SELECT key, content, created_at, upstream_seconds FROM llm_responses ORDER BY used_at"
+		).fetchall()
+		for key, content, created_at, upstream_seconds in rows:
+			entry = CacheEntry(content, len(key) + len(content.encode("utf-8")), created_at, upstream_seconds)
+			if not self.expired(entry, now):
+				self.store(key, entry, persist=False)
+		self.evict()
+
+	def get(self, key: str) -> Optional[CacheEntry]:
+		entry = self.entries.get(key)
+		if entry is None:
+			return None
+		now = time.time()
+		if self.expired(entry, now):
+			self.remove(key)
+			return None
+		self.entries.move_to_end(key)
+		self.hits += 1
+		self.saved_seconds += entry.upstream_seconds
+		if self.db is not None:
+			self.touch(key, now)
+		return entry
+
+	def lookup(self, key: str) -> Optional[CacheEntry]:
+		"""get() for callers that go upstream themselves on a miss, which counts it."""
+		entry = self.get(key)
+		if entry is None:
+			self.misses += 1
+		return entry
+
+	def touch(self, key: str, now: float):
+		# Hits arriving while an UPDATE is pending join it instead of adding one
+		with self.touched_lock:
+			pending = bool(self.touched)
+			self.touched[key] = now
+		if not pending:
+			self.writer.submit(self.write_touched)
+
+	def write_touched(self):
+		with self.touched_lock:
+			touched, self.touched = self.touched, {}
+		self.write("UPDATE llm_responses SET used_at = ? WHERE key = ?", [(used_at, key) for key, used_at in touched.items()])
+
+	def write(self, sql: str, rows):
+		try:
+			self.db.executemany(sql, rows)
+			self.db.commit()
+		except sqlite3.Error:
+			logger.exception("LLM cache write failed")
+
+	def close(self):
+		if self.writer is not None:
+			self.writer.shutdown(wait=True)
+			self.writer = None
+			self.db.close()
+
+	def set(self, key: str, content: str, upstream_seconds: float):
+		entry = CacheEntry(content, len(key) + len(content.encode("utf-8")), time.time(), upstream_seconds)
+		if entry.size > self.max_bytes:
+			return
+		self.store(key, entry, persist=True)
+		self.evict()
+
+	def store(self, key: str, entry: CacheEntry, persist: bool):
+		if key in self.entries:
+			self.size -= self.entries.pop(key).size
+		self.entries[key] = entry
+		self.size += entry.size
+		if persist and self.db is not None:
+			self.writer.submit(
+				self.write,
+				"INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?, ?)",
+				[(key, entry.content, entry.created_at, entry.upstream_seconds, entry.created_at)],
+			)
+
+	def remove(self, key: str):
+		self.size -= self.entries.pop(key).size
+		if self.db is not None:
+			self.writer.submit(self.write, "DELETE FROM llm_responses WHERE key = ?", [(key,)])
+
+	def evict(self):
+		# Expired entries are dropped when looked up or pushed out here
+		while self.entries and self.size > self.max_bytes:
+			self.remove(next(iter(self.entries)))
+
+	async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+		while True:
+			entry = self.get(key)
+			if entry is not None:
+				return entry.content
+			if key not in self.inflight:
+				break
+			leader = self.inflight[key]
+			try:
+				content, upstream_seconds = await asyncio.shield(leader)
+			except asyncio.CancelledError:
+				if not leader.cancelled():
+					raise
+				# The leader's request was cancelled, not ours: take over
+				continue
+			self.coalesced += 1
+			self.saved_seconds += upstream_seconds
+			return content
+
+		self.misses += 1
+		future = asyncio.get_running_loop().create_future()
+		self.inflight[key] = future
+		started = time.perf_counter()
+		try:
+			content = await compute()
+		except asyncio.CancelledError:
+			future.cancel()
+			raise
+		except Exception as e:
+			future.set_exception(e)
+			# Nobody else may be waiting; don't leave an unretrieved exception behind
+			future.exception()
+			raise
+		else:
+			upstream_seconds = time.perf_counter() - started
+			self.set(key, content, upstream_seconds)
+			future.set_result((content, upstream_seconds))
+			return content
+		finally:
+			del self.inflight[key]
+
+	def stats(self) -> Dict:
+		# Share of requests answered without an upstream call of their own
+		lookups = self.hits + self.coalesced + self.misses
+		return {
+			"entries": len(self.entries),
+			"bytes": self.size,
+			"max_bytes": self.max_bytes,
+			"hits": self.hits,
+			"misses": self.misses,
+			"coalesced": self.coalesced,
+			"hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+			"saved_seconds": round(self.saved_seconds, 3),
+		}
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backends import BackendPool
+from vector_index import VectorIndex
+
+EMBEDDING_ENDPOINT = "/v1/embeddings"
+# Wait after a failed sync, doubled on each further failure up to refresh_seconds
+# (or RETRY_MAX_SECONDS when refreshing is off)
+RETRY_MIN_SECONDS = 1
+RETRY_MAX_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+
+def word_text(hungarian: str, english: str) -> str:
+	return f"{hungarian} - {english}"
+
+
+class VocabularyRetriever:
+	"""Nearest vocabulary entries for a prompt, from the lang-portal words table.
+
+	The vocabulary is embedded in batches through the embedding service and
+	kept in a VectorIndex, built by a background task from start(). Every
+	refresh_seconds the table is re-read and only added or edited words are
+	embedded again; deleted words are dropped. A failed sync is retried with
+	exponential backoff, and searches meanwhile use the index as it is. With
+	index_path set the index is saved there after each change and
+	memory-mapped on the next start.
+	"""
+
+	def __init__(
+		self,
+		pool: BackendPool,
+		database_path: str,
+		model: Optional[str] = None,
+		index_path: Optional[str] = None,
+		index_type: str = "flat",
+		ivf_lists: int = 0,
+		ivf_probes: int = 8,
+		batch_size: int = 64,
+		refresh_seconds: float = 60,
+	):
+		if index_type not in ("flat", "ivf"):
+			raise ValueError(f"Unknown vector index type: {index_type}")
+		self.pool = pool
+		self.database_path = database_path
+		self.model = model
+		self.index_path = index_path
+		self.index_type = index_type
+		self.ivf_lists = ivf_lists
+		self.ivf_probes = ivf_probes
+		self.batch_size = batch_size
+		self.refresh_seconds = refresh_seconds
+		self.index: Optional[VectorIndex] = None
+		self.words: Dict[int, str] = {}
+		self.synced_at = None
+		self.failures = 0
+		self.last_error = None
+		self.embedded = 0
+		self.task: Optional[asyncio.Task] = None
+		if index_path and os.path.exists(os.path.join(index_path, "meta.json")):
+			try:
+				index, meta = VectorIndex.load(index_path)
+			except (OSError, ValueError) as e:
+				logger.warning("Ignoring saved vector index: %s", e)
+			else:
+				# Vectors from another model are not comparable
+				if meta.get("model") == model:
+					self.index = index
+
+	def read_words(self) -> Dict[int, str]:
+		with sqlite3.connect(f"file:{self.database_path}?mode=ro", uri=True) as db:
+			rows = db.execute("SELECT id, hungarian, english FROM words").fetchall()
+		return {word_id: word_text(hungarian, english) for word_id, hungarian, english in rows}
+
+	async def embed(self, texts: List[str]) -> np.ndarray:
+		vectors = []
+		for start in range(0, len(texts), self.batch_size):
+			payload = {"input": texts[start:start + self.batch_size]}
+			if self.model:
+				payload["model"] = self.model
+			data = (await self.pool.post(EMBEDDING_ENDPOINT, payload))["data"]
+			vectors.extend(item["embedding"] for item in sorted(data, key=lambda item: item["index"]))
+		return np.asarray(vectors, dtype=np.float32)
+
+	async def sync(self) -> Dict:
+		words = await asyncio.to_thread(self.read_words)
+		hashes = {word_id: zlib.crc32(text.encode("utf-8")) for word_id, text in words.items()}
+		if self.index is None:
+			changed = list(words)
+			removed = []
+		else:
+			indexed = dict(zip(self.index.ids.tolist(), self.index.hashes.tolist()))
+			changed = [word_id for word_id, text_hash in hashes.items() if indexed.get(word_id) != text_hash]
+			removed = [word_id for word_id in indexed if word_id not in words]
+
+		if changed:
+			vectors = await self.embed([words[word_id] for word_id in changed])
+			if self.index is None:
+				self.index = VectorIndex(vectors.shape[1])
+			self.index.upsert(changed, vectors, [hashes[word_id] for word_id in changed])
+			self.embedded += len(changed)
+		if removed:
+			self.index.remove(removed)
+		if self.index is not None and self.index_type == "ivf" and self.index.centroids is None and len(self.index):
+			self.index.build_ivf(self.ivf_lists)
+		self.words = words
+		if (changed or removed) and self.index_path:
+			await asyncio.to_thread(self.index.save, self.index_path, {"model": self.model})
+		return {"words": len(words), "embedded": len(changed), "removed": len(removed)}
+
+	def start(self):
+		if self.task is None:
+			self.task = asyncio.get_running_loop().create_task(self.refresh_forever())
+
+	async def stop(self):
+		if self.task is not None:
+			self.task.cancel()
+			self.task = None
+		await self.pool.close()
+
+	async def refresh(self) -> float:
+		"""Sync once; returns the seconds to wait before the next attempt."""
+		try:
+			await self.sync()
+		except Exception as e:
+			self.failures += 1
+			self.last_error = f"{type(e).__name__}: {e}"
+			ceiling = self.refresh_seconds if self.refresh_seconds > 0 else RETRY_MAX_SECONDS
+			delay = min(RETRY_MIN_SECONDS * 2 ** min(self.failures - 1, 16), ceiling)
+			logger.warning("Vocabulary sync failed (%d in a row), retrying in %ss: %s", self.failures, delay, self.last_error)
+			return delay
+		self.synced_at = time.monotonic()
+		self.failures = 0
+		return self.refresh_seconds
+
+	async def refresh_forever(self):
+		while True:
+			delay = await self.refresh()
+			if delay <= 0:
+				# Refreshing is off and the index is built
+				return
+			await asyncio.sleep(delay)
+
+	async def search(self, text: str, k: int = 5, min_score: float = 0.0) -> List[Dict]:
+		# Until the first sync finishes there is nothing to search
+		if not self.index or not self.words:
+			return []
+		query = (await self.embed([text]))[0]
+		return [
+			{"id": word_id, "text": self.words[word_id], "score": round(score, 4)}
+			for word_id, score in self.index.search(query, k, self.ivf_probes)
+			if score >= min_score and word_id in self.words
+		]
+
+	def stats(self) -> Dict:
+		return {
+			"index_type": self.index_type,
+			"indexed_words": len(self.index) if self.index is not None else 0,
+			"dim": self.index.dim if self.index is not None else None,
+			"embedded": self.embedded,
+			"synced_seconds_ago": round(time.monotonic() - self.synced_at, 1) if self.synced_at is not None else None,
+			"sync_failures": self.failures,
+			"last_sync_error": self.last_error,
+			"ivf_lists": len(self.index.centroids) if self.index is not None and self.index.centroids is not None else 0,
+		}
@@ -0,0 +1,92 @@
+import ast
+import codecs
+import json
+from typing import AsyncIterable, List, NamedTuple, Optional
+
+SSE_DONE = "data: [DONE]\n\n"
+
+
+class Delta(NamedTuple):
+	text: str
+	finish_reason: Optional[str] = None
+
+
+def sse_event(payload: str) -> str:
+	return f"data: {payload}\n\n"
+
+
+class DeltaDecoder:
+	"""Turns raw upstream LLM bytes into text deltas as they arrive.
+
+	Chunks can split or merge events, so complete lines are decoded and the
+	remainder is kept for the next chunk. Understands OpenAI-style SSE
+	(`data: {"choices": [{"delta": ...}]}`), Ollama's NDJSON and the OPEA
+	`data: b'...'` text events.
+	"""
+
+	def __init__(self):
+		self.buffer = b""
+		self.done = False
+		# OPEA events can split a multi-byte character between them
+		self.bytes_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+	def feed(self, chunk) -> List[Delta]:
+		if isinstance(chunk, str):
+			chunk = chunk.encode("utf-8")
+		self.buffer += chunk
+		*lines, self.buffer = self.buffer.split(b"\n")
+		return [delta for line in lines if (delta := self.decode_line(line)) is not None]
+
+	def flush(self) -> List[Delta]:
+		line, self.buffer = self.buffer, b""
+		delta = self.decode_line(line)
+		return [delta] if delta is not None else []
+
+	def decode_line(self, line: bytes) -> Optional[Delta]:
+		line = line.strip()
+		if not line or self.done or line.startswith(b":"):
+			return None
+		if line.startswith(b"data:"):
+			line = line[5:].strip()
+		if line == b"[DONE]":
+			self.done = True
+			return None
+		text = line.decode("utf-8", errors="replace")
+		if text[:2] in ("b'", 'b"'):
+			# repr() of the bytes, escapes included
+			try:
+				data = ast.literal_eval(text)
+			except (ValueError, SyntaxError):
+				# Truncated or malformed: drop the b'' wrapper, whatever is left of it
+				return Delta(text[2:-1] if len(text) > 2 and text.endswith(text[1]) else text[2:])
+			text = self.bytes_decoder.decode(data)
+			return Delta(text) if text else None
+		try:
+			event = json.loads(text)
+		except ValueError:
+			return Delta(text)
+		if not isinstance(event, dict):
+			return None
+		if "choices" in event:
+			if not event["choices"]:
+				return None
+			choice = event["choices"][0]
+			message = choice.get("delta") or choice.get("message") or {}
+			return Delta(message.get("content") or choice.get("text") or "", choice.get("finish_reason"))
+		if "message" in event or "response" in event:
+			content = (event.get("message") or {}).get("content") or event.get("response") or ""
+			return Delta(content, "stop" if event.get("done") else None)
+		return None
+
+
+async def iter_deltas(body_iterator: AsyncIterable) -> AsyncIterable[Delta]:
+	decoder = DeltaDecoder()
+	async for chunk in body_iterator:
+		for delta in decoder.feed(chunk):
+			yield delta
+	for delta in decoder.flush():
+		yield delta
+
+
+async def replay_deltas(text: str) -> AsyncIterable[Delta]:
+	yield Delta(text, "stop")
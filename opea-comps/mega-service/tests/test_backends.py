@@ -0,0 +1,149 @@
+import asyncio
+import gc
+
+import httpx
+import pytest
+
+from backends import BackendPool, backend_fault, parse_endpoints
+
+URLS = ["http://a", "http://b"]
+
+def make_pool(handler, **kwargs) -> BackendPool:
+	pool = BackendPool(URLS, health_interval=0, **kwargs)
+	pool.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+	return pool
+
+def status_handler(statuses):
+	"""Answers each backend with its status, or raises the exception given instead."""
+	def handler(request):
+		status = statuses[f"http://{request.url.host}"]
+		if isinstance(status, Exception):
+			raise status
+		return httpx.Response(status, json={"ok": status < 400})
+	return handler
+
+def by_url(pool):
+	return {backend.url: backend for backend in pool.backends}
+
+def test_parse_endpoints():
+	assert parse_endpoints("a:1, http://b:2/ ,") == ["http://a:1", "http://b:2"]
+
+def test_backend_fault():
+	request = httpx.Request("POST", "http://a")
+	assert backend_fault(httpx.HTTPStatusError("", request=request, response=httpx.Response(503, request=request)))
+	assert not backend_fault(httpx.HTTPStatusError("", request=request, response=httpx.Response(400, request=request)))
+	assert backend_fault(httpx.ConnectError("refused"))
+	assert backend_fault(httpx.ReadTimeout("slow"))
+
+def test_server_errors_eject_after_consecutive_failures():
+	pool = make_pool(status_handler({"http://a": 500, "http://b": 200}), strategy="round_robin", eject_after=2)
+
+	async def run():
+		for _ in range(4):
+			try:
+				await pool.post("/v1/chat/completions", {})
+			except httpx.HTTPStatusError:
+				pass
+
+	asyncio.run(run())
+	backends = by_url(pool)
+	assert not backends["http://a"].healthy
+	assert backends["http://a"].failures == 2
+	assert backends["http://b"].healthy
+
+def test_client_errors_do_not_eject():
+	pool = make_pool(status_handler({"http://a": 400, "http://b": 400}), eject_after=1)
+
+	async def run():
+		for _ in range(3):
+			with pytest.raises(httpx.HTTPStatusError):
+				await pool.post("/v1/chat/completions", {})
+
+	asyncio.run(run())
+	assert all(backend.healthy and backend.failures == 0 for backend in pool.backends)
+	assert sum(backend.requests for backend in pool.backends) == 3
+
+def test_connection_errors_are_retried_on_another_backend():
+	pool = make_pool(status_handler({"http://a": httpx.ConnectError("refused"), "http://b": 200}), eject_after=1)
+
+	async def run():
+		return [await pool.post("/v1/chat/completions", {}) for _ in range(3)]
+
+	assert asyncio.run(run()) == [{"ok": True}] * 3
+	backends = by_url(pool)
+	assert not backends["http://a"].healthy
+	assert backends["http://b"].requests == 3
+	assert all(backend.outstanding == 0 for backend in pool.backends)
+
+def test_ejected_backends_are_still_tried_when_none_is_healthy():
+	pool = make_pool(status_handler({"http://a": 200, "http://b": 200}))
+	for backend in pool.backends:
+		backend.healthy = False
+	assert asyncio.run(pool.post("/v1/chat/completions", {})) == {"ok": True}
+
+def test_health_check_readmits():
+	statuses = {"http://a": 500, "http://b": 200}
+	pool = make_pool(status_handler(statuses), eject_after=1)
+	backend = by_url(pool)["http://a"]
+
+	async def check():
+		await pool.check_health(backend)
+
+	asyncio.run(check())
+	assert not backend.healthy
+	statuses["http://a"] = 200
+	asyncio.run(check())
+	assert backend.healthy
+
+def test_least_outstanding_prefers_the_idle_backend():
+	pool = make_pool(status_handler({"http://a": 200, "http://b": 200}))
+	by_url(pool)["http://a"].outstanding = 3
+	assert {pool.choose().url for _ in range(4)} == {"http://b"}
+
+def test_stream_client_error_does_not_eject():
+	pool = make_pool(status_handler({"http://a": 422, "http://b": 422}), eject_after=1)
+
+	async def run():
+		with pytest.raises(httpx.HTTPStatusError):
+			await pool.stream("/v1/chat/completions", {})
+
+	asyncio.run(run())
+	assert all(backend.healthy and backend.outstanding == 0 for backend in pool.backends)
+
+def stream_handler(request):
+	return httpx.Response(200, content=b"data: one\n\ndata: two\n\n")
+
+def test_stream_releases_the_backend_when_read_to_the_end():
+	pool = make_pool(stream_handler)
+
+	async def run():
+		stream = await pool.stream("/v1/chat/completions", {})
+		assert sum(backend.outstanding for backend in pool.backends) == 1
+		return b"".join([chunk async for chunk in stream])
+
+	assert asyncio.run(run()) == b"data: one\n\ndata: two\n\n"
+	assert all(backend.outstanding == 0 for backend in pool.backends)
+	assert sum(backend.requests for backend in pool.backends) == 1
+
+def test_stream_releases_the_backend_once_on_aclose():
+	pool = make_pool(stream_handler)
+
+	async def run():
+		stream = await pool.stream("/v1/chat/completions", {})
+		await stream.aclose()
+		await stream.aclose()
+
+	asyncio.run(run())
+	assert all(backend.outstanding == 0 for backend in pool.backends)
+
+def test_stream_dropped_unread_releases_the_backend():
+	pool = make_pool(stream_handler)
+
+	async def run():
+		await pool.stream("/v1/chat/completions", {})
+		gc.collect()
+		# Let the scheduled response close run
+		await asyncio.sleep(0)
+
+	asyncio.run(run())
+	assert all(backend.outstanding == 0 for backend in pool.backends)
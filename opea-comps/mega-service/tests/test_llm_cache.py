@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from llm_cache import ResponseCache, cache_key
+
+def test_cache_key_ignores_whitespace_and_unrelated_params():
+	messages = [{"role": "user", "content": "Szia  világ"}]
+	assert cache_key("m", messages, {"temperature": 0.1, "stream": True}) == cache_key(
+		"m", [{"role": "user", "content": " Szia világ "}], {"temperature": 0.1}
+	)
+	assert cache_key("m", messages, {"temperature": 0.1}) != cache_key("m", messages, {"temperature": 0.2})
+
+def test_concurrent_misses_are_coalesced():
+	cache = ResponseCache(max_bytes=10_000)
+	calls = 0
+
+	async def compute():
+		nonlocal calls
+		calls += 1
+		await asyncio.sleep(0.05)
+		return "answer"
+
+	async def run():
+		return await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(3)))
+
+	assert asyncio.run(run()) == ["answer"] * 3
+	assert calls == 1
+	stats = cache.stats()
+	assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 2, 0)
+	# Each follower was spared the leader's upstream time
+	assert stats["saved_seconds"] >= 2 * 0.05
+
+def test_follower_takes_over_from_a_cancelled_leader():
+	cache = ResponseCache(max_bytes=10_000)
+	calls = []
+
+	async def compute(name):
+		calls.append(name)
+		await asyncio.sleep(0.05)
+		return f"answer from {name}"
+
+	async def run():
+		leader = asyncio.ensure_future(cache.get_or_compute("key", lambda: compute("leader")))
+		await asyncio.sleep(0)
+		follower = asyncio.ensure_future(cache.get_or_compute("key", lambda: compute("follower")))
+		await asyncio.sleep(0.01)
+		# The leader's client disconnects; the follower must not fail with it
+		leader.cancel()
+		with pytest.raises(asyncio.CancelledError):
+			await leader
+		return await follower
+
+	assert asyncio.run(run()) == "answer from follower"
+	assert calls == ["leader", "follower"]
+	assert cache.get("key").content == "answer from follower"
+	assert not cache.inflight
+
+def test_cancelled_follower_leaves_the_leader_running():
+	cache = ResponseCache(max_bytes=10_000)
+
+	async def compute():
+		await asyncio.sleep(0.05)
+		return "answer"
+
+	async def run():
+		leader = asyncio.ensure_future(cache.get_or_compute("key", compute))
+		await asyncio.sleep(0)
+		follower = asyncio.ensure_future(cache.get_or_compute("key", compute))
+		await asyncio.sleep(0.01)
+		follower.cancel()
+		with pytest.raises(asyncio.CancelledError):
+			await follower
+		return await leader
+
+	assert asyncio.run(run()) == "answer"
+
+def test_leader_error_reaches_followers_and_is_not_cached():
+	cache = ResponseCache(max_bytes=10_000)
+
+	async def compute():
+		await asyncio.sleep(0.01)
+		raise RuntimeError("upstream down")
+
+	async def run():
+		return await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(2)), return_exceptions=True)
+
+	results = asyncio.run(run())
+	assert [str(result) for result in results] == ["upstream down"] * 2
+	assert cache.get("key") is None
+
+def test_lookup_counts_misses():
+	cache = ResponseCache(max_bytes=10_000)
+	assert cache.lookup("key") is None
+	cache.set("key", "answer", upstream_seconds=1.5)
+	assert cache.lookup("key").content == "answer"
+	stats = cache.stats()
+	assert (stats["hits"], stats["misses"], stats["hit_ratio"], stats["saved_seconds"]) == (1, 1, 0.5, 1.5)
+
+def test_least_recently_used_entries_are_evicted():
+	cache = ResponseCache(max_bytes=30)
+	cache.set("a", "x" * 10, 0)
+	cache.set("b", "x" * 10, 0)
+	cache.get("a")
+	cache.set("c", "x" * 10, 0)
+	assert cache.get("a") is not None
+	assert cache.get("b") is None
+	assert cache.size <= 30
+
+def test_persisted_entries_survive_a_restart(tmp_path):
+	path = str(tmp_path / "cache.db")
+	cache = ResponseCache(max_bytes=10_000, path=path)
+	cache.set("key", "answer", upstream_seconds=1.0)
+	cache.close()
+	assert ResponseCache(max_bytes=10_000, path=path).get("key").content == "answer"
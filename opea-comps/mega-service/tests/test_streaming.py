@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+from streaming import Delta, DeltaDecoder, iter_deltas
+
+def openai_event(content, finish_reason=None):
+	chunk = {"choices": [{"index": 0, "delta": {"content": content} if content else {}, "finish_reason": finish_reason}]}
+	return f"data: {json.dumps(chunk)}\n\n".encode()
+
+def decode(*chunks):
+	decoder = DeltaDecoder()
+	deltas = [delta for chunk in chunks for delta in decoder.feed(chunk)]
+	return deltas + decoder.flush()
+
+def text(deltas):
+	return "".join(delta.text for delta in deltas)
+
+def test_openai_sse():
+	deltas = decode(openai_event("Szia"), openai_event(" világ"), openai_event(None, "stop"), b"data: [DONE]\n\n")
+	assert deltas == [Delta("Szia"), Delta(" világ"), Delta("", "stop")]
+
+def test_events_split_and_merged_across_chunks():
+	body = openai_event("egy") + openai_event("kettő") + openai_event("három")
+	# Every split point, including inside a multi-byte character
+	for split in range(1, len(body)):
+		assert text(decode(body[:split], body[split:])) == "egykettőhárom"
+	assert text(decode(*(body[i:i + 1] for i in range(len(body))))) == "egykettőhárom"
+
+def test_done_ends_the_stream():
+	deltas = decode(openai_event("a") + b"data: [DONE]\n\n" + openai_event("after"))
+	assert deltas == [Delta("a")]
+
+def test_comments_and_blank_lines_are_skipped():
+	assert decode(b": keep-alive\n\n", b"\n", openai_event("x")) == [Delta("x")]
+
+def test_ollama_ndjson():
+	lines = [
+		{"message": {"role": "assistant", "content": "Jó"}, "done": False},
+		{"message": {"role": "assistant", "content": " napot"}, "done": False},
+		{"message": {"role": "assistant", "content": ""}, "done": True},
+	]
+	body = b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+	assert decode(body[:10], body[10:]) == [Delta("Jó"), Delta(" napot"), Delta("", "stop")]
+
+def test_ndjson_without_trailing_newline_is_flushed():
+	assert decode('{"response": "vége", "done": true}'.encode()) == [Delta("vége", "stop")]
+
+def test_opea_bytes_repr():
+	deltas = decode(b"data: b'Hello'\n\n", b"data: b' \\'quoted\\' \\\\ done'\n\n", b"data: [DONE]\n\n")
+	assert text(deltas) == "Hello 'quoted' \\ done"
+
+def test_opea_bytes_repr_with_character_split_between_events():
+	encoded = "ő".encode("utf-8")
+	deltas = decode(f"data: {encoded[:1]!r}\n\n".encode(), f"data: {encoded[1:]!r}\n\n".encode())
+	assert text(deltas) == "ő"
+	assert "�" not in text(deltas)
+
+def test_opea_bytes_repr_that_does_not_parse_is_passed_through():
+	assert decode(b"data: b'broken\n") == [Delta("broken")]
+
+def test_iter_deltas():
+	async def body():
+		for chunk in (openai_event("a")[:7], openai_event("a")[7:], b'{"response": "b"}'):
+			yield chunk
+
+	async def collect():
+		return [delta async for delta in iter_deltas(body())]
+
+	assert asyncio.run(collect()) == [Delta("a"), Delta("b")]
@@ -0,0 +1,45 @@
+"""Time to first token and total time of the mega-service, streamed and not.
+
+	python fake_llm.py --port 9000 &
+	LLM_SERVICE_PORT=9000 python app.py &
+	python ttft.py --url http://localhost:8000/v1/example --requests 5
+"""
+import argparse
+import statistics
+import time
+
+import httpx
+
+from streaming import DeltaDecoder
+
+
+def measure(client: httpx.Client, url: str, stream: bool):
+	body = {"model": "llama3.2:1b", "messages": "Translate: good morning", "stream": stream}
+	started = time.perf_counter()
+	first = None
+	decoder = DeltaDecoder()
+	with client.stream("POST", url, json=body) as response:
+		response.raise_for_status()
+		for chunk in response.iter_bytes():
+			# Without streaming the whole answer is the first token
+			if first is None and (not stream or any(delta.text for delta in decoder.feed(chunk))):
+				first = time.perf_counter() - started
+	return first, time.perf_counter() - started
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Measure first-token latency")
+	parser.add_argument("--url", default="http://localhost:8000/v1/example")
+	parser.add_argument("--requests", type=int, default=5)
+	args = parser.parse_args()
+
+	with httpx.Client(timeout=120) as client:
+		for stream in (False, True):
+			samples = [measure(client, args.url, stream) for _ in range(args.requests)]
+			first = statistics.median(sample[0] for sample in samples) * 1000
+			total = statistics.median(sample[1] for sample in samples) * 1000
+			print(f"stream={str(stream):<5}  first token {first:8.1f} ms  total {total:8.1f} ms")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,167 @@
+import json
+import os
+import shutil
+import tempfile
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+ARRAYS = ("ids", "vectors", "hashes", "centroids", "assignments")
+# Arrays with one entry per row, which must all have the same length
+ROW_ARRAYS = ("ids", "vectors", "hashes", "assignments")
+
+
+def normalise(vectors) -> np.ndarray:
+	vectors = np.asarray(vectors, dtype=np.float32)
+	norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+	norms[norms == 0] = 1
+	return vectors / norms
+
+
+class VectorIndex:
+	"""Cosine-similarity index over unit vectors, keyed by integer id.
+
+	Search is brute force over all rows unless build_ivf was called; with
+	an IVF layout only the rows in the lists whose centroids are closest to
+	the query are scored. Every row also stores a content hash, so callers
+	can tell which ids need re-embedding.
+
+	Saved as one .npy file per array in a fresh subdirectory, which
+	meta.json is then atomically switched to, so a crash mid-save leaves the
+	previous index intact. load maps the arrays into memory read-only, and
+	the first update copies them.
+	"""
+
+	def __init__(self, dim: int):
+		self.dim = dim
+		self.ids = np.empty(0, dtype=np.int64)
+		self.vectors = np.empty((0, dim), dtype=np.float32)
+		self.hashes = np.empty(0, dtype=np.uint32)
+		self.centroids: Optional[np.ndarray] = None
+		self.assignments: Optional[np.ndarray] = None
+		self.positions = {}
+
+	def __len__(self) -> int:
+		return len(self.ids)
+
+	def reindex(self):
+		self.positions = {int(item_id): row for row, item_id in enumerate(self.ids)}
+
+	def writable(self):
+		# Loaded arrays are read-only memory maps; copy before the first change
+		for name in ARRAYS:
+			array = getattr(self, name)
+			if array is not None and not array.flags.writeable:
+				setattr(self, name, np.array(array))
+
+	def upsert(self, ids: Iterable[int], vectors, hashes: Iterable[int]):
+		ids = np.asarray(list(ids), dtype=np.int64)
+		vectors = normalise(vectors).reshape(len(ids), self.dim)
+		hashes = np.asarray(list(hashes), dtype=np.uint32)
+		self.writable()
+		rows = np.array([self.positions.get(int(item_id), -1) for item_id in ids], dtype=np.int64)
+		existing = rows >= 0
+		self.vectors[rows[existing]] = vectors[existing]
+		self.hashes[rows[existing]] = hashes[existing]
+		new = ~existing
+		self.ids = np.concatenate([self.ids, ids[new]])
+		self.vectors = np.concatenate([self.vectors, vectors[new]])
+		self.hashes = np.concatenate([self.hashes, hashes[new]])
+		if self.centroids is not None:
+			self.assignments = np.concatenate([self.assignments, np.empty(int(new.sum()), dtype=np.int32)])
+			changed = np.concatenate([rows[existing], np.arange(len(self.ids) - int(new.sum()), len(self.ids))])
+			self.assignments[changed] = self.assign(self.vectors[changed])
+		self.reindex()
+
+	def remove(self, ids: Iterable[int]):
+		keep = ~np.isin(self.ids, np.asarray(list(ids), dtype=np.int64))
+		self.ids = self.ids[keep]
+		self.vectors = self.vectors[keep]
+		self.hashes = self.hashes[keep]
+		if self.assignments is not None:
+			self.assignments = self.assignments[keep]
+		self.reindex()
+
+	def assign(self, vectors: np.ndarray) -> np.ndarray:
+		return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+	def build_ivf(self, n_lists: int = 0, iterations: int = 10, seed: int = 0):
+		"""Cluster the rows into n_lists inverted lists (spherical k-means);
+		0 picks about the square root of the row count."""
+		if n_lists <= 0:
+			n_lists = max(1, int(np.sqrt(len(self))))
+		n_lists = min(n_lists, len(self))
+		if n_lists == 0:
+			return
+		rng = np.random.default_rng(seed)
+		centroids = self.vectors[rng.choice(len(self), n_lists, replace=False)].copy()
+		for _ in range(iterations):
+			self.centroids = centroids
+			assignments = self.assign(self.vectors)
+			sums = np.zeros_like(centroids)
+			np.add.at(sums, assignments, self.vectors)
+			counts = np.bincount(assignments, minlength=n_lists)
+			# Empty lists keep their previous centroid
+			centroids = np.where(counts[:, None] > 0, normalise(sums), centroids)
+		self.centroids = centroids
+		self.assignments = self.assign(self.vectors)
+
+	def search(self, query, k: int, nprobe: int = 8) -> List[Tuple[int, float]]:
+		if len(self) == 0 or k <= 0:
+			return []
+		query = normalise(query).reshape(self.dim)
+		if self.centroids is not None:
+			probes = np.argsort(-(self.centroids @ query))[:nprobe]
+			rows = np.flatnonzero(np.isin(self.assignments, probes))
+		else:
+			rows = np.arange(len(self))
+		if len(rows) == 0:
+			return []
+		scores = self.vectors[rows] @ query
+		k = min(k, len(rows))
+		top = np.argpartition(-scores, k - 1)[:k]
+		top = top[np.argsort(-scores[top])]
+		return [(int(self.ids[rows[i]]), float(scores[i])) for i in top]
+
+	def save(self, path: str, meta: dict = None):
+		os.makedirs(path, exist_ok=True)
+		version = tempfile.mkdtemp(prefix="index-", dir=path)
+		for name in ARRAYS:
+			array = getattr(self, name)
+			if array is not None:
+				with open(os.path.join(version, f"{name}.npy"), "wb") as array_file:
+					np.save(array_file, array)
+					array_file.flush()
+					os.fsync(array_file.fileno())
+		meta = {**(meta or {}), "dim": self.dim, "count": len(self), "version": os.path.basename(version)}
+		with open(os.path.join(path, "meta.json.tmp"), "w") as meta_file:
+			json.dump(meta, meta_file)
+			meta_file.flush()
+			os.fsync(meta_file.fileno())
+		# The switch: readers see either the old arrays or all of the new ones
+		os.replace(os.path.join(path, "meta.json.tmp"), os.path.join(path, "meta.json"))
+		# Older versions are no longer referenced; open memory maps keep their data
+		for entry in os.listdir(path):
+			if entry != meta["version"] and (entry.startswith("index-") or entry.endswith(".npy")):
+				target = os.path.join(path, entry)
+				if os.path.isdir(target):
+					shutil.rmtree(target, ignore_errors=True)
+				else:
+					os.remove(target)
+
+	@classmethod
+	def load(cls, path: str) -> Tuple["VectorIndex", dict]:
+		with open(os.path.join(path, "meta.json")) as meta_file:
+			meta = json.load(meta_file)
+		index = cls(meta["dim"])
+		# Indexes saved before versioned subdirectories keep their arrays in path
+		version = os.path.join(path, meta.get("version", ""))
+		for name in ARRAYS:
+			target = os.path.join(version, f"{name}.npy")
+			if os.path.exists(target):
+				setattr(index, name, np.load(target, mmap_mode="r"))
+		lengths = {name: len(getattr(index, name)) for name in ROW_ARRAYS if getattr(index, name) is not None}
+		if set(lengths.values()) != {meta["count"]} or index.vectors.shape[1:] != (index.dim,):
+			raise ValueError(f"Inconsistent vector index in {path}: {lengths}, expected {meta['count']} rows")
+		index.reindex()
+		return index, meta